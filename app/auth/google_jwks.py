@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import re
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable
+
+import httpx
+
+from app.depends.async_client import SharedAsyncClient
+
+logger = logging.getLogger(__name__)
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+def _cache_lifetime(response: httpx.Response, default_ttl: float) -> float:
+    """
+        Reads how long a response may be cached from its Cache-Control or Expires header.
+
+        Args:
+            response (httpx.Response): The JWKS response.
+            default_ttl (float): Lifetime used when the response has no cache headers, in seconds.
+
+        Returns:
+            float: The cache lifetime, in seconds.
+    """
+    cache_control: str = response.headers.get("Cache-Control", "")
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0.0
+    max_age = _MAX_AGE.search(cache_control)
+    if max_age is not None:
+        return float(max_age.group(1))
+    expires: str | None = response.headers.get("Expires")
+    if expires:
+        try:
+            return max(0.0, parsedate_to_datetime(expires).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+    return default_ttl
+
+
+class JWKSCache:
+    """
+        A remote JWK Set, cached as long as its HTTP cache headers allow.
+
+        Authlib checks Google's ID token inside authorize_access_token; the
+        Google OAuth client fetches its keys from here (see `fetch_jwk_set`),
+        so that check normally never waits for the network. Once the set has
+        been fetched, a background task refreshes it shortly before it expires.
+        A token signed with an unknown `kid` (the provider has rotated its keys)
+        triggers an immediate refresh, at most once per `min_refresh_interval`.
+
+        Args:
+            url (str): The JWKS URL.
+            http_client (SharedAsyncClient): The app's shared HTTP client.
+            default_ttl (float): Lifetime of a response without cache headers, in seconds.
+            min_refresh_interval (float): Minimum time between two fetches, in seconds.
+            clock (Callable[[], float]): Monotonic time source, in seconds.
+    """
+
+    def __init__(
+            self,
+            url: str,
+            http_client: SharedAsyncClient,
+            default_ttl: float = 3600.0,
+            min_refresh_interval: float = 60.0,
+            clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.url = url
+        self.http_client = http_client
+        self.default_ttl = default_ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.clock = clock
+        self.fetches: int = 0
+        self.expires_at: float = 0.0
+        self._jwk_set: dict = {"keys": []}
+        self._fetched_at: float | None = None
+        self._lock = asyncio.Lock()
+        self._refresher: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        self._lock = asyncio.Lock()
+        self._refresher = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._refresher is None:
+            return
+        self._refresher.cancel()
+        try:
+            await self._refresher
+        except asyncio.CancelledError:
+            pass
+        self._refresher = None
+
+    async def refresh(self) -> None:
+        response: httpx.Response = await self.http_client.client.get(self.url)
+        response.raise_for_status()
+        jwk_set: dict = response.json()
+        if not isinstance(jwk_set.get("keys"), list):
+            raise ValueError(f"{self.url} did not return a JWK Set")
+        now: float = self.clock()
+        self._jwk_set = jwk_set
+        self._fetched_at = now
+        self.expires_at = now + _cache_lifetime(response, self.default_ttl)
+        self.fetches += 1
+
+    async def fetch_jwk_set(self, force: bool = False) -> dict:
+        """
+            Returns the cached key set, with the signature of authlib's OpenID fetch_jwk_set.
+
+            Args:
+                force (bool): Authlib found no key for the token, refresh unless the
+                    set was fetched less than `min_refresh_interval` ago.
+
+            Returns:
+                dict: The JWK Set as served by the provider.
+
+            Raises:
+                httpx.HTTPError: If the key set had to be fetched and the request failed.
+        """
+        if force or self.clock() >= self.expires_at:
+            async with self._lock:
+                if self._should_refresh():
+                    await self.refresh()
+        return self._jwk_set
+
+    def _should_refresh(self) -> bool:
+        now: float = self.clock()
+        if now >= self.expires_at:
+            return True
+        return self._fetched_at is None or now - self._fetched_at >= self.min_refresh_interval
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            # Refresh when 90% of the lifetime has passed, but not more often than allowed.
+            lifetime_left: float = self.expires_at - self.clock()
+            await asyncio.sleep(max(self.min_refresh_interval, lifetime_left * 0.9))
+            if self._fetched_at is None:
+                # Nobody has logged in yet, the first verification fetches the keys.
+                continue
+            try:
+                async with self._lock:
+                    await self.refresh()
+            except (httpx.HTTPError, ValueError) as e:
+                logger.error(f"Could not refresh Google keys: {type(e).__name__}: {e}")
@@ -0,0 +1,186 @@
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+from jose import jwk, jwt, JWTError
+from jose.backends.base import Key
+from jose.utils import base64url_decode, base64url_encode
+
+DEFAULT_KID: str = "default"
+ASYMMETRIC_ALGORITHMS: frozenset[str] = frozenset({"ES256", "ES384", "ES512", "EdDSA"})
+
+
+class Ed25519Key(Key):
+    """
+        EdDSA (Ed25519) key for python-jose, which has no OKP support of its own.
+
+        Accepts a cryptography key object, a PEM private or public key, or an
+        OKP JWK dict.
+    """
+
+    def __init__(self, key, algorithm: str) -> None:
+        super().__init__(key, algorithm)
+        self._algorithm = algorithm
+        if isinstance(key, (Ed25519PrivateKey, Ed25519PublicKey)):
+            self._key = key
+        elif isinstance(key, dict):
+            if "d" in key:
+                self._key = Ed25519PrivateKey.from_private_bytes(base64url_decode(key["d"].encode()))
+            else:
+                self._key = Ed25519PublicKey.from_public_bytes(base64url_decode(key["x"].encode()))
+        else:
+            pem: bytes = key.encode() if isinstance(key, str) else key
+            if b"PRIVATE" in pem:
+                self._key = serialization.load_pem_private_key(pem, password=None)
+            else:
+                self._key = serialization.load_pem_public_key(pem)
+        if not isinstance(self._key, (Ed25519PrivateKey, Ed25519PublicKey)):
+            raise JWTError("EdDSA keys must be Ed25519 keys")
+
+    def sign(self, msg: bytes) -> bytes:
+        return self._key.sign(msg)
+
+    def verify(self, msg: bytes, sig: bytes) -> bool:
+        public_key: Ed25519PublicKey = (
+            self._key.public_key() if isinstance(self._key, Ed25519PrivateKey) else self._key
+        )
+        try:
+            public_key.verify(sig, msg)
+            return True
+        except InvalidSignature:
+            return False
+
+    def public_key(self) -> "Ed25519Key":
+        if isinstance(self._key, Ed25519PublicKey):
+            return self
+        return Ed25519Key(self._key.public_key(), self._algorithm)
+
+    def to_dict(self) -> dict:
+        public_key: Ed25519PublicKey = self.public_key()._key
+        data: dict = {
+            "kty": "OKP",
+            "crv": "Ed25519",
+            "alg": self._algorithm,
+            "x": base64url_encode(
+                public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+            ).decode(),
+        }
+        if isinstance(self._key, Ed25519PrivateKey):
+            data["d"] = base64url_encode(
+                self._key.private_bytes(
+                    serialization.Encoding.Raw,
+                    serialization.PrivateFormat.Raw,
+                    serialization.NoEncryption()
+                )
+            ).decode()
+        return data
+
+
+jwk.register_key("EdDSA", Ed25519Key)
+
+
+class KeyRing:
+    """
+        JWT signing and verification keys, parsed once and selected by `kid`.
+
+        New tokens are signed with the active key and carry its `kid` in the
+        header. Tokens are verified with the key named by their `kid`, and only
+        with that key's algorithm; tokens without a `kid` use DEFAULT_KID. To
+        rotate, add a new key, make it active and keep the old one until its
+        tokens have expired.
+
+        Args:
+            keys (dict[str, tuple[str, str]]): kid -> (algorithm, key material). HS* keys
+                take the shared secret, ES* and EdDSA keys a PEM private key.
+            active_kid (str): The kid used to sign new tokens.
+
+        Raises:
+            JWTError: If a key cannot be parsed or the active kid is unknown.
+    """
+
+    def __init__(self, keys: dict[str, tuple[str, str]], active_kid: str) -> None:
+        if active_kid not in keys:
+            raise JWTError(f"Unknown active JWT key id {active_kid}")
+        self.active_kid = active_kid
+        self._algorithms: dict[str, str] = {kid: algorithm for kid, (algorithm, _) in keys.items()}
+        self._keys: dict[str, Key] = {
+            kid: jwk.construct(key, algorithm) for kid, (algorithm, key) in keys.items()
+        }
+        self._verification_keys: dict[str, Key] = {
+            kid: key.public_key() if self._algorithms[kid] in ASYMMETRIC_ALGORITHMS else key
+            for kid, key in self._keys.items()
+        }
+        self._jwks: dict = {
+            "keys": [
+                {
+                    **self._verification_keys[kid].to_dict(),
+                    "kid": kid,
+                    "alg": algorithm,
+                    "use": "sig",
+                }
+                for kid, algorithm in self._algorithms.items()
+                if algorithm in ASYMMETRIC_ALGORITHMS
+            ]
+        }
+
+    def encode(self, claims: dict) -> str:
+        return jwt.encode(
+            claims=claims,
+            key=self._keys[self.active_kid],
+            algorithm=self._algorithms[self.active_kid],
+            headers={"kid": self.active_kid}
+        )
+
+    def decode(self, token: str) -> dict:
+        """
+            Verifies a token with the key named by its `kid` and validates its claims.
+
+            Args:
+                token (str): The encoded JWT.
+
+            Returns:
+                dict: The token's claims.
+
+            Raises:
+                JWTError: If the token is malformed, expired, signed with an unknown
+                    key or does not match its key's algorithm.
+        """
+        kid: str = jwt.get_unverified_header(token).get("kid", DEFAULT_KID)
+        if not isinstance(kid, str):
+            raise JWTError("JWT key id must be a string")
+        key: Key | None = self._verification_keys.get(kid)
+        if key is None:
+            raise JWTError(f"Unknown JWT key id {kid}")
+        return jwt.decode(token=token, key=key, algorithms=[self._algorithms[kid]])
+
+    def jwks(self) -> dict:
+        """
+            Returns the public keys as a JWK Set, without the HMAC secrets.
+        """
+        return self._jwks
+
+
+def load_keyring(
+        secret_key: str,
+        algorithm: str,
+        extra_keys: list[dict[str, str]],
+        active_kid: str | None = None
+) -> KeyRing:
+    """
+        Builds the keyring from the settings.
+
+        The SECRET_KEY / ALGORITHM pair is always kept as DEFAULT_KID, so tokens
+        issued before a rotation stay valid.
+
+        Args:
+            secret_key (str): The SECRET_KEY setting.
+            algorithm (str): The ALGORITHM setting.
+            extra_keys (list[dict[str, str]]): Entries of JWT_KEYRING with "kid", "alg" and "key".
+            active_kid (str | None): The kid used to sign new tokens, DEFAULT_KID if empty.
+
+        Returns:
+            KeyRing: The parsed keyring.
+    """
+    keys: dict[str, tuple[str, str]] = {DEFAULT_KID: (algorithm, secret_key)}
+    for entry in extra_keys:
+        keys[entry["kid"]] = (entry["alg"], entry["key"])
+    return KeyRing(keys=keys, active_kid=active_kid or DEFAULT_KID)
@@ -1,5 +1,4 @@
 import logging
-from datetime import datetime
 from typing import Annotated
 
 from asyncpg.pgproto.pgproto import timedelta
@@ -9,16 +8,19 @@ from fastapi import (
     Request
 )
 from fastapi.params import Depends
-from fastapi.security import HTTPBearer
 from httpx import AsyncClient
-from jose import jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.responses import RedirectResponse
 
-from app.auth.service import _process_google_auth_or_raise_exception, _decode_jwt_token, _get_token_from_credentials
-from app.core.config import settings
+from app.auth.service import (
+    _process_google_auth_or_raise_exception,
+    _decode_jwt_token,
+    _get_token_from_credentials,
+    _encode_jwt_token,
+    keyring
+)
 from app.depends.async_client import make_request
-from app.auth.schemas import TokenUserData
+from app.auth.schemas import AccessToken, JWKS, TokenUserData
 from app.mixins.db_mixin import get_db
 
 # Логгер для модуля
@@ -44,9 +46,6 @@ async def get_current_user_ws(token: str) -> TokenUserData | None:
     return await _decode_jwt_token(token)
 
 
-bearer_scheme = HTTPBearer()
-
-
 async def get_current_user(
         token: Annotated[str, Depends(_get_token_from_credentials)]
 ) -> TokenUserData | None:
@@ -67,7 +66,7 @@ async def get_current_user(
 
 
 @v1_auth_router.post(
-    path="/token", response_model=dict, status_code=status.HTTP_201_CREATED
+    path="/token", response_model=AccessToken, status_code=status.HTTP_201_CREATED
 )
 async def create_token(
         token_user_data: TokenUserData,
@@ -83,17 +82,7 @@ async def create_token(
         Returns:
             dict: A dictionary containing the "access_token" with the generated JWT token.
     """
-    user_data: dict = {
-        "sub": token_user_data.username,
-        "user_id": token_user_data.user_id,
-        "exp": datetime.now() + expires_delta
-    }
-    token: str = jwt.encode(
-        key=settings.SECRET_KEY, algorithm=settings.ALGORITHM, claims=user_data
-    )
-    return {
-        "access_token": token
-    }
+    return _encode_jwt_token(token_user_data=token_user_data, expires_delta=expires_delta)
 
 
 @v1_auth_router.get(path="/google/callback")
@@ -115,3 +104,16 @@ async def auth_google(
     """
     return await _process_google_auth_or_raise_exception(request, client, db)
 
+
+@v1_auth_router.get(path="/.well-known/jwks.json", response_model=JWKS)
+async def show_jwks() -> dict:
+    """
+        Publishes the public JWT verification keys as a JWK Set.
+
+        Edge services can verify tokens signed with ES256 or EdDSA keys without
+        calling this service. HS256 secrets are never published.
+
+        Returns:
+            dict: The JWK Set, {"keys": [...]}.
+    """
+    return keyring.jwks()
@@ -13,4 +13,12 @@ class GoogleUserData(BaseModel):
     given_name: str | None = None
     family_name: str | None = None
     verified_email: bool = True
-    picture: str | None = None
\ No newline at end of file
+    picture: str | None = None
+
+
+class AccessToken(BaseModel):
+    access_token: str
+
+
+class JWKS(BaseModel):
+    keys: list[dict]
@@ -1,47 +1,113 @@
 import logging
+import time
+from datetime import datetime
 from typing import Annotated
 
 from asyncpg.pgproto.pgproto import timedelta
 from authlib.integrations.base_client import OAuthError
 from fastapi import HTTPException
 from fastapi.params import Depends
-from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from httpx import AsyncClient
-from jose import jwt, JWTError
+from jose import JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 from starlette.requests import Request
 from starlette.responses import RedirectResponse
 
-from app.auth.router import logger, create_token, bearer_scheme
+from app.auth.google_jwks import JWKSCache
+from app.auth.keyring import KeyRing, load_keyring
 from app.auth.schemas import GoogleUserData, TokenUserData
+from app.auth.token_cache import TokenCache
 from app.core.config import oauth, settings
+from app.core.metrics import metrics
+from app.depends.async_client import shared_async_client
 from app.exceptions.common_exceptions import SomethingGotWrongHTTPException
 from app.user.service import UserManager
 
 logger = logging.getLogger(__name__)
 
+bearer_scheme = HTTPBearer()
+
+keyring: KeyRing = load_keyring(
+    secret_key=settings.SECRET_KEY,
+    algorithm=settings.ALGORITHM,
+    extra_keys=settings.JWT_KEYRING,
+    active_kid=settings.JWT_ACTIVE_KID
+)
+
+token_cache = TokenCache(
+    max_size=settings.AUTH_TOKEN_CACHE_SIZE, ttl=settings.AUTH_TOKEN_CACHE_TTL_S
+)
+
+jwt_decode_seconds = metrics.histogram(
+    "auth_jwt_decode_seconds", "Time to decode an accepted JWT, by token cache result.",
+    labelnames=("cache",)
+)
+jwt_decode_failures = metrics.counter(
+    "auth_jwt_decode_failures_total", "JWTs rejected as malformed, expired or wrongly signed."
+)
+metrics.gauge_callback(
+    "auth_token_cache_entries", "Decoded JWTs in the token cache.", callback=lambda: len(token_cache)
+)
+metrics.counter_callback(
+    "auth_token_cache_lookups_total", "Token cache lookups, by result.",
+    callback=lambda: {("hit",): token_cache.hits, ("miss",): token_cache.misses},
+    labelnames=("result",)
+)
+
+google_jwks = JWKSCache(
+    url=settings.GOOGLE_JWKS_URL,
+    http_client=shared_async_client,
+    default_ttl=settings.GOOGLE_JWKS_DEFAULT_TTL_S,
+    min_refresh_interval=settings.GOOGLE_JWKS_MIN_REFRESH_INTERVAL_S
+)
+# authorize_access_token verifies the ID token with authlib; give it the cached key set.
+oauth.google.fetch_jwk_set = google_jwks.fetch_jwk_set
+
+
+def _encode_jwt_token(token_user_data: TokenUserData, expires_delta: timedelta) -> dict:
+    user_data: dict = {
+        "sub": token_user_data.username,
+        "user_id": token_user_data.user_id,
+        "exp": datetime.now() + expires_delta
+    }
+    token: str = keyring.encode(claims=user_data)
+    return {
+        "access_token": token
+    }
+
+
 async def _decode_jwt_token(token: str):
+    started: float = time.perf_counter()
+    cached_user_data: TokenUserData | None = token_cache.get(token)
+    if cached_user_data is not None:
+        jwt_decode_seconds.observe(time.perf_counter() - started, labels=("hit",))
+        return cached_user_data
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Невалидный токен",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(
-            token=token, key=settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        username: str = payload.get("sub")
-        user_id: str = payload.get("user_id")
-        expire: timedelta = payload.get("exp")
-
-        if any([username, expire, user_id]) is None:
+        payload = keyring.decode(token)
+        username: str | None = payload.get("sub")
+        user_id: str | None = payload.get("user_id")
+        expire: float | None = payload.get("exp")
+
+        # Tokens without an expiry are never issued here and could not be evicted from the cache.
+        if username is None or user_id is None or expire is None:
+            jwt_decode_failures.inc()
             raise credentials_exception
-        return TokenUserData(
+        token_user_data = TokenUserData(
             username=username,
             user_id=user_id
         )
+        token_cache.put(token=token, token_user_data=token_user_data, exp=expire)
+        jwt_decode_seconds.observe(time.perf_counter() - started, labels=("miss",))
+        return token_user_data
     except JWTError:
+        jwt_decode_failures.inc()
         raise credentials_exception
 
 
@@ -64,6 +130,35 @@ async def _get_google_user_data_from_google_token(
         raise SomethingGotWrongHTTPException
 
 
+async def _get_google_user_data(token: dict, client: AsyncClient) -> GoogleUserData:
+    """
+    Reads the Google user from the ID token claims authlib has already verified,
+    calling the userinfo endpoint only when the token response carried no ID token.
+
+    Args:
+        token (dict): The OAuth token response.
+        client (AsyncClient): HTTP client for the userinfo fallback.
+
+    Returns:
+        GoogleUserData: The authenticated Google user.
+    """
+    user_info: dict | None = token.get("userinfo")
+    if not user_info:
+        logger.warning("Google token response has no verified ID token, using userinfo")
+        return await _get_google_user_data_from_google_token(
+            access_token=token["access_token"], client=client
+        )
+    return GoogleUserData(
+        id=user_info["sub"],
+        email=user_info["email"],
+        name=user_info.get("name"),
+        given_name=user_info.get("given_name"),
+        family_name=user_info.get("family_name"),
+        verified_email=user_info.get("email_verified", True),
+        picture=user_info.get("picture")
+    )
+
+
 def _handle_auth_errors(exception: Exception) -> None:
     """
     Centralized error handling for authentication-related exceptions.
@@ -88,24 +183,28 @@ def _handle_auth_errors(exception: Exception) -> None:
 
 async def _validate_google_token(request: Request) -> dict:
     """
-    Validates the Google OAuth token and returns user info.
+    Validates the Google OAuth token and returns it.
 
     Args:
         request (Request): The incoming request containing the OAuth token.
 
     Returns:
-        dict: User info from the token.
+        dict: The token response, with the verified ID token claims in "userinfo"
+            if Google returned an ID token.
 
     Raises:
-        HTTPException: If user info is missing or issuer is invalid.
+        HTTPException: If the token has neither an ID token nor an access token,
+            or the issuer is invalid.
     """
     token = await oauth.google.authorize_access_token(request)
     user_info = token.get("userinfo")
     if not user_info:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-        )
+        if not token.get("access_token"):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+            )
+        return token
     if user_info.get("iss") not in ["https://accounts.google.com", "accounts.google.com"]:
         logger.error(f"wrong iss {user_info.get('iss')}")
         raise HTTPException(
@@ -134,16 +233,16 @@ async def _process_google_auth_or_raise_exception(
     """
     try:
         token = await _validate_google_token(request)
-        google_user_data = await _get_google_user_data_from_google_token(
-            access_token=token["access_token"], client=client
-        )
+        google_user_data = await _get_google_user_data(token=token, client=client)
         user = await UserManager.get_or_create_user(
             db=db, google_user_data=google_user_data
         )
         token_user_data = TokenUserData(
             user_id=str(user.id), username=user.username
         )
-        jwt_token = await create_token(token_user_data=token_user_data)
+        jwt_token = _encode_jwt_token(
+            token_user_data=token_user_data, expires_delta=timedelta(minutes=20)
+        )
         return RedirectResponse(
             url=f"{settings.FRONTEND_SIMPLE_GROUP_URL}?token={jwt_token['access_token']}"
         )
@@ -0,0 +1,82 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from app.auth.schemas import TokenUserData
+
+
+class TokenCache:
+    """
+        Bounded LRU cache of decoded JWTs.
+
+        Entries are keyed by the SHA-256 digest of the token, so raw tokens are
+        never kept in memory. An entry lives for at most `ttl` seconds and never
+        past the token's own `exp`, after which the token is decoded (and
+        rejected) again. When full, the least recently used entry is evicted.
+
+        Args:
+            max_size (int): Maximum number of cached tokens, 0 disables the cache.
+            ttl (float): Maximum lifetime of an entry, in seconds.
+            clock (Callable[[], float]): Wall-clock time source comparable with `exp`, in seconds.
+    """
+
+    def __init__(
+            self,
+            max_size: int,
+            ttl: float,
+            clock: Callable[[], float] = time.time
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict[bytes, tuple[TokenUserData, float]] = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> TokenUserData | None:
+        key: bytes = self._key(token)
+        entry: tuple[TokenUserData, float] | None = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        token_user_data, expires_at = entry
+        if self.clock() >= expires_at:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return token_user_data
+
+    def put(self, token: str, token_user_data: TokenUserData, exp: float) -> None:
+        """
+            Caches a decoded token.
+
+            Args:
+                token (str): The encoded JWT.
+                token_user_data (TokenUserData): The data decoded from it.
+                exp (float): The token's expiration time as a Unix timestamp.
+        """
+        if self.max_size <= 0:
+            return
+        key: bytes = self._key(token)
+        self._entries[key] = (token_user_data, min(exp, self.clock() + self.ttl))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups: int = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,314 @@
+import asyncio
+import logging
+from typing import Callable
+from uuid import uuid4
+
+import asyncpg
+import orjson
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more.
+MAX_NOTIFY_PAYLOAD_BYTES: int = 7900
+
+Deliver = Callable[[str, str], int]
+
+# Raised when Postgres restarts, fails over or the network drops the connection.
+CONNECTION_ERRORS: tuple[type[Exception], ...] = (asyncpg.PostgresError, asyncpg.InterfaceError, OSError)
+
+
+class BroadcastBackend:
+    """
+        Delivers serialized chat frames to the members of a room.
+
+        The in-process implementation only reaches sockets of the current worker.
+        Subclasses additionally forward frames to the other workers.
+
+        Args:
+            deliver (Callable[[str, str], int]): Enqueues a frame for the local
+                members of a room, e.g. ConnectionRegistry.broadcast.
+    """
+
+    frames_dropped: int = 0
+
+    def __init__(self, deliver: Deliver) -> None:
+        self.deliver = deliver
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def publish(self, room_id: str, frame: str) -> None:
+        self.deliver(room_id, frame)
+
+
+class InProcessBroadcastBackend(BroadcastBackend):
+    pass
+
+
+class PostgresBroadcastBackend(BroadcastBackend):
+    """
+        Broadcast backend that fans frames out to every worker via Postgres LISTEN/NOTIFY.
+
+        Frames are delivered to local members right away and buffered for the
+        other workers. The buffer is flushed after `batch_delay` seconds, packing
+        as many frames into one NOTIFY as fit into the payload limit. A frame
+        too large for one NOTIFY is split into parts that the other workers
+        join again, so every member of a room sees the same events.
+        Every worker listens on the same channel and ignores its own notifications.
+
+        When either connection is lost, both are re-created with exponential
+        backoff. Meanwhile at most `max_pending` frames are buffered, later ones
+        only reach local members. Frames of a failed NOTIFY and notifications
+        sent while a worker reconnects are not delivered to the other workers.
+
+        Args:
+            deliver (Callable[[str, str], int]): Enqueues a frame for the local members of a room.
+            dsn (str): Postgres connection string understood by asyncpg.
+            channel (str): The LISTEN/NOTIFY channel name.
+            batch_delay (float): How long to collect frames before a NOTIFY, in seconds.
+            max_pending (int): Maximum number of frames buffered for the other workers.
+            reconnect_delay (float): First delay before reconnecting, doubled after every failure, in seconds.
+            max_reconnect_delay (float): Upper bound for the reconnect delay, in seconds.
+    """
+
+    def __init__(
+            self,
+            deliver: Deliver,
+            dsn: str,
+            channel: str,
+            batch_delay: float = 0.002,
+            max_pending: int = 10_000,
+            reconnect_delay: float = 0.5,
+            max_reconnect_delay: float = 30.0
+    ) -> None:
+        super().__init__(deliver=deliver)
+        self.dsn = dsn
+        self.channel = channel
+        self.batch_delay = batch_delay
+        self.max_pending = max_pending
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.worker_id: str = uuid4().hex
+        self.notifications_sent: int = 0
+        self.frames_dropped: int = 0
+        self.reconnects: int = 0
+        self._pending: list[tuple[str, str]] = []
+        self._has_pending = asyncio.Event()
+        self._connection_lost = asyncio.Event()
+        # worker id -> parts received so far of the frame that worker is sending in parts
+        self._partial_frames: dict[str, list[str]] = {}
+        self._listen_connection: asyncpg.Connection | None = None
+        self._notify_connection: asyncpg.Connection | None = None
+        self._flusher: asyncio.Task | None = None
+        self._running: bool = False
+
+    async def start(self) -> None:
+        self._has_pending = asyncio.Event()
+        self._connection_lost = asyncio.Event()
+        try:
+            await self._connect()
+        except CONNECTION_ERRORS:
+            self._terminate_connections()
+            raise
+        self._running = True
+        self._flusher = asyncio.create_task(self._flush_loop())
+        logger.info(f"Listening for chat broadcasts on {self.channel}")
+
+    async def stop(self) -> None:
+        self._running = False
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        try:
+            await self._flush()
+            if self._listen_connection is not None:
+                await self._listen_connection.remove_listener(self.channel, self._on_notification)
+                await self._listen_connection.close()
+            if self._notify_connection is not None:
+                await self._notify_connection.close()
+        except CONNECTION_ERRORS as e:
+            logger.error(f"Chat broadcast connections did not close cleanly: {type(e).__name__}: {e}")
+        self._terminate_connections()
+
+    def publish(self, room_id: str, frame: str) -> None:
+        self.deliver(room_id, frame)
+        if not self._running:
+            return
+        if len(self._pending) >= self.max_pending:
+            self.frames_dropped += 1
+            return
+        self._pending.append((room_id, frame))
+        self._has_pending.set()
+
+    async def _connect(self) -> None:
+        self._listen_connection = await asyncpg.connect(self.dsn)
+        self._listen_connection.add_termination_listener(self._on_connection_lost)
+        await self._listen_connection.add_listener(self.channel, self._on_notification)
+        self._notify_connection = await asyncpg.connect(self.dsn)
+        self._notify_connection.add_termination_listener(self._on_connection_lost)
+        self._connection_lost.clear()
+
+    def _terminate_connections(self) -> None:
+        for connection in (self._listen_connection, self._notify_connection):
+            if connection is not None and not connection.is_closed():
+                connection.remove_termination_listener(self._on_connection_lost)
+                connection.terminate()
+        self._listen_connection = None
+        self._notify_connection = None
+
+    def _on_connection_lost(self, connection: asyncpg.Connection) -> None:
+        if self._running:
+            self._connection_lost.set()
+            self._has_pending.set()
+
+    async def _reconnect(self) -> None:
+        """
+            Replaces both connections, retrying with exponential backoff until Postgres is reachable.
+        """
+        self._terminate_connections()
+        self._partial_frames.clear()
+        delay: float = self.reconnect_delay
+        while True:
+            try:
+                await self._connect()
+            except CONNECTION_ERRORS as e:
+                self._terminate_connections()
+                logger.error(
+                    f"Chat broadcast reconnect failed, retrying in {delay:.1f}s: {type(e).__name__}: {e}"
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+                continue
+            self.reconnects += 1
+            logger.info(f"Chat broadcast reconnected to {self.channel}")
+            return
+
+    def _encode_payloads(self, messages: list[tuple[str, str]]) -> list[tuple[str, int]]:
+        """
+            Packs messages into as few NOTIFY payloads as the size limit allows.
+
+            Args:
+                messages (list[tuple[str, str]]): (room id, frame) pairs in publish order.
+
+            Returns:
+                list[tuple[str, int]]: JSON payloads, each below MAX_NOTIFY_PAYLOAD_BYTES,
+                    with the number of frames each one completes.
+        """
+        header: bytes = orjson.dumps({"worker": self.worker_id, "messages": []})
+        payloads: list[tuple[str, int]] = []
+        batch: list[bytes] = []
+        batch_size: int = len(header)
+        for message in messages:
+            encoded: bytes = orjson.dumps(message)
+            if len(header) + len(encoded) >= MAX_NOTIFY_PAYLOAD_BYTES:
+                if batch:
+                    payloads.append((self._join_payload(batch), len(batch)))
+                    batch, batch_size = [], len(header)
+                payloads.extend(self._encode_parts(room_id=message[0], frame=message[1]))
+                continue
+            if batch and batch_size + len(encoded) + 1 >= MAX_NOTIFY_PAYLOAD_BYTES:
+                payloads.append((self._join_payload(batch), len(batch)))
+                batch, batch_size = [], len(header)
+            batch.append(encoded)
+            batch_size += len(encoded) + 1
+        if batch:
+            payloads.append((self._join_payload(batch), len(batch)))
+        return payloads
+
+    def _encode_parts(self, room_id: str, frame: str) -> list[tuple[str, int]]:
+        # A character takes at most 6 bytes in JSON ("\u001f"), so a part never exceeds the limit.
+        part_size: int = (MAX_NOTIFY_PAYLOAD_BYTES - 200 - len(room_id.encode()) * 6) // 6
+        parts: list[str] = [frame[i:i + part_size] for i in range(0, len(frame), part_size)]
+        return [
+            (
+                orjson.dumps(
+                    {"worker": self.worker_id, "part": [index, len(parts), room_id, part]}
+                ).decode(),
+                int(index == len(parts) - 1)
+            )
+            for index, part in enumerate(parts)
+        ]
+
+    def _join_payload(self, batch: list[bytes]) -> str:
+        return (
+            b'{"worker":' + orjson.dumps(self.worker_id)
+            + b',"messages":[' + b",".join(batch) + b"]}"
+        ).decode()
+
+    async def _flush(self) -> None:
+        self._has_pending.clear()
+        if not self._pending or self._notify_connection is None:
+            return
+        messages, self._pending = self._pending, []
+        payloads: list[tuple[str, int]] = self._encode_payloads(messages)
+        for index, (payload, _) in enumerate(payloads):
+            try:
+                await self._notify_connection.execute(
+                    "SELECT pg_notify($1, $2)", self.channel, payload
+                )
+            except CONNECTION_ERRORS:
+                self.frames_dropped += sum(frames for _, frames in payloads[index:])
+                raise
+            self.notifications_sent += 1
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await self._has_pending.wait()
+            await asyncio.sleep(self.batch_delay)
+            if self._connection_lost.is_set():
+                logger.error(f"Chat broadcast connection to {self.channel} lost, reconnecting")
+                await self._reconnect()
+            try:
+                await self._flush()
+            except CONNECTION_ERRORS as e:
+                logger.error(f"Chat broadcast NOTIFY failed: {type(e).__name__}: {e}", exc_info=True)
+                await self._reconnect()
+
+    def _on_notification(
+            self, connection: asyncpg.Connection, pid: int, channel: str, payload: str
+    ) -> None:
+        data: dict = orjson.loads(payload)
+        worker: str = data["worker"]
+        if worker == self.worker_id:
+            return
+        if "part" in data:
+            self._on_part(worker, *data["part"])
+            return
+        for room_id, frame in data["messages"]:
+            self.deliver(room_id, frame)
+
+    def _on_part(self, worker: str, index: int, count: int, room_id: str, part: str) -> None:
+        parts: list[str] = self._partial_frames.setdefault(worker, [])
+        if index == 0:
+            parts.clear()
+        elif len(parts) != index:
+            # A part was missed, e.g. while this worker reconnected, so the frame cannot be joined.
+            del self._partial_frames[worker]
+            return
+        parts.append(part)
+        if len(parts) == count:
+            del self._partial_frames[worker]
+            self.deliver(room_id, "".join(parts))
+
+
+def make_broadcast_backend(deliver: Deliver) -> BroadcastBackend:
+    if settings.CHAT_BROADCAST_BACKEND == "postgres":
+        return PostgresBroadcastBackend(
+            deliver=deliver,
+            dsn=settings.DATABASE_DSN,
+            channel=settings.CHAT_BROADCAST_CHANNEL,
+            batch_delay=settings.CHAT_BROADCAST_BATCH_DELAY_MS / 1000,
+            max_pending=settings.CHAT_BROADCAST_MAX_PENDING,
+            reconnect_delay=settings.CHAT_BROADCAST_RECONNECT_DELAY_S,
+            max_reconnect_delay=settings.CHAT_BROADCAST_MAX_RECONNECT_DELAY_S
+        )
+    return InProcessBroadcastBackend(deliver=deliver)
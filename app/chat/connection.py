@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import time
+from enum import Enum
+
+from fastapi import WebSocket
+from starlette.websockets import WebSocketState
+
+from app.auth.schemas import TokenUserData
+from app.chat.encoding import encode_frame, join_frames
+from app.chat.schemas import ChatEncoding
+
+logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy(str, Enum):
+    drop_oldest = "drop_oldest"
+    disconnect = "disconnect"
+
+
+class BroadcastStats:
+    """
+        Process-wide counters for outbound chat frames.
+
+        Attributes:
+            queued (int): Frames accepted into outbound queues.
+            dropped (int): Frames discarded because a queue was full.
+            disconnected (int): Connections closed by the overflow policy.
+    """
+
+    def __init__(self) -> None:
+        self.queued: int = 0
+        self.dropped: int = 0
+        self.disconnected: int = 0
+
+
+broadcast_stats = BroadcastStats()
+
+
+class ChatConnection:
+    """
+        A WebSocket with its own bounded outbound queue and writer task.
+
+        Broadcasts only enqueue frames, so a slow client delays nobody but itself.
+        When the queue is full the overflow policy either drops the oldest frame
+        or closes the socket with the configured close code.
+
+        With a coalesce window the writer waits that long after the first frame
+        and sends everything queued meanwhile as one array frame, keeping
+        the original order.
+
+        Args:
+            websocket (WebSocket): The accepted WebSocket connection.
+            user (TokenUserData): The authenticated owner of the connection.
+            max_queue_size (int): Maximum number of frames waiting to be sent.
+            overflow_policy (OverflowPolicy): What to do when the queue is full.
+            overflow_close_code (int): Close code used by the disconnect policy.
+            coalesce_window (float | None): Seconds to collect frames into one array frame,
+                None sends every frame on its own.
+            encoding (ChatEncoding): Wire format negotiated by the client; JSON frames go out
+                as text, MessagePack frames as binary.
+            presence (bool): Receive presence diffs instead of join and leave notices.
+    """
+
+    def __init__(
+            self,
+            websocket: WebSocket,
+            user: TokenUserData,
+            max_queue_size: int,
+            overflow_policy: OverflowPolicy = OverflowPolicy.drop_oldest,
+            overflow_close_code: int = 1013,
+            coalesce_window: float | None = None,
+            encoding: ChatEncoding = ChatEncoding.json,
+            presence: bool = False
+    ) -> None:
+        self.websocket = websocket
+        self.user = user
+        self.overflow_policy = overflow_policy
+        self.overflow_close_code = overflow_close_code
+        self.coalesce_window = coalesce_window
+        self.encoding = encoding
+        self.presence = presence
+        self.queued: int = 0
+        self.dropped: int = 0
+        self.sent_frames: int = 0
+        self.is_closing: bool = False
+        self.last_received_at: float = time.monotonic()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._writer: asyncio.Task | None = None
+        self._closer: asyncio.Task | None = None
+
+    async def send_now(self, frames: list[str]) -> None:
+        """
+            Sends JSON frames directly in the connection's encoding, ahead of
+            everything queued so far.
+
+            Used to replay recent history before the writer task is started, so
+            the replay cannot be pushed out of the queue by live traffic.
+
+            Args:
+                frames (list[str]): JSON frames in the order they were produced.
+        """
+        if not frames:
+            return
+        encoded: list[str | bytes] = [encode_frame(frame, self.encoding) for frame in frames]
+        if self.coalesce_window is not None:
+            encoded = [join_frames(encoded)]
+        for frame in encoded:
+            await self._send(frame)
+
+    def touch(self) -> None:
+        """
+            Records that the client has just sent something, for the idle check.
+        """
+        self.last_received_at = time.monotonic()
+
+    def start(self) -> None:
+        self._writer = asyncio.create_task(self._write_loop())
+
+    async def stop(self) -> None:
+        self.is_closing = True
+        if self._writer is None:
+            return
+        self._writer.cancel()
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+        self._writer = None
+
+    def enqueue(self, frame: str | bytes) -> bool:
+        """
+            Puts a frame into the outbound queue without waiting.
+
+            Args:
+                frame (str | bytes): The frame, already serialized in the connection's encoding.
+
+            Returns:
+                bool: True if the frame was queued, False if it was rejected.
+        """
+        if self.is_closing:
+            return False
+        try:
+            self._queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            if self.overflow_policy == OverflowPolicy.disconnect:
+                self._disconnect_slow_consumer()
+                return False
+            self._queue.get_nowait()
+            self._queue.put_nowait(frame)
+            self.dropped += 1
+            broadcast_stats.dropped += 1
+        self.queued += 1
+        broadcast_stats.queued += 1
+        return True
+
+    def _disconnect_slow_consumer(self) -> None:
+        self.is_closing = True
+        self.dropped += 1
+        broadcast_stats.dropped += 1
+        broadcast_stats.disconnected += 1
+        logger.warning(
+            f"{self.user.username} is too slow, closing with code {self.overflow_close_code}"
+        )
+        self._closer = asyncio.create_task(self.close(code=self.overflow_close_code))
+
+    async def close(self, code: int) -> None:
+        await self.stop()
+        if self.websocket.application_state == WebSocketState.CONNECTED:
+            try:
+                await self.websocket.close(code=code)
+            except (RuntimeError, OSError):
+                pass
+
+    async def _send(self, frame: str | bytes) -> None:
+        if isinstance(frame, bytes):
+            await self.websocket.send_bytes(frame)
+        else:
+            await self.websocket.send_text(frame)
+        self.sent_frames += 1
+
+    async def _next_coalesced_frame(self) -> str | bytes:
+        frames: list = [await self._queue.get()]
+        await asyncio.sleep(self.coalesce_window)
+        while not self._queue.empty():
+            frames.append(self._queue.get_nowait())
+        return join_frames(frames)
+
+    async def _write_loop(self) -> None:
+        while True:
+            if self.coalesce_window is None:
+                frame = await self._queue.get()
+            else:
+                frame = await self._next_coalesced_frame()
+            try:
+                await self._send(frame)
+            except Exception as e:
+                logger.info(f"Stop writing to {self.user.username}: {type(e).__name__}")
+                self.is_closing = True
+                return
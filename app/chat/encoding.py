@@ -0,0 +1,125 @@
+import msgpack
+import orjson
+
+from app.chat.schemas import ChatEncoding, ChatEvent, ChatEventType, PresenceDiff
+
+# `type` is the first field of every event model, so every encoded frame starts with it.
+_TYPE_PREFIX: str = '{"type":"'
+_MESSAGE_FRAME_PREFIX: str = f'{_TYPE_PREFIX}{ChatEventType.message.value}"'
+
+
+def encode_chat_event(chat_event: ChatEvent | PresenceDiff) -> str:
+    """
+        Serializes a chat event into a JSON text frame.
+
+        The result is computed once per broadcast and the same string is written
+        to every recipient.
+
+        Args:
+            chat_event (ChatEvent | PresenceDiff): The event to serialize.
+
+        Returns:
+            str: The JSON text frame.
+    """
+    return orjson.dumps(chat_event.model_dump(mode="json")).decode()
+
+
+def is_message_frame(frame: str) -> bool:
+    """
+        Tells whether an encoded frame holds a user message, without parsing it.
+
+        Args:
+            frame (str): A frame produced by encode_chat_event.
+
+        Returns:
+            bool: True for ChatEventType.message frames.
+    """
+    return frame.startswith(_MESSAGE_FRAME_PREFIX)
+
+
+def frame_type(frame: str) -> str:
+    """
+        Reads the event type of an encoded frame, without parsing it.
+
+        Args:
+            frame (str): A frame produced by encode_chat_event.
+
+        Returns:
+            str: The value of the frame's ChatEventType.
+    """
+    return frame[len(_TYPE_PREFIX):frame.index('"', len(_TYPE_PREFIX))]
+
+
+def json_frame_to_msgpack(frame: str) -> bytes:
+    """
+        Converts a JSON frame into the compact MessagePack frame.
+
+        The compact frame is an array instead of a map and flattens the sender:
+        [type, content, sender user_id | None, sender username | None].
+        Presence diffs become [type, joined user ids, left user ids].
+
+        Args:
+            frame (str): A frame produced by encode_chat_event.
+
+        Returns:
+            bytes: The MessagePack binary frame.
+    """
+    event: dict = orjson.loads(frame)
+    if event["type"] == ChatEventType.presence:
+        return msgpack.packb([event["type"], event["joined"], event["left"]])
+    sender: dict | None = event["sender"]
+    return msgpack.packb([
+        event["type"],
+        event["content"],
+        sender["user_id"] if sender else None,
+        sender["username"] if sender else None,
+    ])
+
+
+def encode_frame(frame: str, encoding: ChatEncoding) -> str | bytes:
+    if encoding == ChatEncoding.msgpack:
+        return json_frame_to_msgpack(frame)
+    return frame
+
+
+def join_frames(frames: list[str] | list[bytes]) -> str | bytes:
+    """
+        Combines already encoded frames into one array frame without re-serializing them.
+
+        Args:
+            frames (list[str] | list[bytes]): JSON or MessagePack frames of one encoding.
+
+        Returns:
+            str | bytes: A JSON array or a MessagePack array holding the frames.
+    """
+    if isinstance(frames[0], bytes):
+        return msgpack.Packer().pack_array_header(len(frames)) + b"".join(frames)
+    return "[" + ",".join(frames) + "]"
+
+
+def decode_client_message(data: str | bytes, encoding: ChatEncoding) -> dict:
+    """
+        Decodes a message sent by a client in its negotiated encoding.
+
+        Args:
+            data (str | bytes): The received text or binary frame.
+            encoding (ChatEncoding): The encoding negotiated by the client.
+
+        Returns:
+            dict: The decoded client message, with a string "message".
+
+        Raises:
+            ValueError: If the data is not valid JSON or MessagePack, or not an
+                object with a string "message".
+    """
+    try:
+        if encoding == ChatEncoding.msgpack:
+            message = msgpack.unpackb(data)
+        else:
+            message = orjson.loads(data)
+    except TypeError as e:
+        # MessagePack maps with unhashable keys.
+        raise ValueError(f"Invalid client message: {e}") from e
+    if not isinstance(message, dict) or not isinstance(message.get("message"), str):
+        raise ValueError("Client message must be an object with a string \"message\"")
+    return message
@@ -0,0 +1,150 @@
+import asyncio
+import datetime
+import logging
+import uuid
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError, OperationalError, SQLAlchemyError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.auth.schemas import TokenUserData
+from app.chat.model import Message
+
+logger = logging.getLogger(__name__)
+
+
+def _is_transient(error: Exception) -> bool:
+    """
+        Tells a failure worth retrying (database down, connection dropped, pool exhausted)
+        from a batch the database refuses, e.g. a DataError or IntegrityError.
+    """
+    if isinstance(error, (OSError, OperationalError, PoolTimeoutError)):
+        return True
+    return isinstance(error, DBAPIError) and error.connection_invalidated
+
+
+class MessageHistoryWriter:
+    """
+        Write-behind buffer that persists chat messages in batches.
+
+        The receive loop only appends to an in-memory buffer. A background task
+        inserts the buffered rows with one executemany when `batch_size` messages
+        are waiting or `flush_interval` seconds have passed, whichever comes first.
+        If the database is unavailable the rows are kept for the next attempt, up
+        to `max_buffer_size`; beyond that the oldest rows are dropped. A batch the
+        database refuses is split in halves until the offending rows are found;
+        those are logged, counted in `rejected` and dropped, the rest is saved.
+
+        Args:
+            session_maker (async_sessionmaker): Factory for database sessions.
+            batch_size (int): Number of buffered messages that triggers a flush.
+            flush_interval (float): Maximum time a message waits in the buffer, in seconds.
+            max_buffer_size (int): Maximum number of messages kept in memory.
+    """
+
+    def __init__(
+            self,
+            session_maker: async_sessionmaker,
+            batch_size: int,
+            flush_interval: float,
+            max_buffer_size: int
+    ) -> None:
+        self.session_maker = session_maker
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer_size = max_buffer_size
+        self.written: int = 0
+        self.dropped: int = 0
+        self.rejected: int = 0
+        self._buffer: list[dict] = []
+        self._batch_ready = asyncio.Event()
+        self._flusher: asyncio.Task | None = None
+
+    def add(self, room_id: str, sender: TokenUserData, content: str) -> None:
+        self._buffer.append({
+            "id": uuid.uuid4(),
+            "created_at": datetime.datetime.now(datetime.timezone.utc),
+            "room_id": room_id,
+            "sender_id": sender.user_id,
+            "sender_username": sender.username,
+            "content": content,
+        })
+        if len(self._buffer) > self.max_buffer_size:
+            overflow: int = len(self._buffer) - self.max_buffer_size
+            del self._buffer[:overflow]
+            self.dropped += overflow
+        if len(self._buffer) >= self.batch_size:
+            self._batch_ready.set()
+
+    async def start(self) -> None:
+        # Events bind to the loop that first waits on them, and the app may be restarted on a new loop.
+        self._batch_ready = asyncio.Event()
+        if len(self._buffer) >= self.batch_size:
+            self._batch_ready.set()
+        self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        while self._buffer:
+            if not await self.flush():
+                logger.error(f"{len(self._buffer)} chat messages were not saved")
+                break
+
+    async def flush(self) -> bool:
+        """
+            Inserts up to `batch_size` buffered messages in one statement.
+
+            Returns:
+                bool: False if the database was unavailable and the unsaved messages were put back.
+        """
+        batch: list[dict] = self._buffer[:self.batch_size]
+        del self._buffer[:self.batch_size]
+        if len(self._buffer) < self.batch_size:
+            self._batch_ready.clear()
+        # A stack of row chunks, the next chunk to insert on top.
+        chunks: list[list[dict]] = [batch] if batch else []
+        while chunks:
+            rows: list[dict] = chunks.pop()
+            try:
+                await self._insert(rows)
+            except (SQLAlchemyError, OSError) as e:
+                if _is_transient(e):
+                    logger.error(f"Could not save chat messages: {type(e).__name__}: {e}")
+                    self._buffer[:0] = rows + [row for chunk in reversed(chunks) for row in chunk]
+                    return False
+                if len(rows) == 1:
+                    self._reject(row=rows[0], error=e)
+                    continue
+                middle: int = len(rows) // 2
+                chunks.append(rows[middle:])
+                chunks.append(rows[:middle])
+                continue
+            self.written += len(rows)
+        return True
+
+    async def _insert(self, rows: list[dict]) -> None:
+        async with self.session_maker() as session:
+            await session.execute(insert(Message), rows)
+            await session.commit()
+
+    def _reject(self, row: dict, error: Exception) -> None:
+        self.rejected += 1
+        logger.error(
+            f"Chat message {row['id']} from {row['sender_id']} in room {row['room_id']} "
+            f"was refused by the database and dropped: {type(error).__name__}: {getattr(error, 'orig', error)}"
+        )
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), timeout=self.flush_interval)
+            except TimeoutError:
+                pass
+            if not await self.flush():
+                await asyncio.sleep(self.flush_interval)
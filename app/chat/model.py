@@ -0,0 +1,20 @@
+from sqlalchemy import String, Text, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.mixins.model_mixins.id_mixins import IDMixin
+from app.mixins.model_mixins.timestamps_mixins import TimestampsMixin
+
+from app.core.base import Base
+
+
+class Message(IDMixin, TimestampsMixin, Base):
+    __tablename__ = "messages"
+    __table_args__ = (
+        # Serves keyset pagination: WHERE room_id = ? AND (created_at, id) < (?, ?)
+        Index("ix_messages_room_id_created_at_id", "room_id", "created_at", "id"),
+    )
+
+    room_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    sender_id: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    sender_username: Mapped[str] = mapped_column(String(20), nullable=False)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
@@ -0,0 +1,99 @@
+import asyncio
+from typing import Callable
+
+from app.auth.schemas import TokenUserData
+from app.chat.encoding import encode_chat_event
+from app.chat.schemas import PresenceDiff
+
+Publish = Callable[[str, str], None]
+
+
+class PresenceTracker:
+    """
+        Keeps the set of users present in every room and publishes compact
+        join/leave diffs.
+
+        A user is present while at least one of their connections is in the
+        room. Changes are collected for `diff_window` seconds and published as
+        one PresenceDiff per room, so a mass reconnect costs every member one
+        frame instead of one frame per joining user. A user who joins and
+        leaves within the same window does not appear in the diff at all.
+
+        Args:
+            publish (Callable[[str, str], None]): Publishes a serialized frame to a room,
+                e.g. BroadcastBackend.publish.
+            diff_window (float): How long changes are collected into one diff, in seconds.
+    """
+
+    def __init__(self, publish: Publish, diff_window: float) -> None:
+        self.publish = publish
+        self.diff_window = diff_window
+        self.diffs_published: int = 0
+        # room id -> user id -> (user, number of the user's connections in the room)
+        self._rooms: dict[str, dict[str, tuple[TokenUserData, int]]] = {}
+        # room id -> user id -> whether the user was present when the window opened
+        self._pending: dict[str, dict[str, bool]] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+
+    def join(self, room_id: str, user: TokenUserData) -> None:
+        members: dict[str, tuple[TokenUserData, int]] = self._rooms.setdefault(room_id, {})
+        entry: tuple[TokenUserData, int] | None = members.get(user.user_id)
+        if entry is not None:
+            members[user.user_id] = (entry[0], entry[1] + 1)
+            return
+        members[user.user_id] = (user, 1)
+        self._record_change(room_id=room_id, user_id=user.user_id, was_present=False)
+
+    def leave(self, room_id: str, user: TokenUserData) -> None:
+        members: dict[str, tuple[TokenUserData, int]] | None = self._rooms.get(room_id)
+        if members is None or user.user_id not in members:
+            return
+        present_user, connections = members[user.user_id]
+        if connections > 1:
+            members[user.user_id] = (present_user, connections - 1)
+            return
+        del members[user.user_id]
+        if not members:
+            del self._rooms[room_id]
+        self._record_change(room_id=room_id, user_id=user.user_id, was_present=True)
+
+    def members(self, room_id: str) -> list[TokenUserData]:
+        return [user for user, _ in self._rooms.get(room_id, {}).values()]
+
+    def member_ids(self, room_id: str) -> list[str]:
+        return list(self._rooms.get(room_id, ()))
+
+    def flush(self) -> None:
+        """
+            Publishes the changes collected so far, one diff per room.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        for room_id, changes in pending.items():
+            members: dict[str, tuple[TokenUserData, int]] = self._rooms.get(room_id, {})
+            joined: list[str] = [
+                user_id for user_id, was_present in changes.items()
+                if not was_present and user_id in members
+            ]
+            left: list[str] = [
+                user_id for user_id, was_present in changes.items()
+                if was_present and user_id not in members
+            ]
+            if joined or left:
+                self.publish(room_id, encode_chat_event(PresenceDiff(joined=joined, left=left)))
+                self.diffs_published += 1
+
+    def stop(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._pending.clear()
+
+    def _record_change(self, room_id: str, user_id: str, was_present: bool) -> None:
+        self._pending.setdefault(room_id, {}).setdefault(user_id, was_present)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.diff_window, self.flush
+            )
@@ -0,0 +1,87 @@
+import time
+from typing import Callable
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated_at", "violations", "connections")
+
+    def __init__(self, tokens: float, updated_at: float) -> None:
+        self.tokens = tokens
+        self.updated_at = updated_at
+        self.violations: int = 0
+        self.connections: int = 0
+
+
+class TokenBucketLimiter:
+    """
+        Per-user token buckets for messages sent to chat rooms.
+
+        Every user may send `burst` messages at once and `rate` messages per
+        second on average, shared by all of their connections. A bucket lives
+        while the user has an open connection, so memory is O(1) per active
+        user. Rejections are counted as violations until the bucket has fully
+        refilled, i.e. the user has been quiet for burst / rate seconds.
+
+        All methods are synchronous and never await, so no locking is required.
+
+        Args:
+            rate (float): Tokens added per second.
+            burst (int): Bucket capacity.
+            clock (Callable[[], float]): Monotonic time source, in seconds.
+    """
+
+    def __init__(
+            self,
+            rate: float,
+            burst: int,
+            clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.rejected: int = 0
+        self._buckets: dict[str, _Bucket] = {}
+
+    def connect(self, user_id: str) -> None:
+        bucket: _Bucket | None = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = self._buckets[user_id] = _Bucket(tokens=self.burst, updated_at=self.clock())
+        bucket.connections += 1
+
+    def disconnect(self, user_id: str) -> None:
+        bucket: _Bucket | None = self._buckets.get(user_id)
+        if bucket is None:
+            return
+        bucket.connections -= 1
+        if bucket.connections <= 0:
+            del self._buckets[user_id]
+
+    def allow(self, user_id: str) -> bool:
+        """
+            Takes a token from the user's bucket.
+
+            Args:
+                user_id (str): The sender, connected with connect() beforehand.
+
+            Returns:
+                bool: True if the message may be sent, False if it exceeds the limit.
+        """
+        bucket: _Bucket = self._buckets[user_id]
+        now: float = self.clock()
+        bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated_at) * self.rate)
+        bucket.updated_at = now
+        if bucket.tokens >= self.burst:
+            bucket.violations = 0
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return True
+        bucket.violations += 1
+        self.rejected += 1
+        return False
+
+    def violations(self, user_id: str) -> int:
+        bucket: _Bucket | None = self._buckets.get(user_id)
+        return bucket.violations if bucket is not None else 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import time
+from typing import Callable
+
+from fastapi import status
+from starlette.websockets import WebSocketState
+
+from app.chat.connection import ChatConnection
+from app.chat.registry import ConnectionRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionReaper:
+    """
+        Periodically removes dead and idle connections from the registry.
+
+        A connection is dead when its writer has given up (the socket failed or
+        the overflow policy closed it) or the socket is no longer connected; such
+        connections only waste time on every broadcast. A connection is idle when
+        the client has sent nothing for `idle_timeout` seconds. Reaped
+        connections leave all their rooms right away and their sockets are closed,
+        so the receive loop ends and runs its own cleanup as well.
+
+        Unresponsive peers are detected by the WebSocket ping/pong of the server
+        (WS_PING_INTERVAL / WS_PING_TIMEOUT), which ends their receive loop.
+
+        Args:
+            registry (ConnectionRegistry): The registry to sweep.
+            leave (Callable[[ChatConnection], set[str]]): Removes a connection from all
+                its rooms, e.g. the router's leave helper that also updates presence.
+            interval (float): Seconds between sweeps.
+            idle_timeout (float): Seconds without client messages before a connection
+                is reaped, 0 disables the idle check.
+    """
+
+    def __init__(
+            self,
+            registry: ConnectionRegistry,
+            leave: Callable[[ChatConnection], set[str]],
+            interval: float,
+            idle_timeout: float = 0
+    ) -> None:
+        self.registry = registry
+        self.leave = leave
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self.reaped_dead: int = 0
+        self.reaped_idle: int = 0
+        self._sweeper: asyncio.Task | None = None
+
+    @property
+    def live(self) -> int:
+        return len(self.registry)
+
+    async def start(self) -> None:
+        self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self) -> None:
+        if self._sweeper is None:
+            return
+        self._sweeper.cancel()
+        try:
+            await self._sweeper
+        except asyncio.CancelledError:
+            pass
+        self._sweeper = None
+
+    async def sweep(self) -> int:
+        """
+            Reaps every dead or idle connection once.
+
+            Returns:
+                int: Number of reaped connections.
+        """
+        now: float = time.monotonic()
+        reaped: list[tuple[ChatConnection, int]] = []
+        for connection in self.registry.connections():
+            if (
+                connection.is_closing
+                or connection.websocket.application_state != WebSocketState.CONNECTED
+            ):
+                self.reaped_dead += 1
+                reaped.append((connection, status.WS_1011_INTERNAL_ERROR))
+            elif self.idle_timeout and now - connection.last_received_at > self.idle_timeout:
+                self.reaped_idle += 1
+                reaped.append((connection, status.WS_1001_GOING_AWAY))
+        for connection, _ in reaped:
+            self.leave(connection)
+        for connection, code in reaped:
+            await connection.close(code=code)
+        if reaped:
+            logger.info(
+                f"Reaped {len(reaped)} chat connections, {self.live} live, "
+                f"{self.reaped_dead} dead and {self.reaped_idle} idle reaped in total"
+            )
+        return len(reaped)
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Chat connection sweep failed: {type(e).__name__}: {e}", exc_info=True)
@@ -0,0 +1,55 @@
+from collections import OrderedDict, deque
+
+
+class RecentHistory:
+    """
+        Per-room ring buffers of the last serialized chat frames.
+
+        New members get the recent conversation replayed straight from memory.
+        Each room keeps at most `max_events` frames. When all rooms together
+        hold more than `max_bytes` of frames, the oldest frames of the rooms that
+        have been quiet the longest are dropped first.
+
+        Args:
+            max_events (int): Number of frames kept per room.
+            max_bytes (int): Upper bound for the size of all kept frames, in bytes.
+    """
+
+    def __init__(self, max_events: int, max_bytes: int) -> None:
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.total_bytes: int = 0
+        self._rooms: OrderedDict[str, deque[str]] = OrderedDict()
+
+    def append(self, room_id: str, frame: str) -> None:
+        if self.max_events <= 0:
+            return
+        frames: deque[str] | None = self._rooms.get(room_id)
+        if frames is None:
+            frames = self._rooms[room_id] = deque()
+        else:
+            self._rooms.move_to_end(room_id)
+        if len(frames) == self.max_events:
+            self.total_bytes -= len(frames.popleft())
+        frames.append(frame)
+        # len() of a str counts characters, which is close enough for a memory bound.
+        self.total_bytes += len(frame)
+        self._evict()
+
+    def replay(self, room_id: str) -> list[str]:
+        return list(self._rooms.get(room_id, ()))
+
+    def clear(self) -> None:
+        self._rooms.clear()
+        self.total_bytes = 0
+
+    def _evict(self) -> None:
+        while self.total_bytes > self.max_bytes and self._rooms:
+            oldest_room_id: str = next(iter(self._rooms))
+            frames: deque[str] = self._rooms[oldest_room_id]
+            self.total_bytes -= len(frames.popleft())
+            if not frames:
+                del self._rooms[oldest_room_id]
+
+    def __len__(self) -> int:
+        return len(self._rooms)
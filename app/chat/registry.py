@@ -0,0 +1,101 @@
+from app.chat.connection import ChatConnection
+from app.chat.encoding import json_frame_to_msgpack
+from app.chat.schemas import ChatEncoding
+
+
+class ConnectionRegistry:
+    """
+        Keeps track of which connections are in which chat rooms.
+
+        Two indexes are maintained side by side: room id -> members and
+        member -> room ids. Joining, leaving and broadcasting only touch the
+        sets of the affected room, so their cost depends on the room size and
+        not on the number of connections in the worker.
+
+        All methods are synchronous and never await, so within one event loop
+        every call is atomic and no locking is required.
+    """
+
+    def __init__(self) -> None:
+        self._rooms: dict[str, set[ChatConnection]] = {}
+        self._memberships: dict[ChatConnection, set[str]] = {}
+
+    def join(self, room_id: str, connection: ChatConnection) -> None:
+        self._rooms.setdefault(room_id, set()).add(connection)
+        self._memberships.setdefault(connection, set()).add(room_id)
+
+    def leave(self, room_id: str, connection: ChatConnection) -> None:
+        members: set[ChatConnection] | None = self._rooms.get(room_id)
+        if members is not None:
+            members.discard(connection)
+            if not members:
+                del self._rooms[room_id]
+        room_ids: set[str] | None = self._memberships.get(connection)
+        if room_ids is not None:
+            room_ids.discard(room_id)
+            if not room_ids:
+                del self._memberships[connection]
+
+    def leave_all(self, connection: ChatConnection) -> set[str]:
+        """
+            Removes a connection from every room it has joined.
+
+            Args:
+                connection (ChatConnection): The connection to remove.
+
+            Returns:
+                set[str]: Ids of the rooms the connection has left.
+        """
+        room_ids: set[str] = self._memberships.pop(connection, set())
+        for room_id in room_ids:
+            members: set[ChatConnection] = self._rooms[room_id]
+            members.discard(connection)
+            if not members:
+                del self._rooms[room_id]
+        return room_ids
+
+    def members(self, room_id: str) -> frozenset[ChatConnection]:
+        return frozenset(self._rooms.get(room_id, ()))
+
+    def rooms_of(self, connection: ChatConnection) -> frozenset[str]:
+        return frozenset(self._memberships.get(connection, ()))
+
+    def connections(self) -> frozenset[ChatConnection]:
+        return frozenset(self._memberships)
+
+    def room_ids(self) -> frozenset[str]:
+        return frozenset(self._rooms)
+
+    def broadcast(self, room_id: str, frame: str, presence: bool | None = None) -> int:
+        """
+            Enqueues an already serialized frame for every member of a room.
+
+            The MessagePack variant is built at most once per broadcast and only
+            if some member negotiated it.
+
+            Args:
+                room_id (str): The room to broadcast to.
+                frame (str): The JSON frame.
+                presence (bool | None): None sends to every member, True only to members
+                    subscribed to presence diffs, False only to the others.
+
+            Returns:
+                int: Number of connections that accepted the frame.
+        """
+        delivered: int = 0
+        binary_frame: bytes | None = None
+        for connection in self._rooms.get(room_id, ()):
+            if presence is not None and connection.presence != presence:
+                continue
+            if connection.encoding == ChatEncoding.msgpack:
+                if binary_frame is None:
+                    binary_frame = json_frame_to_msgpack(frame)
+                accepted: bool = connection.enqueue(binary_frame)
+            else:
+                accepted = connection.enqueue(frame)
+            if accepted:
+                delivered += 1
+        return delivered
+
+    def __len__(self) -> int:
+        return len(self._memberships)
@@ -1,13 +1,36 @@
 import logging
+import time
 from http.client import HTTPException
 from typing import Annotated
 
-from fastapi import APIRouter, WebSocket, WebSocketException, WebSocketDisconnect, status, Depends
+from fastapi import APIRouter, WebSocket, WebSocketException, WebSocketDisconnect, status, Depends, Path, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from websockets.exceptions import ConnectionClosed
 
 from app.auth.router import get_current_user_ws, get_current_user
 from app.auth.schemas import TokenUserData
-from app.chat.schemas import ChatEventType, ChatEvent
+from app.chat.broadcast import BroadcastBackend, make_broadcast_backend
+from app.chat.connection import ChatConnection, OverflowPolicy, broadcast_stats
+from app.chat.encoding import encode_chat_event, encode_frame, is_message_frame, decode_client_message, frame_type
+from app.chat.history import MessageHistoryWriter
+from app.chat.presence import PresenceTracker
+from app.chat.rate_limit import TokenBucketLimiter
+from app.chat.reaper import ConnectionReaper
+from app.chat.recent import RecentHistory
+from app.chat.registry import ConnectionRegistry
+from app.chat.schemas import (
+    ChatEventType,
+    ChatEvent,
+    ChatEncoding,
+    PresenceDiff,
+    ShowRoomHistoryResponse,
+    ShowRoomMembersResponse
+)
+from app.chat.service import MessageManager
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.metrics import metrics
+from app.mixins.db_mixin import get_db
 
 # Логгер для модуля
 logger = logging.getLogger(__name__)
@@ -70,68 +93,425 @@ async def _get_current_user_or_exception(websocket: WebSocket, token: str) -> To
         return None
 
 
-async def _send_everybody_in_chat(
-        active_connections: set[WebSocket], chat_event: ChatEvent
-):
-    for connection in active_connections:
-        await connection.send_json(
-            chat_event.model_dump()
+def _make_chat_connection(
+        websocket: WebSocket,
+        user: TokenUserData,
+        coalesce: bool = False,
+        encoding: ChatEncoding = ChatEncoding.json,
+        presence: bool = False
+) -> ChatConnection:
+    return ChatConnection(
+        websocket=websocket,
+        user=user,
+        max_queue_size=settings.CHAT_OUTBOUND_QUEUE_SIZE,
+        overflow_policy=OverflowPolicy(settings.CHAT_OVERFLOW_POLICY),
+        overflow_close_code=settings.CHAT_OVERFLOW_CLOSE_CODE,
+        coalesce_window=settings.CHAT_COALESCE_WINDOW_MS / 1000 if coalesce else None,
+        encoding=encoding,
+        presence=presence
+    )
+
+
+def _leave_rooms(connection: ChatConnection) -> set[str]:
+    room_ids: set[str] = registry.leave_all(connection)
+    for room_id in room_ids:
+        room_presence.leave(room_id=room_id, user=connection.user)
+    return room_ids
+
+
+def _send_error(connection: ChatConnection, content: str) -> None:
+    connection.enqueue(
+        encode_frame(
+            encode_chat_event(ChatEvent(type=ChatEventType.error, content=content)),
+            connection.encoding
         )
+    )
 
-active_connections: set[WebSocket] = set()
-@v1_chat_router.websocket("/simple_group_chat/ws")
-async def websocket_simple_group_chat(websocket: WebSocket, token: str) -> None:
+
+def _check_rate_limit_or_raise_exception(connection: ChatConnection) -> bool:
     """
-        Handles a WebSocket connection for a simple group chat.
+        Applies the sender's rate limit to an incoming message.
+
+        Args:
+            connection (ChatConnection): The connection the message came from.
+
+        Returns:
+            bool: True if the message may be broadcast, False if it was rejected.
+
+        Raises:
+            WebSocketException: If the user keeps exceeding the limit after
+                CHAT_RATE_LIMIT_MAX_VIOLATIONS rejections.
+    """
+    user_id: str = connection.user.user_id
+    if rate_limiter.allow(user_id):
+        return True
+    if rate_limiter.violations(user_id) >= settings.CHAT_RATE_LIMIT_MAX_VIOLATIONS:
+        raise WebSocketException(
+            code=status.WS_1008_POLICY_VIOLATION, reason="Слишком много сообщений"
+        )
+    _send_error(connection=connection, content="Слишком много сообщений, подождите немного")
+    return False
+
+
+async def _receive_client_message(websocket: WebSocket, encoding: ChatEncoding) -> dict:
+    if encoding == ChatEncoding.msgpack:
+        data: str | bytes = await websocket.receive_bytes()
+    else:
+        data = await websocket.receive_text()
+    return decode_client_message(data=data, encoding=encoding)
+
+
+def _send_everybody_in_chat(room_id: str, chat_event: ChatEvent) -> None:
+    """
+        Serializes a chat event once and publishes the frame to every member of
+        a room, on this and other workers, without waiting for any socket.
+
+        Args:
+            room_id (str): The room that receives the event.
+            chat_event (ChatEvent): The event to broadcast.
+    """
+    broadcast_backend.publish(room_id=room_id, frame=encode_chat_event(chat_event))
+
+
+async def _run_group_chat(
+        websocket: WebSocket,
+        token: str,
+        room_id: str,
+        coalesce: bool = False,
+        encoding: ChatEncoding = ChatEncoding.json,
+        presence: bool = False
+) -> None:
+    """
+        Authenticates a user, joins them to a room and relays their messages
+        to everybody in that room until the connection ends.
 
         Args:
             websocket (WebSocket): The WebSocket connection object.
             token (str): The JWT token used to authenticate the user.
+            room_id (str): The room to join.
+            coalesce (bool): Send events produced within CHAT_COALESCE_WINDOW_MS
+                as one frame holding an array of events.
+            encoding (ChatEncoding): Wire format for both directions, JSON text frames
+                or compact MessagePack binary frames.
+            presence (bool): Get the room's member ids on join and presence diffs
+                afterwards instead of join and leave notices.
     """
 
-    user: TokenUserData = await _get_current_user_or_exception(websocket, token)
+    user: TokenUserData | None = await _get_current_user_or_exception(websocket, token)
+    if user is None:
+        return
 
     await websocket.accept()
     logger.info("Новое WebSocket-соединение установлено")
-    active_connections.add(websocket)
-    logger.info(f"{user.username} входит в чат")
+    connections_opened.inc()
+    connection: ChatConnection = _make_chat_connection(
+        websocket=websocket,
+        user=user,
+        coalesce=coalesce,
+        encoding=encoding,
+        presence=presence
+    )
+    # Snapshot and join without an await in between, so no event is missed or replayed twice.
+    replayed_frames: list[str] = recent_history.replay(room_id)
+    registry.join(room_id=room_id, connection=connection)
+    room_presence.join(room_id=room_id, user=user)
+    rate_limiter.connect(user.user_id)
+    if presence:
+        replayed_frames.append(
+            encode_chat_event(PresenceDiff(joined=room_presence.member_ids(room_id), left=[]))
+        )
+    logger.info(f"{user.username} входит в чат {room_id}")
     try:
-        await _send_everybody_in_chat(
-            active_connections=active_connections,
+        _send_everybody_in_chat(
+            room_id=room_id,
             chat_event=ChatEvent(
                 type=ChatEventType.join,
                 content=f"Добро пожаловать, {user.username}!"
             )
         )
+        await connection.send_now(replayed_frames)
+        connection.start()
         while True:
-            data = await websocket.receive_json()
-            await _send_everybody_in_chat(
-                active_connections=active_connections,
+            data: dict = await _receive_client_message(websocket=websocket, encoding=encoding)
+            connection.touch()
+            messages_received.inc()
+            if not _check_rate_limit_or_raise_exception(connection):
+                messages_rate_limited.inc()
+                continue
+            _send_everybody_in_chat(
+                room_id=room_id,
                 chat_event=ChatEvent(
                         type=ChatEventType.message,
                         content=data["message"],
                         sender=user.model_dump()
                     )
             )
+            message_history.add(room_id=room_id, sender=user, content=data["message"])
 
     except ValueError:
-        await websocket.send_json(
-            ChatEvent(
-                type=ChatEventType.error,
-                content=f"Вы используете неверный формат сообщения",
-            ).model_dump()
-        )
+        disconnects.inc(labels=("invalid_message",))
+        _leave_rooms(connection)
+        await connection.stop()
+        await connection.send_now([
+            encode_chat_event(
+                ChatEvent(
+                    type=ChatEventType.error,
+                    content=f"Вы используете неверный формат сообщения",
+                )
+            )
+        ])
+        await connection.close(code=status.WS_1007_INVALID_FRAME_PAYLOAD_DATA)
     except (WebSocketDisconnect, ConnectionClosed):
-        active_connections.remove(websocket)
-        await _send_everybody_in_chat(
-            active_connections=active_connections,
+        disconnects.inc(labels=("closed",))
+        _leave_rooms(connection)
+        _send_everybody_in_chat(
+            room_id=room_id,
             chat_event=ChatEvent(
                 type=ChatEventType.leave,
                 content=f"Пользователь {user.username} вышел из чата"
             )
         )
         logger.info(f"{user.username} has disconnected!")
+    except WebSocketException as e:
+        disconnects.inc(labels=("policy",))
+        _leave_rooms(connection)
+        _send_everybody_in_chat(
+            room_id=room_id,
+            chat_event=ChatEvent(
+                type=ChatEventType.leave,
+                content=f"Пользователь {user.username} вышел из чата"
+            )
+        )
+        logger.warning(f"{user.username} is disconnected: {e.reason}")
+        await connection.stop()
+        await websocket.close(code=e.code, reason=e.reason)
 
     except Exception as e:
+        disconnects.inc(labels=("error",))
         logger.error(f"Unexpected error: {type(e).__name__}: {e}", exc_info=True)
         logger.info(f"{user.username} has disconnected!")
+        _leave_rooms(connection)
+        await connection.close(code=status.WS_1011_INTERNAL_ERROR)
+    finally:
+        _leave_rooms(connection)
+        rate_limiter.disconnect(user.user_id)
+        await connection.stop()
+
+
+SIMPLE_GROUP_CHAT_ROOM_ID: str = "simple_group_chat"
+
+registry = ConnectionRegistry()
+
+connections_opened = metrics.counter(
+    "chat_connections_opened_total", "Accepted chat WebSocket connections."
+)
+disconnects = metrics.counter(
+    "chat_disconnects_total", "Ended chat WebSocket connections, by reason.", labelnames=("reason",)
+)
+messages_received = metrics.counter("chat_messages_received_total", "Chat messages sent by clients.")
+messages_rate_limited = metrics.counter(
+    "chat_messages_rate_limited_total", "Chat messages rejected by the rate limit."
+)
+fanout_seconds = metrics.histogram(
+    "chat_fanout_seconds", "Time to enqueue one frame for the local members of a room."
+)
+frames_delivered = metrics.counter(
+    "chat_frames_delivered_total", "Frames enqueued for local chat connections."
+)
+metrics.gauge_callback(
+    "chat_connections", "Open chat connections in this worker.", callback=lambda: len(registry)
+)
+metrics.gauge_callback(
+    "chat_rooms", "Chat rooms with local members.", callback=lambda: len(registry.room_ids())
+)
+metrics.counter_callback(
+    "chat_outbound_frames_total", "Frames offered to outbound chat queues, by result.",
+    callback=lambda: {("queued",): broadcast_stats.queued, ("dropped",): broadcast_stats.dropped},
+    labelnames=("result",)
+)
+metrics.counter_callback(
+    "chat_overflow_disconnects_total", "Chat connections closed by the overflow policy.",
+    callback=lambda: broadcast_stats.disconnected
+)
+recent_history = RecentHistory(
+    max_events=settings.CHAT_RECENT_HISTORY_SIZE,
+    max_bytes=settings.CHAT_RECENT_HISTORY_MAX_BYTES
+)
+
+
+# Presence diffs go to subscribed members only, join and leave notices to everybody else.
+_PRESENCE_AUDIENCE: dict[str, bool] = {
+    ChatEventType.presence.value: True,
+    ChatEventType.join.value: False,
+    ChatEventType.leave.value: False,
+}
+
+
+def _deliver_frame(room_id: str, frame: str) -> int:
+    """
+        Remembers message frames for replay and enqueues every frame for the local
+        members of a room. Frames from other workers come through here as well.
+
+        Args:
+            room_id (str): The room that receives the frame.
+            frame (str): The serialized chat event.
+
+        Returns:
+            int: Number of local connections that accepted the frame.
+    """
+    started: float = time.perf_counter()
+    if is_message_frame(frame):
+        recent_history.append(room_id=room_id, frame=frame)
+        delivered: int = registry.broadcast(room_id=room_id, frame=frame)
+    else:
+        delivered = registry.broadcast(
+            room_id=room_id, frame=frame, presence=_PRESENCE_AUDIENCE.get(frame_type(frame))
+        )
+    fanout_seconds.observe(time.perf_counter() - started)
+    frames_delivered.inc(delivered)
+    return delivered
+
+
+broadcast_backend: BroadcastBackend = make_broadcast_backend(deliver=_deliver_frame)
+metrics.counter_callback(
+    "chat_broadcast_frames_dropped_total",
+    "Frames that did not reach the other workers, e.g. while the broadcast backend reconnected.",
+    callback=lambda: broadcast_backend.frames_dropped
+)
+rate_limiter = TokenBucketLimiter(
+    rate=settings.CHAT_RATE_LIMIT_PER_SECOND,
+    burst=settings.CHAT_RATE_LIMIT_BURST
+)
+room_presence = PresenceTracker(
+    publish=broadcast_backend.publish,
+    diff_window=settings.CHAT_PRESENCE_DIFF_WINDOW_MS / 1000
+)
+connection_reaper = ConnectionReaper(
+    registry=registry,
+    leave=_leave_rooms,
+    interval=settings.CHAT_REAPER_INTERVAL_S,
+    idle_timeout=settings.CHAT_IDLE_TIMEOUT_S
+)
+metrics.counter_callback(
+    "chat_connections_reaped_total", "Chat connections closed by the reaper, by reason.",
+    callback=lambda: {("dead",): connection_reaper.reaped_dead, ("idle",): connection_reaper.reaped_idle},
+    labelnames=("reason",)
+)
+message_history = MessageHistoryWriter(
+    session_maker=async_session_maker,
+    batch_size=settings.CHAT_HISTORY_BATCH_SIZE,
+    flush_interval=settings.CHAT_HISTORY_FLUSH_INTERVAL_MS / 1000,
+    max_buffer_size=settings.CHAT_HISTORY_MAX_BUFFER_SIZE
+)
+metrics.counter_callback(
+    "chat_history_messages_total", "Chat messages handled by the history writer, by outcome.",
+    callback=lambda: {
+        ("written",): message_history.written,
+        ("dropped",): message_history.dropped,
+        ("rejected",): message_history.rejected,
+    },
+    labelnames=("outcome",)
+)
+
+
+@v1_chat_router.websocket("/simple_group_chat/ws")
+async def websocket_simple_group_chat(
+        websocket: WebSocket,
+        token: str,
+        coalesce: bool = False,
+        encoding: ChatEncoding = ChatEncoding.json,
+        presence: bool = False
+) -> None:
+    """
+        Handles a WebSocket connection for a simple group chat.
+
+        Args:
+            websocket (WebSocket): The WebSocket connection object.
+            token (str): The JWT token used to authenticate the user.
+            coalesce (bool): Receive batches of events as arrays instead of one frame per event.
+            encoding (ChatEncoding): "json" (default) or the compact binary "msgpack".
+            presence (bool): Receive presence diffs instead of join and leave notices.
+    """
+    await _run_group_chat(
+        websocket=websocket,
+        token=token,
+        room_id=SIMPLE_GROUP_CHAT_ROOM_ID,
+        coalesce=coalesce,
+        encoding=encoding,
+        presence=presence
+    )
+
+
+@v1_chat_router.websocket("/rooms/{room_id}/ws")
+async def websocket_room_chat(
+        websocket: WebSocket,
+        token: str,
+        room_id: Annotated[str, Path(min_length=1, max_length=64)],
+        coalesce: bool = False,
+        encoding: ChatEncoding = ChatEncoding.json,
+        presence: bool = False
+) -> None:
+    """
+        Handles a WebSocket connection for a group chat scoped to one room.
+
+        Args:
+            websocket (WebSocket): The WebSocket connection object.
+            token (str): The JWT token used to authenticate the user.
+            room_id (str): The room to join.
+            coalesce (bool): Receive batches of events as arrays instead of one frame per event.
+            encoding (ChatEncoding): "json" (default) or the compact binary "msgpack".
+            presence (bool): Receive presence diffs instead of join and leave notices.
+    """
+    await _run_group_chat(
+        websocket=websocket,
+        token=token,
+        room_id=room_id,
+        coalesce=coalesce,
+        encoding=encoding,
+        presence=presence
+    )
+
+
+@v1_chat_router.get(path="/rooms/{room_id}/messages", response_model=ShowRoomHistoryResponse)
+async def show_room_history(
+        get_user: Annotated[dict, Depends(get_current_user)],
+        db: Annotated[AsyncSession, Depends(get_db)],
+        room_id: Annotated[str, Path(min_length=1, max_length=64)],
+        limit: Annotated[int, Query(ge=1, le=200)] = 50,
+        cursor: str | None = None
+) -> dict:
+    """
+        Returns a page of a room's message history, newest first.
+
+        Args:
+            room_id (str): The room whose history is requested.
+            limit (int): Maximum number of messages in the page.
+            cursor (str | None): `next_cursor` from the previous page.
+    """
+    messages, next_cursor = await MessageManager.get_history(
+        db=db, room_id=room_id, limit=limit, cursor=cursor
+    )
+    return {
+        "data": messages,
+        "next_cursor": next_cursor,
+        "status_code": status.HTTP_200_OK,
+        "detail": "Successful"
+    }
+
+
+@v1_chat_router.get(path="/rooms/{room_id}/members", response_model=ShowRoomMembersResponse)
+async def show_room_members(
+        get_user: Annotated[dict, Depends(get_current_user)],
+        room_id: Annotated[str, Path(min_length=1, max_length=64)]
+) -> dict:
+    """
+        Returns the users currently connected to a room on this worker.
+
+        Args:
+            room_id (str): The room whose members are requested.
+    """
+    return {
+        "data": room_presence.members(room_id),
+        "status_code": status.HTTP_200_OK,
+        "detail": "Successful"
+    }
@@ -1,8 +1,11 @@
+from datetime import datetime
 from enum import Enum
+from uuid import UUID
 
 from pydantic import BaseModel
 
 from app.auth.schemas import TokenUserData
+from app.mixins.schema_mixins import ResponseStatusMixin
 
 
 class ChatEventType(str, Enum):
@@ -10,9 +13,39 @@ class ChatEventType(str, Enum):
     join = "join"
     leave = "leave"
     error = "error"
+    presence = "presence"
+
+
+class ChatEncoding(str, Enum):
+    json = "json"
+    msgpack = "msgpack"
 
 
 class ChatEvent(BaseModel):
     type: ChatEventType
     content: str
-    sender: TokenUserData | None = None
\ No newline at end of file
+    sender: TokenUserData | None = None
+
+
+class PresenceDiff(BaseModel):
+    type: ChatEventType = ChatEventType.presence
+    joined: list[str]
+    left: list[str]
+
+
+class ShowMessage(BaseModel):
+    id: UUID
+    room_id: str
+    sender_id: str
+    sender_username: str
+    content: str
+    created_at: datetime
+
+
+class ShowRoomHistoryResponse(ResponseStatusMixin):
+    data: list[ShowMessage]
+    next_cursor: str | None
+
+
+class ShowRoomMembersResponse(ResponseStatusMixin):
+    data: list[TokenUserData]
@@ -0,0 +1,76 @@
+import base64
+import binascii
+import datetime
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.chat.model import Message
+from app.chat.schemas import ShowMessage
+
+# History pages select these columns into plain rows; the response model validates them once.
+SHOW_MESSAGE_COLUMNS: tuple = tuple(getattr(Message, name) for name in ShowMessage.model_fields)
+
+
+def _encode_cursor(created_at: datetime.datetime, message_id: UUID) -> str:
+    raw: str = f"{created_at.isoformat()}|{message_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime.datetime, UUID]:
+    try:
+        created_at, message_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.datetime.fromisoformat(created_at), UUID(message_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+class MessageManager:
+
+    @staticmethod
+    async def get_history(
+            db: AsyncSession, room_id: str, limit: int, cursor: str | None = None
+    ) -> tuple[list[dict], str | None]:
+        """
+            Returns one page of a room's messages, newest first.
+
+            Pages are selected with keyset pagination on (created_at, id), so each
+            page costs one index range scan no matter how deep the client scrolls.
+
+            Args:
+                db (AsyncSession): Database session.
+                room_id (str): The room whose history is requested.
+                limit (int): Maximum number of messages in the page.
+                cursor (str | None): `next_cursor` of the previous page, None for the newest page.
+
+            Returns:
+                tuple[list[dict], str | None]: The messages and the cursor of the next page,
+                    or None if there are no older messages.
+        """
+        query = select(*SHOW_MESSAGE_COLUMNS).filter(Message.room_id == room_id)
+        if cursor is not None:
+            created_at, message_id = _decode_cursor(cursor)
+            query = query.filter(
+                tuple_(Message.created_at, Message.id) < tuple_(created_at, message_id)
+            )
+        messages = (
+            await db.execute(
+                query.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit + 1)
+            )
+        ).all()
+
+        next_cursor: str | None = None
+        if len(messages) > limit:
+            messages = messages[:limit]
+            next_cursor = _encode_cursor(
+                created_at=messages[-1].created_at, message_id=messages[-1].id
+            )
+        return (
+            [message._asdict() for message in messages],
+            next_cursor
+        )
@@ -1,16 +1,60 @@
 import pathlib
 
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from authlib.integrations.starlette_client import OAuth
 
 ROOT_API: str = "/api/v1"
 
+
+class DatabasePoolProfile(BaseModel):
+    """
+        Connection pool and logging settings of the async database engine.
+
+        Every worker has a pool of its own, so (pool_size + max_overflow) * workers
+        has to stay below Postgres' max_connections.
+
+        Attributes:
+            pool_size (int): Connections kept open in the pool.
+            max_overflow (int): Extra connections opened when the pool is exhausted.
+            pool_timeout_s (float): How long a request waits for a free connection, in seconds.
+            pool_recycle_s (float): Age after which a connection is replaced, in seconds.
+            pool_pre_ping (bool): Check a connection with a round trip before it is used.
+            statement_cache_size (int): Number of prepared statements asyncpg caches per connection.
+            echo (bool): Log every SQL statement.
+    """
+
+    pool_size: int
+    max_overflow: int
+    pool_timeout_s: float
+    pool_recycle_s: float
+    pool_pre_ping: bool
+    statement_cache_size: int
+    echo: bool
+
+
+DATABASE_POOL_PROFILES: dict[str, DatabasePoolProfile] = {
+    "DEV": DatabasePoolProfile(
+        pool_size=5, max_overflow=5, pool_timeout_s=10.0, pool_recycle_s=1800.0,
+        pool_pre_ping=True, statement_cache_size=100, echo=True
+    ),
+    "TEST": DatabasePoolProfile(
+        pool_size=5, max_overflow=10, pool_timeout_s=10.0, pool_recycle_s=1800.0,
+        pool_pre_ping=False, statement_cache_size=100, echo=False
+    ),
+    "PROD": DatabasePoolProfile(
+        pool_size=10, max_overflow=10, pool_timeout_s=5.0, pool_recycle_s=1800.0,
+        pool_pre_ping=True, statement_cache_size=500, echo=False
+    ),
+}
+
 class Settings(BaseSettings):
     """
         Configuration settings for the application, loaded from environment variables or a .env file.
 
         Attributes:
-            MODE (str): The application mode (e.g., development, production).
+            MODE (str): The application mode (e.g., development, production), selects the
+                database pool profile: DEV, TEST or PROD; other modes use PROD.
             SQL_PATH (str): The path to the SQL database file.
             ASYNC_ENGINE (str): The database engine string for asynchronous connections.
             SYNC_ENGINE (str): The database engine string for synchronous connections.
@@ -22,6 +66,71 @@ class Settings(BaseSettings):
             GOOGLE_CLIENT_SECRET (str): The client secret for Google OAuth authentication.
             PROD_HOST (str): The host address for the production server.
             PROD_PORT (int): The port number for the production server
+            DB_POOL_SIZE (int | None): Overrides the pool_size of the database pool profile.
+            DB_MAX_OVERFLOW (int | None): Overrides the max_overflow of the database pool profile.
+            DB_POOL_TIMEOUT_S (float | None): Overrides the pool_timeout_s of the database pool profile.
+            DB_POOL_RECYCLE_S (float | None): Overrides the pool_recycle_s of the database pool profile.
+            DB_POOL_PRE_PING (bool | None): Overrides the pool_pre_ping of the database pool profile.
+            DB_STATEMENT_CACHE_SIZE (int | None): Overrides the statement_cache_size of the database pool profile.
+            DB_ECHO (bool | None): Overrides the echo of the database pool profile.
+            GOOGLE_JWKS_URL (str): Google's public keys for verifying ID tokens.
+            GOOGLE_JWKS_DEFAULT_TTL_S (float): How long Google's keys are cached when the response has no
+                cache headers, in seconds.
+            GOOGLE_JWKS_MIN_REFRESH_INTERVAL_S (float): Minimum time between two fetches of Google's keys, in seconds.
+            JWT_KEYRING (list[dict[str, str]]): Additional JWT keys as a JSON list of {"kid", "alg", "key"};
+                "alg" is HS256, ES256 or EdDSA, "key" the secret or a PEM private key.
+            JWT_ACTIVE_KID (str): The kid of the key that signs new tokens, empty for SECRET_KEY.
+            AUTH_TOKEN_CACHE_SIZE (int): Maximum number of decoded JWTs kept in memory, 0 disables the cache.
+            AUTH_TOKEN_CACHE_TTL_S (float): Maximum time a decoded JWT is cached, in seconds.
+            USER_PROFILE_CACHE_SIZE (int): Maximum number of user profiles kept in memory, 0 disables the cache.
+            USER_PROFILE_CACHE_TTL_S (float): How long a user profile is cached, in seconds.
+            USER_PROFILE_CACHE_NEGATIVE_TTL_S (float): How long an unknown user id is cached, in seconds.
+            USERS_BATCH_MAX_IDS (int): Maximum number of user ids resolved by one batch profile request.
+            USERNAME_CANDIDATE_BATCH_SIZE (int): Number of random usernames checked by one query at signup.
+            HTTP_CLIENT_CONNECT_TIMEOUT_S (float): Connect timeout of the shared outgoing HTTP client, in seconds.
+            HTTP_CLIENT_READ_TIMEOUT_S (float): Read, write and pool timeout of the shared HTTP client, in seconds.
+            HTTP_CLIENT_MAX_CONNECTIONS (int): Maximum number of open connections of the shared HTTP client.
+            HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS (int): Maximum number of idle connections kept alive.
+            HTTP_CLIENT_KEEPALIVE_EXPIRY_S (float): How long an idle connection is kept alive, in seconds.
+            HTTP_CLIENT_HTTP2 (bool): Use HTTP/2 where the server supports it, requires `httpx[http2]`.
+            HTTP_CLIENT_HOST_LIMITS (dict[str, int]): Hosts with a connection pool of their own, host -> size.
+            CHAT_OUTBOUND_QUEUE_SIZE (int): Maximum number of frames buffered per chat connection.
+            CHAT_OVERFLOW_POLICY (str): What to do with a full outbound queue: "drop_oldest" or "disconnect".
+            CHAT_OVERFLOW_CLOSE_CODE (int): WebSocket close code used by the "disconnect" overflow policy.
+            CHAT_COALESCE_WINDOW_MS (float): How long events are collected into one frame for clients
+                connected with coalesce=true, in milliseconds.
+            CHAT_RECENT_HISTORY_SIZE (int): Number of recent chat events per room replayed to new members.
+            CHAT_RECENT_HISTORY_MAX_BYTES (int): Memory cap for the recent chat events of all rooms, in bytes.
+            CHAT_HISTORY_BATCH_SIZE (int): Number of buffered chat messages that triggers a batch insert.
+            CHAT_HISTORY_FLUSH_INTERVAL_MS (float): Maximum time a chat message waits before it is saved, in milliseconds.
+            CHAT_HISTORY_MAX_BUFFER_SIZE (int): Maximum number of unsaved chat messages kept in memory.
+            CHAT_BROADCAST_BACKEND (str): How chat frames reach other workers: "memory" (single worker) or "postgres".
+            CHAT_BROADCAST_CHANNEL (str): The Postgres LISTEN/NOTIFY channel used by the "postgres" backend.
+            CHAT_BROADCAST_BATCH_DELAY_MS (float): How long frames are collected into one NOTIFY, in milliseconds.
+            CHAT_BROADCAST_MAX_PENDING (int): Maximum number of frames buffered for other workers, e.g. while
+                the "postgres" backend reconnects; later frames only reach local members.
+            CHAT_BROADCAST_RECONNECT_DELAY_S (float): First delay before the "postgres" backend reconnects, in seconds.
+            CHAT_BROADCAST_MAX_RECONNECT_DELAY_S (float): Upper bound for the doubling reconnect delay, in seconds.
+            CHAT_PRESENCE_DIFF_WINDOW_MS (float): How long joins and leaves are collected into one presence diff,
+                in milliseconds.
+            CHAT_RATE_LIMIT_PER_SECOND (float): Average number of chat messages a user may send per second.
+            CHAT_RATE_LIMIT_BURST (int): Number of chat messages a user may send at once.
+            CHAT_RATE_LIMIT_MAX_VIOLATIONS (int): Rejected messages after which the socket is closed with 1008.
+            CHAT_REAPER_INTERVAL_S (float): Seconds between sweeps for dead and idle chat connections.
+            CHAT_IDLE_TIMEOUT_S (float): Seconds without client messages before a chat connection is closed,
+                0 keeps idle connections open.
+            PROFILING_ENABLED (bool): Install the profiling middleware; without it profiling costs nothing.
+            PROFILING_TOKEN (str): Admin token that requests a profile in the X-Profile-Token header
+                or the profile_token query parameter, empty disables the trigger.
+            PROFILING_SAMPLE_RATE (float): Share of requests and WebSocket sessions profiled without a token, 0 to 1.
+            PROFILING_DIR (str): Directory the collapsed-stack profiles are written to.
+            PROFILING_INTERVAL_MS (float): Time between stack samples, in milliseconds.
+            WS_PER_MESSAGE_DEFLATE (bool): Offer the permessage-deflate WebSocket extension to clients. Only applied
+                by `python -m app.main`; under the uvicorn CLI pass `--ws-per-message-deflate` instead.
+            WS_PING_INTERVAL (float): Seconds between WebSocket pings sent by the server. Only applied by
+                `python -m app.main`; under the uvicorn CLI pass `--ws-ping-interval` instead.
+            WS_PING_TIMEOUT (float): Seconds to wait for a pong before the connection is dropped. Only applied by
+                `python -m app.main`; under the uvicorn CLI pass `--ws-ping-timeout` instead.
     """
 
     MODE: str
@@ -37,6 +146,61 @@ class Settings(BaseSettings):
     PROD_HOST: str
     PROD_PORT: int
     FRONTEND_URL: str
+    DB_POOL_SIZE: int | None = None
+    DB_MAX_OVERFLOW: int | None = None
+    DB_POOL_TIMEOUT_S: float | None = None
+    DB_POOL_RECYCLE_S: float | None = None
+    DB_POOL_PRE_PING: bool | None = None
+    DB_STATEMENT_CACHE_SIZE: int | None = None
+    DB_ECHO: bool | None = None
+    GOOGLE_JWKS_URL: str = "https://www.googleapis.com/oauth2/v3/certs"
+    GOOGLE_JWKS_DEFAULT_TTL_S: float = 3600.0
+    GOOGLE_JWKS_MIN_REFRESH_INTERVAL_S: float = 60.0
+    JWT_KEYRING: list[dict[str, str]] = []
+    JWT_ACTIVE_KID: str = ""
+    AUTH_TOKEN_CACHE_SIZE: int = 10_000
+    AUTH_TOKEN_CACHE_TTL_S: float = 300.0
+    USER_PROFILE_CACHE_SIZE: int = 10_000
+    USER_PROFILE_CACHE_TTL_S: float = 60.0
+    USER_PROFILE_CACHE_NEGATIVE_TTL_S: float = 5.0
+    USERS_BATCH_MAX_IDS: int = 500
+    USERNAME_CANDIDATE_BATCH_SIZE: int = 16
+    HTTP_CLIENT_CONNECT_TIMEOUT_S: float = 5.0
+    HTTP_CLIENT_READ_TIMEOUT_S: float = 10.0
+    HTTP_CLIENT_MAX_CONNECTIONS: int = 100
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_CLIENT_KEEPALIVE_EXPIRY_S: float = 30.0
+    HTTP_CLIENT_HTTP2: bool = False
+    HTTP_CLIENT_HOST_LIMITS: dict[str, int] = {}
+    CHAT_OUTBOUND_QUEUE_SIZE: int = 256
+    CHAT_OVERFLOW_POLICY: str = "drop_oldest"
+    CHAT_OVERFLOW_CLOSE_CODE: int = 1013
+    CHAT_COALESCE_WINDOW_MS: float = 5.0
+    CHAT_RECENT_HISTORY_SIZE: int = 50
+    CHAT_RECENT_HISTORY_MAX_BYTES: int = 64 * 1024 * 1024
+    CHAT_HISTORY_BATCH_SIZE: int = 500
+    CHAT_HISTORY_FLUSH_INTERVAL_MS: float = 200.0
+    CHAT_HISTORY_MAX_BUFFER_SIZE: int = 50_000
+    CHAT_BROADCAST_BACKEND: str = "memory"
+    CHAT_BROADCAST_CHANNEL: str = "stonechat_broadcast"
+    CHAT_BROADCAST_BATCH_DELAY_MS: float = 2.0
+    CHAT_BROADCAST_MAX_PENDING: int = 10_000
+    CHAT_BROADCAST_RECONNECT_DELAY_S: float = 0.5
+    CHAT_BROADCAST_MAX_RECONNECT_DELAY_S: float = 30.0
+    CHAT_PRESENCE_DIFF_WINDOW_MS: float = 50.0
+    CHAT_RATE_LIMIT_PER_SECOND: float = 5.0
+    CHAT_RATE_LIMIT_BURST: int = 10
+    CHAT_RATE_LIMIT_MAX_VIOLATIONS: int = 20
+    CHAT_REAPER_INTERVAL_S: float = 30.0
+    CHAT_IDLE_TIMEOUT_S: float = 0.0
+    PROFILING_ENABLED: bool = False
+    PROFILING_TOKEN: str = ""
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_DIR: str = "profiles"
+    PROFILING_INTERVAL_MS: float = 2.0
+    WS_PER_MESSAGE_DEFLATE: bool = True
+    WS_PING_INTERVAL: float = 20.0
+    WS_PING_TIMEOUT: float = 20.0
 
     @property
     def DATABASE_URL_async(self) -> str:
@@ -46,6 +210,28 @@ class Settings(BaseSettings):
     def DATABASE_URL_sync(self) -> str:
         return f"{self.SYNC_ENGINE}:{self.SQL_PATH}"
 
+    @property
+    def DATABASE_DSN(self) -> str:
+        return f"postgresql:{self.SQL_PATH}"
+
+    @property
+    def DATABASE_POOL_PROFILE(self) -> DatabasePoolProfile:
+        profile: DatabasePoolProfile = DATABASE_POOL_PROFILES.get(
+            self.MODE.upper(), DATABASE_POOL_PROFILES["PROD"]
+        )
+        overrides: dict = {
+            "pool_size": self.DB_POOL_SIZE,
+            "max_overflow": self.DB_MAX_OVERFLOW,
+            "pool_timeout_s": self.DB_POOL_TIMEOUT_S,
+            "pool_recycle_s": self.DB_POOL_RECYCLE_S,
+            "pool_pre_ping": self.DB_POOL_PRE_PING,
+            "statement_cache_size": self.DB_STATEMENT_CACHE_SIZE,
+            "echo": self.DB_ECHO,
+        }
+        return profile.model_copy(
+            update={name: value for name, value in overrides.items() if value is not None}
+        )
+
     @property
     def PROD_URL(self) -> str:
         return f"http://{self.PROD_HOST}:{self.PROD_PORT}"
@@ -76,6 +262,6 @@ oauth.register(
     refresh_token_url=None,
     authorize_state=settings.SECRET_KEY,
     redirect_uri=f"{settings.PROD_URL}/api/v1/auth",
-    jwks_uri="https://www.googleapis.com/oauth2/v3/certs",
+    jwks_uri=settings.GOOGLE_JWKS_URL,
     client_kwargs={"scope": "openid email profile"},
 )
\ No newline at end of file
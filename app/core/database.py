@@ -1,21 +1,147 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+import time
 
-from app.core.config import settings
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-sync_engine = create_engine(
-    url=settings.DATABASE_URL_sync,
-    echo=True
+from app.core.config import settings, DatabasePoolProfile
+from app.core.metrics import metrics
+
+query_seconds = metrics.histogram(
+    "db_query_seconds", "Execution time of SQL statements, including the network round trip."
 )
+query_errors = metrics.counter("db_query_errors_total", "SQL statements that raised an error.")
 
 
-async_engine = create_async_engine(
-    url=settings.DATABASE_URL_async,
-    echo=True
-)
+class DatabasePoolStats:
+    """
+        How long requests waited for a connection from the database pool.
+    """
+
+    def __init__(self) -> None:
+        self.checkouts: int = 0
+        self.timeouts: int = 0
+        self.wait_seconds_total: float = 0.0
+        self.wait_seconds_max: float = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool) -> None:
+        self.checkouts += 1
+        self.timeouts += timed_out
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+
+database_pool_stats = DatabasePoolStats()
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+        The default asyncio pool, timing every checkout.
+
+        Args:
+            stats (DatabasePoolStats): Where the checkout times are recorded.
+    """
+
+    def __init__(self, *args, stats: DatabasePoolStats = database_pool_stats, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = stats
+
+    def _do_get(self):
+        started: float = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.stats.record_wait(time.perf_counter() - started, timed_out=False)
+        return connection
+
+
+def _make_async_engine(profile: DatabasePoolProfile) -> AsyncEngine:
+    return create_async_engine(
+        url=settings.DATABASE_URL_async,
+        echo=profile.echo,
+        poolclass=InstrumentedAsyncPool,
+        pool_size=profile.pool_size,
+        max_overflow=profile.max_overflow,
+        pool_timeout=profile.pool_timeout_s,
+        pool_recycle=profile.pool_recycle_s,
+        pool_pre_ping=profile.pool_pre_ping,
+        connect_args={"statement_cache_size": profile.statement_cache_size}
+    )
+
+
+async_engine = _make_async_engine(settings.DATABASE_POOL_PROFILE)
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _start_query_timer(connection, cursor, statement, parameters, context, executemany) -> None:
+    context.query_started = time.perf_counter()
+
+
+@event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+def _observe_query_time(connection, cursor, statement, parameters, context, executemany) -> None:
+    query_seconds.observe(time.perf_counter() - context.query_started)
+
+
+@event.listens_for(async_engine.sync_engine, "handle_error")
+def _count_query_error(exception_context) -> None:
+    query_errors.inc()
+
 
 async_session_maker = async_sessionmaker(
     bind=async_engine,
     expire_on_commit=False,
     class_=AsyncSession
-)
\ No newline at end of file
+)
+
+
+def database_pool_status() -> dict:
+    """
+        Returns the state of the async engine's pool and the checkout wait times.
+
+        Returns:
+            dict: Pool size, checked-out and idle connections, current overflow,
+                checkouts, timeouts and wait times in seconds.
+    """
+    pool: InstrumentedAsyncPool = async_engine.pool
+    stats: DatabasePoolStats = pool.stats
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+        "checkouts": stats.checkouts,
+        "timeouts": stats.timeouts,
+        "wait_seconds_total": stats.wait_seconds_total,
+        "wait_seconds_max": stats.wait_seconds_max,
+    }
+
+
+
+
+def _register_pool_metrics() -> None:
+    # metric name -> (key of database_pool_status, help text)
+    gauges: dict[str, tuple[str, str]] = {
+        "db_pool_size": ("size", "Connections kept open in the database pool."),
+        "db_pool_checked_out": ("checked_out", "Database connections in use."),
+        "db_pool_checked_in": ("checked_in", "Idle database connections in the pool."),
+        "db_pool_overflow": ("overflow", "Database connections opened beyond the pool size."),
+    }
+    counters: dict[str, tuple[str, str]] = {
+        "db_pool_checkouts_total": ("checkouts", "Connections taken from the database pool."),
+        "db_pool_timeouts_total": ("timeouts", "Requests that gave up waiting for a database connection."),
+        "db_pool_wait_seconds_total": ("wait_seconds_total", "Time spent waiting for database connections."),
+    }
+    for name, (key, documentation) in gauges.items():
+        metrics.gauge_callback(
+            name, documentation, callback=lambda key=key: database_pool_status()[key]
+        )
+    for name, (key, documentation) in counters.items():
+        metrics.counter_callback(
+            name, documentation, callback=lambda key=key: database_pool_status()[key]
+        )
+
+
+_register_pool_metrics()
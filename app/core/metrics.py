@@ -0,0 +1,231 @@
+import math
+import time
+from bisect import bisect_left
+from typing import Callable, Iterator
+
+# Seconds, from a cached JWT decode (microseconds) up to a slow query or a large fan-out.
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5
+)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs: list[str] = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+        A monotonically increasing value, optionally split by labels.
+
+        Increments are plain additions on the event loop thread, so no lock is
+        taken on the hot path.
+    """
+
+    type_name: str = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[LabelValues, float] = {} if labelnames else {(): 0}
+
+    def inc(self, amount: float = 1, labels: LabelValues = ()) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: LabelValues = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram:
+    """
+        Counts observations into fixed buckets, optionally split by labels.
+
+        An observation costs one binary search and two additions; the
+        cumulative bucket counts are only computed when the metrics are scraped.
+    """
+
+    type_name: str = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: tuple[str, ...] = (),
+            buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [count per bucket, then the count above the last bucket], sum
+        self._series: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        series: tuple[list[int], list[float]] | None = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    def time(self, labels: LabelValues = ()) -> "_Timer":
+        return _Timer(histogram=self, labels=labels)
+
+    def count(self, labels: LabelValues = ()) -> int:
+        series: tuple[list[int], list[float]] | None = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> Iterator[str]:
+        for labels, (counts, total) in self._series.items():
+            cumulative: int = 0
+            for upper_bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                bucket_labels: str = _format_labels(
+                    self.labelnames, labels, extra=f'le="{_format_value(upper_bound)}"'
+                )
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            label_string: str = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_string} {_format_value(total[0])}"
+            yield f"{self.name}_count{label_string} {cumulative}"
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: LabelValues) -> None:
+        self.histogram = histogram
+        self.labels = labels
+        self.started: float = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.histogram.observe(time.perf_counter() - self.started, labels=self.labels)
+
+
+class CallbackMetric:
+    """
+        A value read from its owner only when the metrics are scraped.
+
+        Exports numbers that other objects already keep, such as cache counters
+        or the pool state, without touching their hot paths.
+
+        Args:
+            callback (Callable[[], float | dict[LabelValues, float]]): Returns the value,
+                or label values -> value for a labelled metric.
+            type_name (str): "gauge" or "counter".
+    """
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            callback: Callable[[], float | dict[LabelValues, float]],
+            type_name: str,
+            labelnames: tuple[str, ...] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.type_name = type_name
+        self.labelnames = labelnames
+
+    def samples(self) -> Iterator[str]:
+        values: float | dict[LabelValues, float] = self.callback()
+        if not isinstance(values, dict):
+            values = {(): values}
+        for labels, value in values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+Metric = Counter | Histogram | CallbackMetric
+
+
+class MetricsRegistry:
+    """
+        The metrics of one worker, rendered in the Prometheus text format.
+
+        Metrics are registered at import time by the modules they measure.
+        Registering a name twice returns the existing metric, so a module can
+        be imported from several places.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Metric:
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name=name, documentation=documentation, labelnames=labelnames))
+
+    def histogram(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: tuple[str, ...] = (),
+            buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(
+            Histogram(name=name, documentation=documentation, labelnames=labelnames, buckets=buckets)
+        )
+
+    def gauge_callback(
+            self,
+            name: str,
+            documentation: str,
+            callback: Callable[[], float | dict[LabelValues, float]],
+            labelnames: tuple[str, ...] = ()
+    ) -> CallbackMetric:
+        return self._register(
+            CallbackMetric(
+                name=name, documentation=documentation, callback=callback,
+                type_name="gauge", labelnames=labelnames
+            )
+        )
+
+    def counter_callback(
+            self,
+            name: str,
+            documentation: str,
+            callback: Callable[[], float | dict[LabelValues, float]],
+            labelnames: tuple[str, ...] = ()
+    ) -> CallbackMetric:
+        return self._register(
+            CallbackMetric(
+                name=name, documentation=documentation, callback=callback,
+                type_name="counter", labelnames=labelnames
+            )
+        )
+
+    def get(self, name: str) -> Metric | None:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
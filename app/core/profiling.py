@@ -0,0 +1,168 @@
+import asyncio
+import hmac
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from urllib.parse import parse_qs
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+PROFILE_TOKEN_HEADER: bytes = b"x-profile-token"
+PROFILE_TOKEN_QUERY: str = "profile_token"
+PROFILE_FILE_HEADER: bytes = b"x-profile-file"
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    filename: str = code.co_filename
+    site_packages: int = filename.rfind("site-packages/")
+    if site_packages != -1:
+        filename = filename[site_packages + len("site-packages/"):]
+    elif filename.startswith(os.getcwd()):
+        filename = os.path.relpath(filename)
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfile:
+    """
+        Samples the stack of one coroutine from a background thread.
+
+        Every `interval` seconds the thread reads the event loop thread's current
+        stack. A sample is kept only if it passes through `root`, the frame of
+        the profiled request, so other requests served by the same loop and the
+        idle loop are left out. Work in tasks the request spawns, e.g. the chat
+        connection's sender, is not attributed to it. The resolution is bounded
+        by the interpreter's switch interval (5 ms by default), since the
+        sampler needs the GIL.
+
+        Args:
+            root (FrameType): The frame of the profiled coroutine.
+            thread_id (int): The event loop thread.
+            interval (float): Time between samples, in seconds.
+    """
+
+    def __init__(self, root: FrameType, thread_id: int, interval: float) -> None:
+        self.root = root
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+        self.samples: int = 0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame: FrameType | None = sys._current_frames().get(self.thread_id)
+            self.samples += 1
+            stack: list[str] = []
+            while frame is not None and frame is not self.root:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if frame is self.root and stack:
+                stack.reverse()
+                self.stacks[tuple(stack)] += 1
+
+    def collapsed(self) -> str:
+        """
+            Returns the samples as collapsed stacks, one "outer;...;inner count" line per stack,
+            the input format of flamegraph.pl and speedscope.
+        """
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.items())
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.collapsed())
+
+
+class ProfilingMiddleware:
+    """
+        Captures a CPU profile of single HTTP requests and WebSocket sessions.
+
+        A request is profiled when it carries the admin token in the
+        X-Profile-Token header or, for WebSockets whose browser clients cannot
+        set headers, in the `profile_token` query parameter; or when it is
+        picked by `sample_rate`. The profile is written as a collapsed-stack
+        file to `output_dir`, and HTTP responses name the file in the
+        X-Profile-File header. Requests that are not profiled pay one header
+        scan; the app only installs the middleware when PROFILING_ENABLED is set.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+            output_dir (str): Directory for the collapsed-stack files.
+            token (str): The admin token, empty disables the header and query trigger.
+            sample_rate (float): Share of requests profiled without a token, 0 to 1.
+            interval (float): Time between stack samples, in seconds.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            output_dir: str,
+            token: str = "",
+            sample_rate: float = 0.0,
+            interval: float = 0.002
+    ) -> None:
+        self.app = app
+        self.output_dir = Path(output_dir)
+        self.token = token.encode()
+        self.sample_rate = sample_rate
+        self.interval = interval
+
+    def _has_token(self, scope: Scope) -> bool:
+        if not self.token:
+            return False
+        for name, value in scope["headers"]:
+            if name == PROFILE_TOKEN_HEADER:
+                return hmac.compare_digest(value, self.token)
+        if scope["type"] == "websocket" and scope.get("query_string"):
+            values: list[str] = parse_qs(scope["query_string"].decode()).get(PROFILE_TOKEN_QUERY, [])
+            return any(hmac.compare_digest(value.encode(), self.token) for value in values)
+        return False
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if self._has_token(scope):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _profile_path(self, scope: Scope) -> Path:
+        route: str = scope["path"].strip("/").replace("/", "_")[:80] or "root"
+        method: str = scope.get("method", "WS")
+        return self.output_dir / f"{time.strftime('%Y%m%d-%H%M%S')}-{method}-{route}-{os.urandom(3).hex()}.collapsed"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket") or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        path: Path = self._profile_path(scope)
+
+        async def send_with_profile_header(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (PROFILE_FILE_HEADER, path.name.encode())]
+            await send(message)
+
+        profile = SamplingProfile(
+            root=sys._getframe(), thread_id=threading.get_ident(), interval=self.interval
+        )
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_profile_header)
+        finally:
+            profile.stop()
+            await asyncio.to_thread(profile.write, path)
+            logger.info(f"Профиль {scope['path']} записан в {path} ({profile.samples} сэмплов)")
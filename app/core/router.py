@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.database import database_pool_status
+from app.core.metrics import metrics
+
+PROMETHEUS_CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+
+v1_health_router = APIRouter(prefix="/health", tags=["health"])
+metrics_router = APIRouter(tags=["metrics"])
+
+
+@v1_health_router.get(path="/db-pool", response_model=dict)
+async def show_database_pool() -> dict:
+    """
+        Returns the database pool state of the worker that handles the request.
+    """
+    return database_pool_status()
+
+
+@metrics_router.get(path="/metrics", response_class=PlainTextResponse)
+async def show_metrics() -> PlainTextResponse:
+    """
+        Returns the metrics of the worker that handles the request in the Prometheus text format.
+    """
+    return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,6 +1,72 @@
-from httpx import AsyncClient
+from typing import AsyncGenerator
 
+from httpx import AsyncBaseTransport, AsyncClient, AsyncHTTPTransport, Limits, Timeout
 
-async def make_request():
-    async with AsyncClient() as client:
-        yield client
\ No newline at end of file
+from app.core.config import settings
+
+
+class SharedAsyncClient:
+    """
+        One httpx.AsyncClient for the lifetime of the app.
+
+        Reusing the client keeps connections alive between requests, so outgoing
+        calls skip the DNS lookup, TCP connect and TLS handshake. Hosts listed in
+        HTTP_CLIENT_HOST_LIMITS get a pool of their own with that many connections;
+        all other hosts share the default pool.
+
+        Args:
+            transport (AsyncBaseTransport | None): Replaces the network transport,
+                e.g. httpx.MockTransport in tests.
+    """
+
+    def __init__(self, transport: AsyncBaseTransport | None = None) -> None:
+        self.transport = transport
+        self._client: AsyncClient | None = None
+
+    def _make_client(self) -> AsyncClient:
+        timeout = Timeout(
+            settings.HTTP_CLIENT_READ_TIMEOUT_S,
+            connect=settings.HTTP_CLIENT_CONNECT_TIMEOUT_S
+        )
+        if self.transport is not None:
+            return AsyncClient(transport=self.transport, timeout=timeout)
+        limits = Limits(
+            max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY_S
+        )
+        mounts: dict[str, AsyncHTTPTransport] = {
+            f"all://{host}": AsyncHTTPTransport(
+                http2=settings.HTTP_CLIENT_HTTP2,
+                limits=Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                    keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY_S
+                )
+            )
+            for host, max_connections in settings.HTTP_CLIENT_HOST_LIMITS.items()
+        }
+        return AsyncClient(
+            timeout=timeout, limits=limits, http2=settings.HTTP_CLIENT_HTTP2, mounts=mounts
+        )
+
+    @property
+    def client(self) -> AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = self._make_client()
+        return self._client
+
+    async def start(self) -> None:
+        _ = self.client
+
+    async def stop(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+shared_async_client = SharedAsyncClient()
+
+
+async def make_request() -> AsyncGenerator[AsyncClient]:
+    yield shared_async_client.client
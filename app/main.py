@@ -1,14 +1,26 @@
 import logging
+from contextlib import asynccontextmanager
 
 import uvicorn
 from fastapi import FastAPI, APIRouter
+from fastapi.responses import ORJSONResponse
 from starlette.middleware.sessions import SessionMiddleware
 
 from app.auth.login_router import v1_login_router
 from app.auth.router import v1_auth_router
+from app.auth.service import google_jwks
 from app.user.router import v1_user_router
-from app.chat.router import v1_chat_router
+from app.chat.router import (
+    v1_chat_router,
+    broadcast_backend,
+    message_history,
+    room_presence,
+    connection_reaper
+)
 from app.core.config import settings
+from app.core.profiling import ProfilingMiddleware
+from app.core.router import metrics_router, v1_health_router
+from app.depends.async_client import shared_async_client
 
 logging.basicConfig(
     level=logging.INFO,
@@ -20,18 +32,52 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await shared_async_client.start()
+    await google_jwks.start()
+    await broadcast_backend.start()
+    await message_history.start()
+    await connection_reaper.start()
+    yield
+    await connection_reaper.stop()
+    room_presence.stop()
+    await message_history.stop()
+    await broadcast_backend.stop()
+    await google_jwks.stop()
+    await shared_async_client.stop()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.add_middleware(SessionMiddleware, secret_key=settings.SECRET_KEY)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        output_dir=settings.PROFILING_DIR,
+        token=settings.PROFILING_TOKEN,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+        interval=settings.PROFILING_INTERVAL_MS / 1000
+    )
 
 api_v1_router = APIRouter(prefix="/api/v1")
 api_v1_router.include_router(v1_chat_router)
 api_v1_router.include_router(v1_auth_router)
 api_v1_router.include_router(v1_login_router)
 api_v1_router.include_router(v1_user_router)
+api_v1_router.include_router(v1_health_router)
 
 app.include_router(api_v1_router)
+app.include_router(metrics_router)
 
 
 if __name__ == "__main__":
-    uvicorn.run(app, host=settings.UVICORN_HOST, port=settings.UVICORN_PORT)
\ No newline at end of file
+    uvicorn.run(
+        app,
+        host=settings.UVICORN_HOST,
+        port=settings.UVICORN_PORT,
+        ws_per_message_deflate=settings.WS_PER_MESSAGE_DEFLATE,
+        ws_ping_interval=settings.WS_PING_INTERVAL,
+        ws_ping_timeout=settings.WS_PING_TIMEOUT
+    )
\ No newline at end of file
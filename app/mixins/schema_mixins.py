@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class ResponseStatusMixin(BaseModel):
+    status_code: int
+    detail: str
@@ -0,0 +1,89 @@
+import time
+from collections import OrderedDict
+from typing import Callable
+from uuid import UUID
+
+
+class UserProfileCache:
+    """
+        Bounded LRU cache of ShowUser payloads, including unknown user ids.
+
+        A found profile lives for `ttl` seconds, an unknown id for `negative_ttl`
+        seconds, so a flood of requests for a missing user costs one query per
+        `negative_ttl`. UserManager invalidates an entry whenever it creates or
+        changes the user; other workers see the change once their entry expires.
+
+        Args:
+            max_size (int): Maximum number of cached ids, 0 disables the cache.
+            ttl (float): Lifetime of a cached profile, in seconds.
+            negative_ttl (float): Lifetime of a cached unknown id, in seconds.
+            clock (Callable[[], float]): Monotonic time source, in seconds.
+    """
+
+    def __init__(
+            self,
+            max_size: int,
+            ttl: float,
+            negative_ttl: float,
+            clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.clock = clock
+        self.hits: int = 0
+        self.negative_hits: int = 0
+        self.misses: int = 0
+        self.invalidations: int = 0
+        self._entries: OrderedDict[UUID, tuple[dict | None, float]] = OrderedDict()
+
+    def get(self, user_id: UUID) -> tuple[bool, dict | None]:
+        """
+            Looks up a user id.
+
+            Returns:
+                tuple[bool, dict | None]: Whether the id was cached, and the profile
+                    or None if the user is known not to exist.
+        """
+        entry: tuple[dict | None, float] | None = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        user_data, expires_at = entry
+        if self.clock() >= expires_at:
+            del self._entries[user_id]
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(user_id)
+        if user_data is None:
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+        return True, user_data
+
+    def put(self, user_id: UUID, user_data: dict | None) -> None:
+        """
+            Caches a profile, or None for a user id that does not exist.
+        """
+        if self.max_size <= 0:
+            return
+        ttl: float = self.ttl if user_data is not None else self.negative_ttl
+        self._entries[user_id] = (user_data, self.clock() + ttl)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: UUID) -> None:
+        self.invalidations += 1
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups: int = self.hits + self.negative_hits + self.misses
+        return (self.hits + self.negative_hits) / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
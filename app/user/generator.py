@@ -1,21 +1,106 @@
-from sqlalchemy import select
+from random import Random
+
+from sqlalchemy import any_, bindparam, select, String
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
-from random import choice
 
+from app.core.config import settings
+from app.core.metrics import metrics
 from app.user.model import User
 
+USERNAME_PREFIX: str = "user "
+USERNAME_DIGITS: int = 9
+
+
+class UsernameAllocator:
+    """
+        Finds free `user NNNNNNNNN` usernames with one query per batch of candidates.
+
+        A batch of random candidates is checked with a single `= ANY(...)`
+        query, which is one prepared statement whatever the batch size, and
+        the first free one is returned. With a billion possible
+        names a whole batch is taken only when the table is nearly full, so a
+        signup costs one query in practice.
+
+        Args:
+            batch_size (int): Number of candidates checked per query.
+            rng (Random | None): Source of the random digits, seeded in tests.
+    """
+
+    def __init__(self, batch_size: int, rng: Random | None = None) -> None:
+        self.batch_size = batch_size
+        self.rng = rng or Random()
+        self.allocations: int = 0
+        self.queries: int = 0
+        self.collisions: int = 0
+        self.retries: int = 0
+
+    def candidate(self) -> str:
+        return USERNAME_PREFIX + "".join(
+            self.rng.choice("0123456789") for _ in range(USERNAME_DIGITS)
+        )
+
+    def candidates(self) -> list[str]:
+        candidates: set[str] = set()
+        while len(candidates) < self.batch_size:
+            candidates.add(self.candidate())
+        return list(candidates)
+
+    async def allocate(self, db: AsyncSession) -> str:
+        """
+            Returns a username that is free at the time of the query.
+
+            A concurrent signup can still take it before the insert, which
+            the caller has to handle as a unique violation.
+
+            Args:
+                db (AsyncSession): Database session.
+
+            Returns:
+                str: The free username.
+        """
+        while True:
+            candidates: list[str] = self.candidates()
+            taken: set[str] = set(
+                await db.scalars(
+                    select(User.username).where(
+                        User.username == any_(
+                            bindparam("candidates", candidates, type_=ARRAY(String))
+                        )
+                    )
+                )
+            )
+            self.queries += 1
+            self.collisions += len(taken)
+            for candidate in candidates:
+                if candidate not in taken:
+                    self.allocations += 1
+                    return candidate
+            self.retries += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "allocations": self.allocations,
+            "queries": self.queries,
+            "collisions": self.collisions,
+            "retries": self.retries,
+        }
+
+
+username_allocator = UsernameAllocator(batch_size=settings.USERNAME_CANDIDATE_BATCH_SIZE)
+metrics.counter_callback(
+    "user_username_queries_total", "Queries that checked a batch of username candidates.",
+    callback=lambda: username_allocator.queries
+)
+metrics.counter_callback(
+    "user_username_collisions_total", "Username candidates that were already taken.",
+    callback=lambda: username_allocator.collisions
+)
+
+
+def _random_username() -> str:
+    return username_allocator.candidate()
 
-async def _is_username_taken(db: AsyncSession, username: str) -> bool:
-    return bool(
-        await db.scalar(select(User).filter_by(username=username))
-    )
 
 async def _generate_username(db: AsyncSession) -> str:
-    is_username_taken: bool = True
-    new_username: str = ""
-    while is_username_taken:
-        new_username = "user "
-        for _ in range(9):
-            new_username += choice("0123456789")
-        is_username_taken = await _is_username_taken(db=db, username=new_username)
-    return new_username
\ No newline at end of file
+    return await username_allocator.allocate(db=db)
@@ -1,11 +1,19 @@
 import logging
 from uuid import UUID
 
-from fastapi import APIRouter, status, Depends, Path
+from fastapi import APIRouter, status, Depends, Path, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
 
 from app.auth.router import get_current_user_ws, get_current_user
+from app.core.config import settings
+from app.core.responses import documented_by
+from app.user.schema import (
+    ShowUserResponse,
+    ShowUsersRequest,
+    ShowUsersResponse
+)
 from app.user.service import UserManager
 from app.mixins.db_mixin import get_db
 
@@ -14,17 +22,51 @@ logger = logging.getLogger(__name__)
 v1_user_router = APIRouter(prefix="/users", tags=["users"])
 
 
-@v1_user_router.get(path="/{user_id}", response_model=dict)
+@v1_user_router.get(path="", **documented_by(ShowUsersResponse))
+async def show_users(
+        get_user: Annotated[dict, Depends(get_current_user)],
+        db: Annotated[AsyncSession, Depends(get_db)],
+        ids: Annotated[
+            list[UUID], Query(min_length=1, max_length=settings.USERS_BATCH_MAX_IDS)
+        ]
+) -> ORJSONResponse:
+    users_data: dict = await UserManager.show_users(
+        user_ids=ids, db=db
+    )
+    return ORJSONResponse({
+        "data": users_data,
+        "status_code": status.HTTP_200_OK,
+        "detail": "Successful"
+    })
+
+
+@v1_user_router.post(path="/batch", **documented_by(ShowUsersResponse))
+async def show_users_batch(
+        get_user: Annotated[dict, Depends(get_current_user)],
+        db: Annotated[AsyncSession, Depends(get_db)],
+        users_request: ShowUsersRequest
+) -> ORJSONResponse:
+    users_data: dict = await UserManager.show_users(
+        user_ids=users_request.ids, db=db
+    )
+    return ORJSONResponse({
+        "data": users_data,
+        "status_code": status.HTTP_200_OK,
+        "detail": "Successful"
+    })
+
+
+@v1_user_router.get(path="/{user_id}", **documented_by(ShowUserResponse))
 async def show_user(
         get_user: Annotated[dict, Depends(get_current_user)],
         db: Annotated[AsyncSession, Depends(get_db)],
         user_id: Annotated[UUID, Path()]
-) -> dict:
+) -> ORJSONResponse:
     user_data: dict = await UserManager.show_user(
         user_id=user_id, db=db
     )
-    return {
+    return ORJSONResponse({
         "data": user_data,
         "status_code": status.HTTP_200_OK,
         "detail": "Successful"
-    }
\ No newline at end of file
+    })
\ No newline at end of file
@@ -2,6 +2,9 @@ from uuid import UUID
 
 from pydantic import Field, BaseModel
 
+from app.core.config import settings
+from app.mixins.schema_mixins import ResponseStatusMixin
+
 
 class BaseUser(BaseModel):
     fullname: str | None = None
@@ -25,3 +28,20 @@ class CreateUser(BaseUser):
 
 class UpdateUser(BaseUser):
     username: str | None = Field(min_length=4, max_length=8, default=None)
+
+
+class ShowUsersRequest(BaseModel):
+    ids: list[UUID] = Field(min_length=1, max_length=settings.USERS_BATCH_MAX_IDS)
+
+
+class ShowUserResponse(ResponseStatusMixin):
+    data: ShowUser
+
+
+class ShowUsersData(BaseModel):
+    users: dict[str, ShowUser]
+    not_found: list[str]
+
+
+class ShowUsersResponse(ResponseStatusMixin):
+    data: ShowUsersData
@@ -1,14 +1,73 @@
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import select, or_
+from sqlalchemy import any_, bindparam, select, or_
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.types import Uuid
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.schemas import GoogleUserData
-from app.user.generator import _generate_username
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.user.cache import UserProfileCache
+from app.user.generator import _generate_username, _random_username
 from app.user.model import User
 from app.user.schema import ShowUser, CreateUser
 
+user_profile_cache = UserProfileCache(
+    max_size=settings.USER_PROFILE_CACHE_SIZE,
+    ttl=settings.USER_PROFILE_CACHE_TTL_S,
+    negative_ttl=settings.USER_PROFILE_CACHE_NEGATIVE_TTL_S
+)
+metrics.counter_callback(
+    "user_profile_cache_lookups_total", "User profile cache lookups, by result.",
+    callback=lambda: {
+        ("hit",): user_profile_cache.hits,
+        ("negative_hit",): user_profile_cache.negative_hits,
+        ("miss",): user_profile_cache.misses,
+    },
+    labelnames=("result",)
+)
+
+
+def _invalidate_user_profile(user_id: UUID) -> None:
+    """
+        Drops a cached profile, has to be called after every commit that creates or changes a user.
+    """
+    user_profile_cache.invalidate(user_id)
+
+
+# Read-only endpoints select these columns into plain rows instead of loading User entities.
+SHOW_USER_COLUMNS: tuple = tuple(getattr(User, name) for name in ShowUser.model_fields)
+
+
+def _user_not_found_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="User with given id doesn't exist"
+    )
+
+
+async def _load_user_or_raise_exception(db: AsyncSession, user_id: UUID) -> User:
+    user: User | None = await db.scalar(
+        select(User).filter_by(id=user_id)
+    )
+    if not user:
+        user_profile_cache.put(user_id=user_id, user_data=None)
+        raise _user_not_found_exception()
+    return user
+
+
+async def _load_user_data_or_raise_exception(db: AsyncSession, user_id: UUID) -> dict:
+    row = (
+        await db.execute(select(*SHOW_USER_COLUMNS).where(User.id == user_id))
+    ).first()
+    if row is None:
+        user_profile_cache.put(user_id=user_id, user_data=None)
+        raise _user_not_found_exception()
+    return row._asdict()
+
 
 def _user_data_from_google_user_data(
         google_user_data: GoogleUserData, username: str
@@ -46,56 +105,155 @@ async def _does_google_user_already_exist(
     return bool(user)
 
 
+UPSERT_ATTEMPTS: int = 3
+
+
+async def _upsert_google_user(
+        db: AsyncSession, google_user_data: GoogleUserData, username: str
+) -> User:
+    """
+        Inserts a Google user or returns the existing one, in one statement.
+
+        On a google_id conflict the no-op update locks and returns the existing
+        row, even when it was inserted by a concurrent transaction that has not
+        committed when this statement starts.
+
+        Args:
+            db (AsyncSession): Database session.
+            google_user_data (GoogleUserData): The Google account.
+            username (str): The username of the user if it is new.
+
+        Returns:
+            User: The existing or the new user.
+
+        Raises:
+            IntegrityError: If the email or the username belongs to another user.
+    """
+    user_data: CreateUser = _user_data_from_google_user_data(
+        google_user_data=google_user_data, username=username
+    )
+    statement = insert(User).values(**user_data.model_dump())
+    statement = statement.on_conflict_do_update(
+        index_elements=[User.google_id],
+        set_={User.google_id: statement.excluded.google_id}
+    ).returning(User)
+    user: User = await db.scalar(
+        statement, execution_options={"populate_existing": True}
+    )
+    await db.commit()
+    _invalidate_user_profile(user.id)
+    return user
+
+
 class UserManager:
 
     @staticmethod
     async def get_user_or_raise_exception(
             db: AsyncSession, user_id: UUID
     ) -> User:
-        user: User | None = await db.scalar(
-            select(User).filter_by(id=user_id)
-        )
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User with given id doesn't exist"
-            )
-        return user
+        is_cached, user_data = user_profile_cache.get(user_id)
+        if is_cached and user_data is None:
+            raise _user_not_found_exception()
+        return await _load_user_or_raise_exception(db=db, user_id=user_id)
 
 
     @staticmethod
     async def show_user(
             db: AsyncSession, user_id: UUID
     ) -> dict:
-        user: User = await UserManager.get_user_or_raise_exception(
-            db=db, user_id=user_id
-        )
-        return ShowUser(**user.__dict__).model_dump()
+        is_cached, user_data = user_profile_cache.get(user_id)
+        if is_cached:
+            if user_data is None:
+                raise _user_not_found_exception()
+            return user_data
+        user_data = await _load_user_data_or_raise_exception(db=db, user_id=user_id)
+        user_profile_cache.put(user_id=user_id, user_data=user_data)
+        return user_data
 
 
     @staticmethod
-    async def create_user(
-            db: AsyncSession, google_user_data: GoogleUserData
-    ) -> User:
-        username: str = await _generate_username(db=db)
-        user_data: CreateUser = _user_data_from_google_user_data(
-            google_user_data=google_user_data, username=username
-        )
-        new_user: User = User(**user_data.model_dump())
-        db.add(new_user)
-        await db.commit()
-        return new_user
+    async def show_users(
+            db: AsyncSession, user_ids: list[UUID]
+    ) -> dict:
+        """
+            Resolves many user profiles, querying the uncached ones with one statement.
+
+            Args:
+                db (AsyncSession): Database session.
+                user_ids (list[UUID]): The ids, duplicates are resolved once.
+
+            Returns:
+                dict: "users" maps the string id to the profile, "not_found"
+                    lists the ids without a user.
+        """
+        users: dict[str, dict] = {}
+        not_found: list[str] = []
+        uncached_ids: list[UUID] = []
+        for user_id in dict.fromkeys(user_ids):
+            is_cached, user_data = user_profile_cache.get(user_id)
+            if not is_cached:
+                uncached_ids.append(user_id)
+            elif user_data is None:
+                not_found.append(str(user_id))
+            else:
+                users[str(user_id)] = user_data
+        if uncached_ids:
+            found: dict[UUID, dict] = {
+                row.id: row._asdict()
+                for row in await db.execute(
+                    select(*SHOW_USER_COLUMNS).where(
+                        User.id == any_(
+                            bindparam("user_ids", uncached_ids, type_=ARRAY(Uuid))
+                        )
+                    )
+                )
+            }
+            for user_id in uncached_ids:
+                user_data = found.get(user_id)
+                user_profile_cache.put(user_id=user_id, user_data=user_data)
+                if user_data is None:
+                    not_found.append(str(user_id))
+                else:
+                    users[str(user_id)] = user_data
+        return {"users": users, "not_found": not_found}
 
 
     @staticmethod
     async def get_or_create_user(
             db: AsyncSession, google_user_data: GoogleUserData
-    ):
-        user: User | None = await _get_user_or_none(
-            db=db, email=google_user_data.email, google_id=google_user_data.id
-        )
-        if not user:
-            user = await UserManager.create_user(
-                db=db, google_user_data=google_user_data
-            )
-        return user
\ No newline at end of file
+    ) -> User:
+        """
+            Returns the user of a Google account, creating it on the first login.
+
+            Concurrent first logins of one account all get the same user.
+
+            Args:
+                db (AsyncSession): Database session.
+                google_user_data (GoogleUserData): The Google account.
+
+            Returns:
+                User: The existing or the new user.
+
+            Raises:
+                IntegrityError: If no free username was found in UPSERT_ATTEMPTS attempts.
+        """
+        # Most logins are by existing users, so the first attempt does not
+        # spend a query on checking the username.
+        username: str = _random_username()
+        for attempt in range(UPSERT_ATTEMPTS):
+            try:
+                return await _upsert_google_user(
+                    db=db, google_user_data=google_user_data, username=username
+                )
+            except IntegrityError:
+                await db.rollback()
+                # The email is taken by a user with another google_id,
+                # or the random username is taken.
+                user: User | None = await _get_user_or_none(
+                    db=db, email=google_user_data.email, google_id=google_user_data.id
+                )
+                if user:
+                    return user
+                if attempt == UPSERT_ATTEMPTS - 1:
+                    raise
+                username = await _generate_username(db=db)
\ No newline at end of file
@@ -0,0 +1,62 @@
+"""
+    Measures the authenticated request path with and without the decoded JWT cache.
+
+    Sends REQUESTS authenticated requests with one token to an endpoint that
+    only needs the current user, through the full ASGI stack, and times
+    _decode_jwt_token on its own.
+
+    Run from the repository root (settings are read from .env):
+        python -m benchmarks.bench_auth_path
+"""
+import asyncio
+import logging
+import time
+
+from httpx import ASGITransport, AsyncClient
+
+from app.auth.service import _decode_jwt_token, token_cache
+from app.main import app
+from benchmarks.utils import make_token
+
+REQUESTS: int = 5000
+DECODES: int = 50_000
+URL: str = "http://test/api/v1/chat/rooms/bench/members"
+
+
+async def _requests_per_second(client: AsyncClient, token: str) -> float:
+    headers = {"Authorization": f"Bearer {token}"}
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        response = await client.get(URL, headers=headers)
+        assert response.status_code == 200
+    return REQUESTS / (time.perf_counter() - started)
+
+
+async def _decode_microseconds(token: str) -> float:
+    started = time.perf_counter()
+    for _ in range(DECODES):
+        await _decode_jwt_token(token)
+    return (time.perf_counter() - started) / DECODES * 1_000_000
+
+
+async def main() -> None:
+    logging.getLogger().setLevel(logging.WARNING)
+    token = await make_token("bench")
+    max_size = token_cache.max_size
+    print(f"{'cache':>6} {'requests/s':>11} {'decode us':>10} {'hit rate':>9}")
+    async with AsyncClient(transport=ASGITransport(app=app)) as client:
+        for enabled in (False, True):
+            token_cache.clear()
+            token_cache.hits = token_cache.misses = 0
+            token_cache.max_size = max_size if enabled else 0
+            requests_per_second = await _requests_per_second(client, token)
+            decode_microseconds = await _decode_microseconds(token)
+            print(
+                f"{str(enabled):>6} {requests_per_second:>11.0f} "
+                f"{decode_microseconds:>10.2f} {token_cache.hit_rate:>9.3f}"
+            )
+    token_cache.max_size = max_size
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,52 @@
+"""
+    Compares per-recipient serialization of a ChatEvent with serialize-once.
+
+    Run from the repository root:
+        python -m benchmarks.bench_broadcast_serialization
+"""
+import json
+import timeit
+from uuid import uuid4
+
+from app.auth.schemas import TokenUserData
+from app.chat.encoding import encode_chat_event
+from app.chat.schemas import ChatEvent, ChatEventType
+
+ROOM_SIZES: tuple[int, ...] = (10, 100, 500, 1000)
+REPEATS: int = 200
+
+
+def _per_recipient(chat_event: ChatEvent, room_size: int) -> None:
+    # What `send_json(chat_event.model_dump())` did for every socket.
+    for _ in range(room_size):
+        json.dumps(chat_event.model_dump(), separators=(",", ":"), ensure_ascii=False)
+
+
+def _serialize_once(chat_event: ChatEvent, room_size: int) -> None:
+    frame = encode_chat_event(chat_event)
+    for _ in range(room_size):
+        _ = frame
+
+
+def main() -> None:
+    chat_event = ChatEvent(
+        type=ChatEventType.message,
+        content="я люблю бананы " * 8,
+        sender=TokenUserData(username="user_1", user_id=str(uuid4()))
+    )
+    print(f"{'room size':>10} {'per recipient, ms':>18} {'serialize once, ms':>19} {'speedup':>8}")
+    for room_size in ROOM_SIZES:
+        per_recipient = timeit.timeit(
+            lambda: _per_recipient(chat_event, room_size), number=REPEATS
+        ) / REPEATS * 1000
+        serialize_once = timeit.timeit(
+            lambda: _serialize_once(chat_event, room_size), number=REPEATS
+        ) / REPEATS * 1000
+        print(
+            f"{room_size:>10} {per_recipient:>18.3f} {serialize_once:>19.4f} "
+            f"{per_recipient / serialize_once:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
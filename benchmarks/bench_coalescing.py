@@ -0,0 +1,81 @@
+"""
+    Measures group chat fan-out throughput with and without frame coalescing.
+
+    Starts the app on a local uvicorn server, connects RECEIVERS clients to one
+    room and lets one client send MESSAGES messages as fast as it can.
+
+    Run from the repository root (settings are read from .env):
+        python -m benchmarks.bench_coalescing
+"""
+import asyncio
+import time
+from uuid import uuid4
+
+import orjson
+import websockets
+
+from app.chat.router import rate_limiter
+from benchmarks.utils import make_token, running_server
+
+RECEIVERS: int = 50
+MESSAGES: int = 2000
+
+
+async def _receive_messages(websocket, expected: int) -> int:
+    """
+        Reads frames until `expected` message events arrived, returns the number of frames.
+    """
+    received, frames = 0, 0
+    while received < expected:
+        data = orjson.loads(await websocket.recv())
+        frames += 1
+        events = data if isinstance(data, list) else [data]
+        received += sum(1 for event in events if event["type"] == "message")
+    return frames
+
+
+async def _run(base_url: str, coalesce: bool) -> dict:
+    url = f"{base_url}/api/v1/chat/rooms/bench_{uuid4().hex[:8]}/ws"
+    flag = "&coalesce=true" if coalesce else ""
+    receivers = [
+        await websockets.connect(f"{url}?token={await make_token(f'reader {i}')}{flag}")
+        for i in range(RECEIVERS)
+    ]
+    sender = await websockets.connect(f"{url}?token={await make_token('writer')}")
+    await asyncio.sleep(0.5)
+
+    started = time.perf_counter()
+    readers = [
+        asyncio.create_task(_receive_messages(websocket, MESSAGES)) for websocket in receivers
+    ]
+    for i in range(MESSAGES):
+        await sender.send(orjson.dumps({"message": f"message {i}"}).decode())
+    frames = await asyncio.gather(*readers)
+    elapsed = time.perf_counter() - started
+
+    for websocket in [sender, *receivers]:
+        await websocket.close()
+    return {
+        "coalesce": coalesce,
+        "seconds": elapsed,
+        "events_per_second": MESSAGES * RECEIVERS / elapsed,
+        "frames_per_receiver": sum(frames) / len(frames),
+    }
+
+
+async def main() -> None:
+    # The writer deliberately floods the room, which the rate limit would reject.
+    rate_limiter.rate = rate_limiter.burst = float("inf")
+    async with running_server() as base_url:
+        print(f"{RECEIVERS} receivers, {MESSAGES} messages")
+        print(f"{'coalesce':>9} {'seconds':>8} {'events/s':>10} {'frames/receiver':>16}")
+        for coalesce in (False, True):
+            result = await _run(base_url, coalesce=coalesce)
+            print(
+                f"{str(result['coalesce']):>9} {result['seconds']:>8.2f} "
+                f"{result['events_per_second']:>10.0f} {result['frames_per_receiver']:>16.0f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
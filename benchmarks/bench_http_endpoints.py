@@ -0,0 +1,113 @@
+"""
+    Measures the latency of the HTTP API endpoints.
+
+    Sends REQUESTS requests to each endpoint through the full ASGI stack and
+    prints the mean and p99 latency. The user endpoints are served from a
+    pre-filled profile cache and the members endpoint from a room with MEMBERS
+    present users, so no database is needed.
+
+    --response-class json renders the routes that use the app's default
+    response class with the stdlib JSONResponse instead of ORJSONResponse;
+    routes returning a response of their own are not affected.
+
+    Run from the repository root (settings are read from .env):
+        python -m benchmarks.bench_http_endpoints
+        python -m benchmarks.bench_http_endpoints --response-class json
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from uuid import uuid4
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import APIRoute, request_response
+from httpx import ASGITransport, AsyncClient
+
+from app.auth.schemas import TokenUserData
+from app.chat.router import room_presence
+from app.main import app
+from app.user.service import user_profile_cache
+from benchmarks.utils import make_token
+
+REQUESTS: int = 2000
+USERS: int = 200
+MEMBERS: int = 200
+BASE_URL: str = "http://test/api/v1"
+
+
+RESPONSE_CLASSES: dict[str, type] = {"json": JSONResponse, "orjson": ORJSONResponse}
+
+
+def _use_response_class(response_class: type) -> None:
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.response_class is not response_class:
+            route.response_class = response_class
+            route.app = request_response(route.get_route_handler())
+
+
+def _fill_caches() -> tuple[str, list[str]]:
+    user_ids = [uuid4() for _ in range(USERS)]
+    for user_id in user_ids:
+        user_profile_cache.put(
+            user_id=user_id,
+            user_data={
+                "fullname": "Bench User",
+                "id": user_id,
+                "username": f"user {user_id.hex[:9]}",
+                "email": f"{user_id.hex}@example.com",
+                "google_id": user_id.hex,
+                "is_active": True,
+                "is_superuser": False,
+                "is_banned": False,
+            }
+        )
+    for _ in range(MEMBERS):
+        room_presence.join(
+            room_id="bench", user=TokenUserData(username="member", user_id=str(uuid4()))
+        )
+    return str(user_ids[0]), [str(user_id) for user_id in user_ids]
+
+
+async def _latencies_ms(client: AsyncClient, method: str, url: str, **kwargs) -> list[float]:
+    latencies: list[float] = []
+    for _ in range(REQUESTS):
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        latencies.append((time.perf_counter() - started) * 1000)
+        assert response.status_code < 300, response.text
+    return sorted(latencies)
+
+
+async def main(response_class: type) -> None:
+    logging.getLogger().setLevel(logging.WARNING)
+    _use_response_class(response_class)
+    user_id, user_ids = _fill_caches()
+    token = await make_token("bench")
+    headers = {"Authorization": f"Bearer {token}"}
+    endpoints: list[tuple[str, str, str, dict]] = [
+        ("user", "GET", f"/users/{user_id}", {"headers": headers}),
+        ("users x200", "POST", "/users/batch", {"headers": headers, "json": {"ids": user_ids}}),
+        ("members x200", "GET", "/chat/rooms/bench/members", {"headers": headers}),
+        ("token", "POST", "/auth/token", {"json": {"username": "bench", "user_id": user_id}}),
+        ("jwks", "GET", "/auth/.well-known/jwks.json", {}),
+        ("db pool", "GET", "/health/db-pool", {}),
+    ]
+    print(f"{'endpoint':>13} {'mean ms':>8} {'p99 ms':>8}")
+    async with AsyncClient(transport=ASGITransport(app=app), base_url=BASE_URL) as client:
+        for name, method, url, kwargs in endpoints:
+            # The first round warms up the route and the caches.
+            await _latencies_ms(client, method, url, **kwargs)
+            latencies = await _latencies_ms(client, method, url, **kwargs)
+            print(
+                f"{name:>13} {statistics.fmean(latencies):>8.3f} "
+                f"{latencies[int(len(latencies) * 0.99)]:>8.3f}"
+            )
+    room_presence.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency of the HTTP API endpoints")
+    parser.add_argument("--response-class", choices=tuple(RESPONSE_CLASSES), default="orjson")
+    asyncio.run(main(RESPONSE_CLASSES[parser.parse_args().response_class]))
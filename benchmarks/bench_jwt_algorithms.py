@@ -0,0 +1,63 @@
+"""
+    Measures JWT sign and verify throughput for every supported algorithm.
+
+    Compares passing raw key material to python-jose on every call, as the
+    auth service used to, with the pre-parsed keys of the KeyRing.
+
+    Run from the repository root:
+        python -m benchmarks.bench_jwt_algorithms
+"""
+import time
+from datetime import datetime, timedelta
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from jose import jwt
+
+from app.auth.keyring import KeyRing
+
+OPERATIONS: int = 5000
+
+
+def _pem(private_key) -> tuple[str, str]:
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    return private_pem, public_pem
+
+
+def _per_second(operation) -> float:
+    started = time.perf_counter()
+    for _ in range(OPERATIONS):
+        operation()
+    return OPERATIONS / (time.perf_counter() - started)
+
+
+def main() -> None:
+    claims = {"sub": "user_1", "user_id": "1", "exp": datetime.now() + timedelta(hours=1)}
+    keys: dict[str, tuple[str, str, str]] = {
+        "HS256": ("HS256", "a" * 32, "a" * 32),
+        "ES256": ("ES256", *_pem(ec.generate_private_key(ec.SECP256R1()))),
+        "EdDSA": ("EdDSA", *_pem(Ed25519PrivateKey.generate())),
+    }
+    print(f"{'algorithm':>9} {'keys':>10} {'sign/s':>9} {'verify/s':>9}")
+    for name, (algorithm, signing_key, verifying_key) in keys.items():
+        token = jwt.encode(claims=claims, key=signing_key, algorithm=algorithm)
+        raw_sign = _per_second(lambda: jwt.encode(claims=claims, key=signing_key, algorithm=algorithm))
+        raw_verify = _per_second(lambda: jwt.decode(token, key=verifying_key, algorithms=[algorithm]))
+
+        keyring = KeyRing(keys={name: (algorithm, signing_key)}, active_kid=name)
+        keyring_token = keyring.encode(claims=claims)
+        parsed_sign = _per_second(lambda: keyring.encode(claims=claims))
+        parsed_verify = _per_second(lambda: keyring.decode(keyring_token))
+
+        print(f"{name:>9} {'raw':>10} {raw_sign:>9.0f} {raw_verify:>9.0f}")
+        print(f"{name:>9} {'pre-parsed':>10} {parsed_sign:>9.0f} {parsed_verify:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+    Reconnect storm: CLIENTS clients join one room at once and get its recent history replayed.
+
+    The room's ring buffer is filled with REPLAYED events before the storm. Every
+    connection attempt and statement of the SQLAlchemy engine is counted to show
+    that replay is served from memory.
+
+    Run from the repository root (settings are read from .env):
+        python -m benchmarks.bench_reconnect_storm
+"""
+import asyncio
+import statistics
+import time
+from uuid import uuid4
+
+import orjson
+import websockets
+from sqlalchemy import event
+
+from app.auth.schemas import TokenUserData
+from app.chat.encoding import encode_chat_event
+from app.chat.router import recent_history
+from app.chat.schemas import ChatEvent, ChatEventType
+from app.core.config import settings
+from app.core.database import async_engine
+from benchmarks.utils import make_token, running_server
+
+CLIENTS: int = 1000
+REPLAYED: int = settings.CHAT_RECENT_HISTORY_SIZE
+
+
+class _DatabaseCalls:
+    def __init__(self) -> None:
+        self.connects: int = 0
+        self.statements: int = 0
+
+    def on_connect(self, *args) -> None:
+        self.connects += 1
+
+    def on_statement(self, *args) -> None:
+        self.statements += 1
+
+
+async def _join_and_read_history(url: str, token: str) -> tuple[float, int]:
+    """
+        Joins the room and reads until the first join event, which follows the replay.
+
+        Returns:
+            tuple[float, int]: Seconds until the replay was read and the number of replayed events.
+    """
+    started = time.perf_counter()
+    replayed: int = 0
+    async with websockets.connect(f"{url}?token={token}") as websocket:
+        while orjson.loads(await websocket.recv())["type"] == "message":
+            replayed += 1
+        return time.perf_counter() - started, replayed
+
+
+async def main() -> None:
+    room_id = f"storm_{uuid4().hex[:8]}"
+    sender = TokenUserData(username="speaker", user_id=str(uuid4()))
+    for i in range(REPLAYED):
+        recent_history.append(
+            room_id=room_id,
+            frame=encode_chat_event(
+                ChatEvent(type=ChatEventType.message, content=f"message {i}", sender=sender)
+            )
+        )
+    tokens = [await make_token(f"client {i}") for i in range(CLIENTS)]
+
+    calls = _DatabaseCalls()
+    event.listen(async_engine.sync_engine, "do_connect", calls.on_connect)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", calls.on_statement)
+
+    async with running_server() as base_url:
+        url = f"{base_url}/api/v1/chat/rooms/{room_id}/ws"
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(_join_and_read_history(url, token) for token in tokens)
+        )
+        elapsed = time.perf_counter() - started
+
+    latencies_ms = sorted(latency * 1000 for latency, _ in results)
+    fully_replayed = sum(1 for _, replayed in results if replayed == REPLAYED)
+    print(f"{CLIENTS} clients, {REPLAYED} replayed events each, storm took {elapsed:.2f}s")
+    print(
+        f"join + replay latency p50={statistics.median(latencies_ms):.1f}ms "
+        f"p99={latencies_ms[int(len(latencies_ms) * 0.99) - 1]:.1f}ms"
+    )
+    print(f"clients that got the whole history: {fully_replayed}/{CLIENTS}")
+    print(f"database connects={calls.connects} statements={calls.statements}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""
+    Measures requests per second of GET /users/{user_id} with the entity and the column read path.
+
+    The entity path is the former UserManager.show_user: it loads a User entity
+    into the identity map and builds ShowUser(**user.__dict__).model_dump().
+    The column path selects only the ShowUser columns into a row. The user
+    profile cache is disabled so that every request reads the database.
+
+    Needs the Postgres database from the settings; the tables are created if
+    missing and the benchmark user is deleted afterwards.
+
+    Run from the repository root (settings are read from .env):
+        python -m benchmarks.bench_user_read
+"""
+import asyncio
+import logging
+import time
+from uuid import UUID, uuid4
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.chat.model import Message  # noqa: F401, part of Base.metadata
+from app.core.base import Base
+from app.core.database import async_engine, async_session_maker
+from app.main import app
+from app.user.model import User
+from app.user.schema import ShowUser
+from app.user.service import UserManager, user_profile_cache
+from benchmarks.utils import make_token
+
+REQUESTS: int = 3000
+
+
+async def _show_user_entity(db: AsyncSession, user_id: UUID) -> dict:
+    user: User = await db.scalar(select(User).filter_by(id=user_id))
+    return ShowUser(**user.__dict__).model_dump()
+
+
+async def _requests_per_second(client: AsyncClient, url: str, token: str) -> float:
+    headers = {"Authorization": f"Bearer {token}"}
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        response = await client.get(url, headers=headers)
+        assert response.status_code == 200
+    return REQUESTS / (time.perf_counter() - started)
+
+
+async def main() -> None:
+    logging.getLogger().setLevel(logging.WARNING)
+    async_engine.echo = False
+    async with async_engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    user = User(
+        username=f"bench {uuid4().hex[:8]}",
+        email=f"{uuid4().hex}@example.com",
+        google_id=uuid4().hex
+    )
+    async with async_session_maker() as session:
+        session.add(user)
+        await session.commit()
+
+    token = await make_token("bench")
+    url = f"http://test/api/v1/users/{user.id}"
+    max_size = user_profile_cache.max_size
+    user_profile_cache.max_size = 0
+    show_user = UserManager.show_user
+    print(f"{'path':>8} {'requests/s':>11}")
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app)) as client:
+            for path, implementation in (("entity", _show_user_entity), ("columns", show_user)):
+                UserManager.show_user = staticmethod(implementation)
+                # The first round warms up the connection pool and statement caches.
+                await _requests_per_second(client, url, token)
+                print(f"{path:>8} {await _requests_per_second(client, url, token):>11.0f}")
+    finally:
+        UserManager.show_user = staticmethod(show_user)
+        user_profile_cache.max_size = max_size
+        async with async_session_maker() as session:
+            await session.execute(delete(User).filter_by(id=user.id))
+            await session.commit()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
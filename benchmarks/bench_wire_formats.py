@@ -0,0 +1,74 @@
+"""
+    Compares bytes on the wire and server CPU per chat message for every wire format.
+
+    A realistic stream of MESSAGES chat messages is encoded as JSON and as
+    MessagePack, each with and without permessage-deflate. Deflate uses one
+    compressor per connection with context takeover, like uvicorn does, so
+    repeated sender dicts shrink across frames.
+
+    Run from the repository root (settings are read from .env):
+        python -m benchmarks.bench_wire_formats
+"""
+import random
+import time
+import zlib
+from uuid import uuid4
+
+from app.auth.schemas import TokenUserData
+from app.chat.encoding import encode_chat_event, json_frame_to_msgpack
+from app.chat.schemas import ChatEvent, ChatEventType
+
+MESSAGES: int = 20_000
+SENDERS: int = 20
+WORDS: list[str] = ["привет", "как", "дела", "бананы", "яблоки", "ok", "lol", "завтра", "в", "чат"]
+
+
+def _make_frames() -> list[str]:
+    random.seed(0)
+    senders = [
+        TokenUserData(username=f"user_{i}", user_id=str(uuid4())) for i in range(SENDERS)
+    ]
+    return [
+        encode_chat_event(
+            ChatEvent(
+                type=ChatEventType.message,
+                content=" ".join(random.choices(WORDS, k=random.randint(1, 12))),
+                sender=random.choice(senders)
+            )
+        )
+        for _ in range(MESSAGES)
+    ]
+
+
+def _measure(frames: list[str], binary: bool, deflate: bool) -> dict:
+    # wbits=-15 is a raw deflate stream, as permessage-deflate sends it.
+    compressor = zlib.compressobj(wbits=-15)
+    wire_bytes: int = 0
+    started = time.perf_counter()
+    for frame in frames:
+        payload: bytes = json_frame_to_msgpack(frame) if binary else frame.encode()
+        if deflate:
+            payload = compressor.compress(payload) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        wire_bytes += len(payload)
+    elapsed = time.perf_counter() - started
+    return {
+        "bytes_per_message": wire_bytes / len(frames),
+        "microseconds_per_message": elapsed / len(frames) * 1_000_000,
+    }
+
+
+def main() -> None:
+    frames = _make_frames()
+    print(f"{MESSAGES} messages from {SENDERS} senders")
+    print(f"{'encoding':>9} {'deflate':>8} {'bytes/msg':>10} {'us/msg':>8}")
+    for binary in (False, True):
+        for deflate in (False, True):
+            result = _measure(frames, binary=binary, deflate=deflate)
+            print(
+                f"{'msgpack' if binary else 'json':>9} {str(deflate):>8} "
+                f"{result['bytes_per_message']:>10.1f} {result['microseconds_per_message']:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+    Load generator for the room chat endpoint.
+
+    Opens CLIENTS authenticated WebSocket clients spread over ROOMS rooms, lets
+    SENDERS of them send messages at a combined RATE per second for DURATION
+    seconds and measures the end-to-end delivery latency of every message to
+    every room member. Prints a JSON report with p50/p95/p99 latency, delivered
+    messages per second and the RSS of every server worker.
+
+    Without --url the app is served in-process on a local uvicorn, with the
+    message rate limit lifted. With --url the tool targets a running server;
+    pass its worker pids with --pid to get their RSS, and keep the per-sender
+    rate below CHAT_RATE_LIMIT_PER_SECOND or raise the limit.
+
+    Regression thresholds (--max-p99-ms, --min-messages-per-second,
+    --min-delivery-ratio) make the tool exit with status 1 when violated, so it
+    can gate a release.
+
+    Run from the repository root (settings are read from .env):
+        python -m benchmarks.load_chat --clients 500 --rooms 5 --senders 50 --rate 200
+        python -m benchmarks.load_chat --url ws://127.0.0.1:8888 --pid 4242 --max-p99-ms 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
+
+import msgpack
+import orjson
+import websockets
+
+from app.chat.router import rate_limiter
+from benchmarks.utils import make_token, running_server
+
+# Leaves frames that are still on their way after the last message some time to arrive.
+DRAIN_TIMEOUT: float = 5.0
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="WebSocket load generator for the room chat")
+    parser.add_argument("--url", help="base ws:// URL of a running server, default: serve in-process")
+    parser.add_argument("--pid", type=int, action="append", default=[],
+                        help="pid of a server worker to report RSS for, may be repeated")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--rooms", type=int, default=4)
+    parser.add_argument("--senders", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=100.0, help="messages per second, all senders together")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of sending")
+    parser.add_argument("--encoding", choices=("json", "msgpack"), default="json")
+    parser.add_argument("--connect-concurrency", type=int, default=100)
+    parser.add_argument("--max-p99-ms", type=float)
+    parser.add_argument("--min-messages-per-second", type=float)
+    parser.add_argument("--min-delivery-ratio", type=float)
+    return parser.parse_args(argv)
+
+
+def _percentile(sorted_values: list[float], percent: float) -> float | None:
+    if not sorted_values:
+        return None
+    index: int = min(len(sorted_values) - 1, int(len(sorted_values) * percent / 100))
+    return sorted_values[index]
+
+
+def _rss_mb(pid: int) -> float | None:
+    """
+        Reads the resident set size of a process from /proc, Linux only.
+    """
+    try:
+        with open(f"/proc/{pid}/status") as status_file:
+            for line in status_file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+class _Client:
+    def __init__(self, websocket, room_id: str, encoding: str) -> None:
+        self.websocket = websocket
+        self.room_id = room_id
+        self.encoding = encoding
+        self.latencies: list[float] = []
+
+    def _contents(self, frame: str | bytes) -> list[str]:
+        if self.encoding == "msgpack":
+            data = msgpack.unpackb(frame)
+            events = data if data and isinstance(data[0], list) else [data]
+            return [event[1] for event in events if event[0] == "message"]
+        data = orjson.loads(frame)
+        events = data if isinstance(data, list) else [data]
+        return [event["content"] for event in events if event["type"] == "message"]
+
+    async def read(self) -> None:
+        try:
+            async for frame in self.websocket:
+                received_at: float = time.perf_counter()
+                for content in self._contents(frame):
+                    self.latencies.append(received_at - float(content))
+        except websockets.ConnectionClosed:
+            pass
+
+    async def send(self, sent_at: float) -> None:
+        message: dict = {"message": repr(sent_at)}
+        if self.encoding == "msgpack":
+            await self.websocket.send(msgpack.packb(message))
+        else:
+            await self.websocket.send(orjson.dumps(message).decode())
+
+
+async def _connect(
+        base_url: str, args: argparse.Namespace, run_id: str
+) -> list[_Client]:
+    semaphore = asyncio.Semaphore(args.connect_concurrency)
+
+    async def _connect_one(index: int) -> _Client:
+        room_id = f"load_{run_id}_{index % args.rooms}"
+        token = await make_token(f"load {index}")
+        url = f"{base_url}/api/v1/chat/rooms/{room_id}/ws?token={token}&encoding={args.encoding}"
+        async with semaphore:
+            websocket = await websockets.connect(url, max_queue=None)
+        return _Client(websocket=websocket, room_id=room_id, encoding=args.encoding)
+
+    return list(await asyncio.gather(*(_connect_one(i) for i in range(args.clients))))
+
+
+async def _send_at_rate(sender: _Client, rate: float, duration: float) -> int:
+    interval: float = 1 / rate
+    started: float = time.perf_counter()
+    next_at: float = started
+    sent: int = 0
+    while next_at - started < duration:
+        delay: float = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await sender.send(sent_at=time.perf_counter())
+        sent += 1
+        next_at += interval
+    return sent
+
+
+@asynccontextmanager
+async def _target(args: argparse.Namespace) -> AsyncGenerator[tuple[str, list[int]]]:
+    if args.url:
+        yield args.url.rstrip("/"), args.pid
+        return
+    rate_limiter.rate = rate_limiter.burst = float("inf")
+    async with running_server() as base_url:
+        yield base_url, [os.getpid()]
+
+
+async def run_load(args: argparse.Namespace) -> dict:
+    """
+        Runs one load test.
+
+        Args:
+            args (argparse.Namespace): Options as parsed by _parse_args.
+
+        Returns:
+            dict: The report, see the module docstring.
+    """
+    run_id: str = os.urandom(4).hex()
+    async with _target(args) as (base_url, pids):
+        clients = await _connect(base_url=base_url, args=args, run_id=run_id)
+        readers = [asyncio.create_task(client.read()) for client in clients]
+        room_sizes: dict[str, int] = {}
+        for client in clients:
+            room_sizes[client.room_id] = room_sizes.get(client.room_id, 0) + 1
+        # Spread senders over the rooms: client i is in room i % rooms.
+        senders = clients[:min(args.senders, len(clients))]
+        await asyncio.sleep(0.5)
+
+        started = time.perf_counter()
+        sent_per_sender = await asyncio.gather(
+            *(_send_at_rate(sender, args.rate / len(senders), args.duration) for sender in senders)
+        )
+        sending_seconds = time.perf_counter() - started
+        expected: int = sum(
+            sent * room_sizes[sender.room_id] for sender, sent in zip(senders, sent_per_sender)
+        )
+        drain_deadline = time.perf_counter() + DRAIN_TIMEOUT
+        while (
+            sum(len(client.latencies) for client in clients) < expected
+            and time.perf_counter() < drain_deadline
+        ):
+            await asyncio.sleep(0.05)
+        elapsed = time.perf_counter() - started
+        rss: dict[str, float | None] = {str(pid): _rss_mb(pid) for pid in pids}
+
+        await asyncio.gather(*(client.websocket.close() for client in clients))
+        await asyncio.gather(*readers)
+
+    latencies_ms = sorted(
+        latency * 1000 for client in clients for latency in client.latencies
+    )
+    delivered: int = len(latencies_ms)
+    return {
+        "clients": len(clients),
+        "rooms": args.rooms,
+        "senders": len(senders),
+        "encoding": args.encoding,
+        "target_rate": args.rate,
+        "sent": sum(sent_per_sender),
+        "sent_per_second": sum(sent_per_sender) / sending_seconds,
+        "expected_deliveries": expected,
+        "delivered": delivered,
+        "delivery_ratio": delivered / expected if expected else None,
+        "messages_per_second": delivered / elapsed,
+        "latency_ms": {
+            "p50": _percentile(latencies_ms, 50),
+            "p95": _percentile(latencies_ms, 95),
+            "p99": _percentile(latencies_ms, 99),
+            "max": latencies_ms[-1] if latencies_ms else None,
+        },
+        "rss_mb": rss,
+    }
+
+
+def check_thresholds(report: dict, args: argparse.Namespace) -> list[str]:
+    """
+        Compares a report with the regression thresholds given on the command line.
+
+        Returns:
+            list[str]: Descriptions of the violated thresholds, empty if all passed.
+    """
+    failures: list[str] = []
+    p99: float | None = report["latency_ms"]["p99"]
+    if args.max_p99_ms is not None and (p99 is None or p99 > args.max_p99_ms):
+        failures.append(f"p99 latency {p99} ms > {args.max_p99_ms} ms")
+    if (
+        args.min_messages_per_second is not None
+        and report["messages_per_second"] < args.min_messages_per_second
+    ):
+        failures.append(
+            f"{report['messages_per_second']:.0f} messages/s < {args.min_messages_per_second}"
+        )
+    ratio: float | None = report["delivery_ratio"]
+    if args.min_delivery_ratio is not None and (ratio is None or ratio < args.min_delivery_ratio):
+        failures.append(f"delivery ratio {ratio} < {args.min_delivery_ratio}")
+    return failures
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    report = asyncio.run(run_load(args))
+    failures = check_thresholds(report, args)
+    report["threshold_failures"] = failures
+    report["passed"] = not failures
+    print(orjson.dumps(report, option=orjson.OPT_INDENT_2).decode())
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+import asyncio
+import logging
+import socket
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import AsyncGenerator
+from uuid import uuid4
+
+import uvicorn
+
+from app.auth.router import create_token
+from app.auth.schemas import TokenUserData
+from app.main import app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def make_token(username: str) -> str:
+    token_data = await create_token(
+        token_user_data=TokenUserData(username=username, user_id=str(uuid4())),
+        expires_delta=timedelta(hours=1)
+    )
+    return token_data["access_token"]
+
+
+@asynccontextmanager
+async def running_server() -> AsyncGenerator[str]:
+    """
+        Serves the app on a local uvicorn in the current event loop.
+
+        Yields:
+            str: Base websocket URL of the server, e.g. ws://127.0.0.1:12345.
+    """
+    logging.getLogger().setLevel(logging.WARNING)
+    port = free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    try:
+        yield f"ws://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        await serving
@@ -8,13 +8,21 @@ from datetime import timedelta
 from typing import AsyncGenerator
 from uuid import uuid4
 
+import asyncpg
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.router import create_token
 from app.auth.schemas import TokenUserData
+from app.core.base import Base
+from app.core.config import settings
+from app.core.database import async_engine, async_session_maker
 from app.main import app
+# Models have to be imported to be part of Base.metadata.
+from app.chat.model import Message
+from app.user.model import User
 from tests.conftest import URL_API_V1
 
 AUTH_API_URL: str = URL_API_V1 + "/auth"
@@ -79,4 +87,30 @@ async def user_2_token(user_2) -> str:
         await create_token(
             token_user_data=user_2, expires_delta=timedelta(days=365)
         )
-    )["access_token"]
\ No newline at end of file
+    )["access_token"]
+
+
+@pytest_asyncio.fixture
+async def postgres_dsn() -> str:
+    """
+        DSN of the test database; skips the test when Postgres is not reachable.
+    """
+    try:
+        connection = await asyncpg.connect(settings.DATABASE_DSN, timeout=2)
+    except (OSError, asyncpg.PostgresError) as e:
+        pytest.skip(f"Postgres is not available: {type(e).__name__}")
+    await connection.close()
+    return settings.DATABASE_DSN
+
+
+
+@pytest_asyncio.fixture
+async def db_session(postgres_dsn) -> AsyncGenerator[AsyncSession]:
+    """
+        Session on the test database with all tables created.
+    """
+    async with async_engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with async_session_maker() as session:
+        yield session
+    await async_engine.dispose()
@@ -24,3 +24,11 @@ class TestAuthToken:
         assert user_1_data["username"] == user.username
         assert user_1_data["user_id"] == user.user_id
 
+
+
+    @pytest.mark.asyncio
+    async def test_jwks_has_no_shared_secrets(self, async_user_client):
+        response = await async_user_client.get(url="/.well-known/jwks.json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert all(key["kty"] != "oct" for key in response.json()["keys"])
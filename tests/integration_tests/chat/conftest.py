@@ -1,11 +1,13 @@
 from typing import AsyncGenerator
 
+import pytest
 import pytest_asyncio
 
 from fastapi import WebSocket
 from fastapi.testclient import TestClient
 from starlette.testclient import WebSocketTestSession
 
+from app.chat.router import recent_history
 from app.main import app
 from tests.conftest import WEBSOCKET_URL
 
@@ -13,6 +15,16 @@ ECHO_CHAT_API_URL: str = f"{WEBSOCKET_URL}/api/v1/chat/echo/ws"
 SIMPLE_GROUP_CHAT_API_URL: str = f"{WEBSOCKET_URL}/api/v1/chat/simple_group_chat/ws"
 
 
+@pytest.fixture(autouse=True)
+def empty_recent_history():
+    """
+        Every test starts in rooms without replayed events from previous tests.
+    """
+    recent_history.clear()
+    yield
+    recent_history.clear()
+
+
 @pytest_asyncio.fixture
 async def echo_websocket() -> AsyncGenerator[WebSocketTestSession]:
     client = TestClient(app)
@@ -45,9 +57,23 @@ async def simple_group_chat_websocket() -> AsyncGenerator[WebSocketTestSession]:
 async def simple_group_chat_websocket_group(user_1_token, user_2_token):
     url_1 = SIMPLE_GROUP_CHAT_API_URL+f"?token={user_1_token}"
     url_2 = SIMPLE_GROUP_CHAT_API_URL + f"?token={user_2_token}"
-    client = TestClient(app)
+    # All sockets of one worker share an event loop, so keep them on one portal.
     with (
+        TestClient(app) as client,
         client.websocket_connect(url_1) as ws1,
         client.websocket_connect(url_2) as ws2,
     ):
-        yield ws1, ws2
\ No newline at end of file
+        yield ws1, ws2
+
+ROOM_CHAT_API_URL: str = f"{WEBSOCKET_URL}/api/v1/chat/rooms"
+
+
+@pytest_asyncio.fixture()
+async def room_chat_websocket_group(user_1_token, user_2_token):
+    with (
+        TestClient(app) as client,
+        client.websocket_connect(f"{ROOM_CHAT_API_URL}/bananas/ws?token={user_1_token}") as ws1,
+        client.websocket_connect(f"{ROOM_CHAT_API_URL}/bananas/ws?token={user_2_token}") as ws2,
+        client.websocket_connect(f"{ROOM_CHAT_API_URL}/apples/ws?token={user_2_token}") as ws3,
+    ):
+        yield ws1, ws2, ws3
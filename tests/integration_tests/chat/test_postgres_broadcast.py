@@ -0,0 +1,63 @@
+import asyncio
+import logging
+import statistics
+import time
+from uuid import uuid4
+
+from app.chat.broadcast import PostgresBroadcastBackend
+
+MESSAGES_COUNT: int = 200
+
+logger = logging.getLogger(__name__)
+
+
+class TestPostgresBroadcast:
+
+    async def test_cross_worker_delivery_latency(
+            self, postgres_dsn
+    ) -> None:
+        """
+            Two backends on one channel stand in for two uvicorn workers.
+        """
+        channel = f"test_broadcast_{uuid4().hex[:8]}"
+        received: dict[str, float] = {}
+        all_received = asyncio.Event()
+
+        def deliver_on_worker_2(room_id: str, frame: str) -> int:
+            received[frame] = time.perf_counter()
+            if len(received) == MESSAGES_COUNT:
+                all_received.set()
+            return 1
+
+        worker_1 = PostgresBroadcastBackend(
+            deliver=lambda room_id, frame: 1, dsn=postgres_dsn, channel=channel
+        )
+        worker_2 = PostgresBroadcastBackend(
+            deliver=deliver_on_worker_2, dsn=postgres_dsn, channel=channel
+        )
+        await worker_1.start()
+        await worker_2.start()
+        try:
+            sent: dict[str, float] = {}
+            for i in range(MESSAGES_COUNT):
+                frame = f'{{"type":"message","content":"{i}"}}'
+                sent[frame] = time.perf_counter()
+                worker_1.publish(room_id="room", frame=frame)
+                if i % 10 == 0:
+                    await asyncio.sleep(0.001)
+            await asyncio.wait_for(all_received.wait(), timeout=10)
+        finally:
+            await worker_1.stop()
+            await worker_2.stop()
+
+        assert list(received) == list(sent)
+        assert worker_1.notifications_sent < MESSAGES_COUNT
+
+        latencies_ms = sorted((received[frame] - sent[frame]) * 1000 for frame in sent)
+        p50 = statistics.median(latencies_ms)
+        p99 = latencies_ms[int(len(latencies_ms) * 0.99) - 1]
+        logger.info(
+            f"cross-worker latency p50={p50:.2f}ms p99={p99:.2f}ms, "
+            f"{MESSAGES_COUNT} frames in {worker_1.notifications_sent} NOTIFYs"
+        )
+        assert p99 < 500
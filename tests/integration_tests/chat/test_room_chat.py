@@ -0,0 +1,108 @@
+import msgpack
+from fastapi.testclient import TestClient
+
+from app.chat.router import registry
+from app.main import app
+from tests.integration_tests.chat.conftest import ROOM_CHAT_API_URL
+
+
+class TestRoomChat:
+
+    async def test_room_chat_is_scoped_to_room(
+            self, room_chat_websocket_group, user_1_data
+    ) -> None:
+        ws_1, ws_2, ws_3 = room_chat_websocket_group
+
+        assert ws_1.receive_json()["content"] == "Добро пожаловать, user_1!"
+        assert ws_1.receive_json()["content"] == "Добро пожаловать, user_2!"
+        assert ws_2.receive_json()["content"] == "Добро пожаловать, user_2!"
+        assert ws_3.receive_json()["content"] == "Добро пожаловать, user_2!"
+
+        ws_1.send_json({"message": "я люблю бананы"})
+        response_2 = ws_2.receive_json()
+        assert response_2["content"] == "я люблю бананы"
+        assert response_2["sender"] == user_1_data
+
+        ws_3.send_json({"message": "а я яблоки"})
+        response_3 = ws_3.receive_json()
+        assert response_3["content"] == "а я яблоки"
+
+        assert ws_1.receive_json()["content"] == "я люблю бананы"
+        assert {"bananas", "apples"} <= registry.room_ids()
+
+
+    async def test_recent_messages_are_replayed_on_join(
+            self, user_1_token, user_2_token, user_1_data
+    ) -> None:
+        url = f"{ROOM_CHAT_API_URL}/replay/ws"
+        with TestClient(app) as client:
+            with client.websocket_connect(f"{url}?token={user_1_token}") as ws_1:
+                ws_1.receive_json()
+                for i in range(3):
+                    ws_1.send_json({"message": str(i)})
+                    ws_1.receive_json()
+
+            with client.websocket_connect(f"{url}?token={user_2_token}") as ws_2:
+                replayed = [ws_2.receive_json() for _ in range(3)]
+                assert [event["content"] for event in replayed] == ["0", "1", "2"]
+                assert replayed[0]["sender"] == user_1_data
+                assert ws_2.receive_json()["content"] == "Добро пожаловать, user_2!"
+
+
+    async def test_msgpack_encoding(
+            self, user_1_token, user_2_token, user_1_data
+    ) -> None:
+        url = f"{ROOM_CHAT_API_URL}/binary/ws"
+        with (
+            TestClient(app) as client,
+            client.websocket_connect(f"{url}?token={user_1_token}&encoding=msgpack") as ws_1,
+            client.websocket_connect(f"{url}?token={user_2_token}") as ws_2,
+        ):
+            assert msgpack.unpackb(ws_1.receive_bytes()) == [
+                "join", "Добро пожаловать, user_1!", None, None
+            ]
+            ws_1.receive_bytes()
+            ws_2.receive_json()
+
+            ws_1.send_bytes(msgpack.packb({"message": "я люблю бананы"}))
+            assert msgpack.unpackb(ws_1.receive_bytes()) == [
+                "message", "я люблю бананы", user_1_data["user_id"], user_1_data["username"]
+            ]
+            response_2 = ws_2.receive_json()
+            assert response_2["content"] == "я люблю бананы"
+            assert response_2["sender"] == user_1_data
+
+            ws_1.send_bytes(b"\xc1")
+            assert msgpack.unpackb(ws_1.receive_bytes())[0] == "error"
+
+
+    async def test_presence_snapshot_diffs_and_members(
+            self, user_1_token, user_2_token, user_1_data, user_2_data
+    ) -> None:
+        url = f"{ROOM_CHAT_API_URL}/presence/ws"
+        with TestClient(app) as client:
+            with client.websocket_connect(f"{url}?token={user_1_token}&presence=true") as ws_1:
+                assert ws_1.receive_json() == {
+                    "type": "presence", "joined": [user_1_data["user_id"]], "left": []
+                }
+                with client.websocket_connect(f"{url}?token={user_2_token}") as ws_2:
+                    assert ws_2.receive_json()["type"] == "join"
+                    # user_1's own join may still be waiting for the diff window.
+                    diff = ws_1.receive_json()
+                    if user_2_data["user_id"] not in diff["joined"]:
+                        diff = ws_1.receive_json()
+                    assert diff["type"] == "presence"
+                    assert user_2_data["user_id"] in diff["joined"]
+
+                    response = client.get(
+                        "/api/v1/chat/rooms/presence/members",
+                        headers={"Authorization": f"Bearer {user_1_token}"}
+                    )
+                    assert response.status_code == 200
+                    assert sorted(
+                        member["user_id"] for member in response.json()["data"]
+                    ) == sorted([user_1_data["user_id"], user_2_data["user_id"]])
+
+                assert ws_1.receive_json() == {
+                    "type": "presence", "joined": [], "left": [user_2_data["user_id"]]
+                }
@@ -0,0 +1,38 @@
+from uuid import uuid4
+
+from app.chat.history import MessageHistoryWriter
+from app.chat.service import MessageManager
+from app.core.database import async_session_maker
+
+
+class TestRoomHistory:
+
+    async def test_keyset_pages_cover_history_newest_first(
+            self, db_session, user_1
+    ) -> None:
+        room_id = f"history_{uuid4().hex[:8]}"
+        writer = MessageHistoryWriter(
+            session_maker=async_session_maker,
+            batch_size=10,
+            flush_interval=60,
+            max_buffer_size=100
+        )
+        for i in range(25):
+            writer.add(room_id=room_id, sender=user_1, content=str(i))
+        await writer.stop()
+        assert writer.written == 25
+
+        contents: list[str] = []
+        cursor: str | None = None
+        pages: int = 0
+        while True:
+            messages, cursor = await MessageManager.get_history(
+                db=db_session, room_id=room_id, limit=10, cursor=cursor
+            )
+            pages += 1
+            contents.extend(message["content"] for message in messages)
+            if cursor is None:
+                break
+
+        assert pages == 3
+        assert contents == [str(i) for i in reversed(range(25))]
@@ -2,10 +2,18 @@ import asyncio
 import logging
 from time import sleep
 
+import pytest
+from fastapi import WebSocketDisconnect, status
+from fastapi.testclient import TestClient
+from starlette.testclient import WebSocketDenialResponse
 from starlette.websockets import WebSocket
 
 from app.auth.schemas import TokenUserData
+from app.chat.router import rate_limiter, registry, room_presence, SIMPLE_GROUP_CHAT_ROOM_ID
 from app.chat.schemas import ChatEvent, ChatEventType
+from app.core.config import settings
+from app.main import app
+from tests.integration_tests.chat.conftest import SIMPLE_GROUP_CHAT_API_URL
 
 # def _skip_n_ws_receives(websocket: WebSocket, n: int):
 #     for _ in range(n):
@@ -71,4 +79,88 @@ class TestSimpleGroupChat:
 
             ws_2.close()
             sleep(0.5)
-            assert "user_2 has disconnected!" in caplog.text
\ No newline at end of file
+            assert "user_2 has disconnected!" in caplog.text
+
+    async def test_simple_group_chat_coalesced(
+            self, user_1_token, user_2_token, user_2_data
+    ) -> None:
+        url_1 = SIMPLE_GROUP_CHAT_API_URL + f"?token={user_1_token}&coalesce=true"
+        url_2 = SIMPLE_GROUP_CHAT_API_URL + f"?token={user_2_token}"
+        with (
+            TestClient(app) as client,
+            client.websocket_connect(url_1) as ws_1,
+            client.websocket_connect(url_2) as ws_2,
+        ):
+            ws_2.receive_json()
+            messages = [{"message": str(i)} for i in range(5)]
+            for message in messages:
+                ws_2.send_json(message)
+
+            received: list[dict] = []
+            while len(received) < 2 + len(messages):
+                frame = ws_1.receive_json()
+                assert type(frame) is list
+                received.extend(frame)
+
+            assert [event["type"] for event in received] == ["join"] * 2 + ["message"] * len(messages)
+            assert [event["content"] for event in received[2:]] == [
+                message["message"] for message in messages
+            ]
+            assert received[2]["sender"] == user_2_data
+
+
+    async def test_simple_group_chat_rate_limit(
+            self, user_1_token, monkeypatch
+    ) -> None:
+        monkeypatch.setattr(rate_limiter, "rate", 0.001)
+        monkeypatch.setattr(rate_limiter, "burst", 2)
+        monkeypatch.setattr(settings, "CHAT_RATE_LIMIT_MAX_VIOLATIONS", 2)
+        with (
+            TestClient(app) as client,
+            client.websocket_connect(SIMPLE_GROUP_CHAT_API_URL + f"?token={user_1_token}") as ws_1,
+        ):
+            ws_1.receive_json()
+            for i in range(2):
+                ws_1.send_json({"message": str(i)})
+                assert ws_1.receive_json()["content"] == str(i)
+
+            ws_1.send_json({"message": "2"})
+            assert ws_1.receive_json()["type"] == "error"
+
+            ws_1.send_json({"message": "3"})
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                ws_1.receive_json()
+            assert exc_info.value.code == status.WS_1008_POLICY_VIOLATION
+
+
+    async def test_malformed_message_is_a_client_error(
+            self, user_1_token, user_1_data
+    ) -> None:
+        with (
+            TestClient(app) as client,
+            client.websocket_connect(SIMPLE_GROUP_CHAT_API_URL + f"?token={user_1_token}") as ws_1,
+        ):
+            ws_1.receive_json()
+            assert any(
+                member.user_id == user_1_data["user_id"]
+                for member in room_presence.members(SIMPLE_GROUP_CHAT_ROOM_ID)
+            )
+            ws_1.send_json({"not a message": "oops"})
+            error = ws_1.receive_json()
+            assert error["type"] == "error"
+            assert error["content"] == "Вы используете неверный формат сообщения"
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                ws_1.receive_json()
+            assert exc_info.value.code == status.WS_1007_INVALID_FRAME_PAYLOAD_DATA
+
+        assert len(registry) == 0
+        assert room_presence.members(SIMPLE_GROUP_CHAT_ROOM_ID) == []
+
+
+    async def test_invalid_token_is_rejected(self, fake_token) -> None:
+        with TestClient(app) as client:
+            # Authentication fails before accept, so the handshake is answered with HTTP 401.
+            with pytest.raises(WebSocketDenialResponse) as exc_info:
+                with client.websocket_connect(SIMPLE_GROUP_CHAT_API_URL + f"?token={fake_token}"):
+                    pass
+            assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
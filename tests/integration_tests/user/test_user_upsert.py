@@ -0,0 +1,51 @@
+import asyncio
+from uuid import uuid4
+
+from sqlalchemy import func, select
+
+from app.auth.schemas import GoogleUserData
+from app.core.database import async_session_maker
+from app.user.model import User
+from app.user.service import UserManager
+
+PARALLEL_LOGINS: int = 20
+
+
+async def _login(google_user_data: GoogleUserData) -> User:
+    async with async_session_maker() as session:
+        return await UserManager.get_or_create_user(
+            db=session, google_user_data=google_user_data
+        )
+
+
+class TestUserUpsert:
+
+    async def test_parallel_first_logins_create_one_user(self, db_session) -> None:
+        google_id = uuid4().hex
+        google_user_data = GoogleUserData(
+            id=google_id, email=f"{google_id}@example.com", name="user_1"
+        )
+
+        users = await asyncio.gather(
+            *(_login(google_user_data) for _ in range(PARALLEL_LOGINS))
+        )
+
+        assert len({user.id for user in users}) == 1
+        assert len({user.username for user in users}) == 1
+        assert await db_session.scalar(
+            select(func.count()).select_from(User).filter_by(google_id=google_id)
+        ) == 1
+
+
+    async def test_existing_user_is_returned_unchanged(self, db_session) -> None:
+        google_id = uuid4().hex
+        google_user_data = GoogleUserData(
+            id=google_id, email=f"{google_id}@example.com", name="user_1"
+        )
+        created: User = await _login(google_user_data)
+
+        logged_in: User = await _login(google_user_data)
+
+        assert logged_in.id == created.id
+        assert logged_in.username == created.username
+        assert logged_in.fullname == "user_1"
@@ -0,0 +1,32 @@
+from random import Random
+from uuid import uuid4
+
+from sqlalchemy import delete, select
+
+from app.user.generator import UsernameAllocator
+from app.user.model import User
+
+
+class TestUsernameAllocation:
+
+    async def test_prepopulated_table_costs_one_query_per_batch(self, db_session) -> None:
+        seed: int = uuid4().int
+        taken: list[str] = UsernameAllocator(batch_size=16, rng=Random(seed)).candidates()
+        db_session.add_all(
+            User(username=username, email=f"{uuid4().hex}@example.com", google_id=uuid4().hex)
+            for username in taken
+        )
+        await db_session.commit()
+        allocator = UsernameAllocator(batch_size=16, rng=Random(seed))
+
+        try:
+            username = await allocator.allocate(db=db_session)
+
+            assert username not in taken
+            assert not await db_session.scalar(select(User).filter_by(username=username))
+            assert allocator.stats() == {
+                "allocations": 1, "queries": 2, "collisions": 16, "retries": 1
+            }
+        finally:
+            await db_session.execute(delete(User).where(User.username.in_(taken)))
+            await db_session.commit()
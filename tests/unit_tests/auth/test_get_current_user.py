@@ -1,7 +1,11 @@
+from datetime import datetime, timedelta
+
 import pytest
 from fastapi import HTTPException, status
+from jose import jwt
 
 from app.auth.router import get_current_user_ws
+from app.auth.service import keyring
 
 
 class TestGetCurrentUser:
@@ -34,3 +38,37 @@ class TestGetCurrentUser:
 
         assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
         assert exc_info.value.detail == "Невалидный токен"
+
+
+    @pytest.mark.asyncio
+    async def test_get_current_user_with_list_kid(
+            self, user_1
+    ):
+        forged_token = jwt.encode(
+            claims={"sub": user_1.username, "user_id": user_1.user_id},
+            key="forged",
+            algorithm="HS256",
+            headers={"kid": ["default"]}
+        )
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user_ws(token=forged_token)
+
+        assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("missing_claim", ["exp", "sub", "user_id"])
+    async def test_get_current_user_without_required_claim(
+            self, user_1, missing_claim
+    ):
+        claims = {
+            "sub": user_1.username,
+            "user_id": user_1.user_id,
+            "exp": datetime.now() + timedelta(minutes=5),
+        }
+        del claims[missing_claim]
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user_ws(token=keyring.encode(claims=claims))
+
+        assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+        assert exc_info.value.detail == "Невалидный токен"
@@ -0,0 +1,186 @@
+import time
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from authlib.jose.errors import BadSignatureError, JoseError
+from jose import jwk, jwt
+
+from app.auth.google_jwks import JWKSCache
+from app.auth.service import _get_google_user_data
+from app.core.config import oauth
+from app.depends.async_client import SharedAsyncClient
+
+CLIENT_ID: str = oauth.google.client_id
+NONCE: str = "nonce-1"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now: float = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeGoogle:
+    """
+        Serves a locally generated key set as Google's JWKS endpoint and the userinfo endpoint.
+    """
+
+    def __init__(self) -> None:
+        self.private_pems: dict[str, str] = {}
+        self.jwks_requests: int = 0
+        self.userinfo_requests: int = 0
+        self.add_key("key-1")
+
+    def add_key(self, kid: str) -> None:
+        self.private_pems[kid] = rsa.generate_private_key(
+            public_exponent=65537, key_size=2048
+        ).private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ).decode()
+
+    def id_token(self, kid: str = "key-1", **claims) -> str:
+        now = int(time.time())
+        return jwt.encode(
+            claims={
+                "iss": "https://accounts.google.com",
+                "aud": CLIENT_ID,
+                "sub": "google-1",
+                "email": "user_1@example.com",
+                "name": "user_1",
+                "email_verified": True,
+                "nonce": NONCE,
+                "iat": now,
+                "exp": now + 3600,
+                **claims,
+            },
+            key=self.private_pems[kid],
+            algorithm="RS256",
+            headers={"kid": kid}
+        )
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/oauth2/v3/certs":
+            self.jwks_requests += 1
+            keys = [
+                {**jwk.construct(pem, "RS256").public_key().to_dict(), "kid": kid}
+                for kid, pem in self.private_pems.items()
+            ]
+            return httpx.Response(
+                200, json={"keys": keys}, headers={"Cache-Control": "public, max-age=600"}
+            )
+        self.userinfo_requests += 1
+        return httpx.Response(200, json={"id": "google-1", "email": "user_1@example.com"})
+
+
+@pytest.fixture
+def fake_google() -> FakeGoogle:
+    return FakeGoogle()
+
+
+@pytest.fixture
+def http_client(fake_google) -> SharedAsyncClient:
+    return SharedAsyncClient(transport=httpx.MockTransport(fake_google.handler))
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def google_jwks(http_client, clock, monkeypatch) -> JWKSCache:
+    jwks = JWKSCache(
+        url="https://www.googleapis.com/oauth2/v3/certs",
+        http_client=http_client,
+        min_refresh_interval=60,
+        clock=clock
+    )
+    monkeypatch.setattr(oauth.google, "fetch_jwk_set", jwks.fetch_jwk_set)
+    return jwks
+
+
+async def _parse_id_token(id_token: str) -> dict:
+    # The check authorize_access_token runs on the token response.
+    return await oauth.google.parse_id_token(
+        token={"id_token": id_token, "access_token": "access-token"}, nonce=NONCE
+    )
+
+
+class TestGoogleJWKS:
+
+    async def test_authlib_verifies_with_cached_keys(self, google_jwks, fake_google, clock):
+        for _ in range(3):
+            user_info = await _parse_id_token(fake_google.id_token())
+
+        assert user_info["sub"] == "google-1"
+        assert fake_google.jwks_requests == 1
+
+        clock.now = 601
+        await _parse_id_token(fake_google.id_token())
+        assert fake_google.jwks_requests == 2
+
+
+    async def test_unknown_kid_refreshes_at_most_once_per_interval(
+            self, google_jwks, fake_google, clock
+    ):
+        await _parse_id_token(fake_google.id_token())
+        fake_google.add_key("key-2")
+
+        with pytest.raises(ValueError):
+            await _parse_id_token(fake_google.id_token(kid="key-2"))
+        assert fake_google.jwks_requests == 1
+        clock.now = 60
+        assert (await _parse_id_token(fake_google.id_token(kid="key-2")))["sub"] == "google-1"
+        assert fake_google.jwks_requests == 2
+
+
+    async def test_forged_signature_is_rejected(self, google_jwks, fake_google):
+        forged = FakeGoogle()
+
+        with pytest.raises(BadSignatureError):
+            await _parse_id_token(forged.id_token())
+
+
+    @pytest.mark.parametrize("claims", [{"aud": "someone-else"}, {"exp": 1}, {"nonce": "replayed"}])
+    async def test_invalid_claims_are_rejected(self, google_jwks, fake_google, claims):
+        with pytest.raises(JoseError):
+            await _parse_id_token(fake_google.id_token(**claims))
+
+
+
+
+class TestGoogleUserData:
+
+    async def test_google_user_data_from_verified_claims(self, http_client, fake_google):
+        google_user_data = await _get_google_user_data(
+            token={
+                "access_token": "access-token",
+                "userinfo": {
+                    "sub": "google-1",
+                    "email": "user_1@example.com",
+                    "name": "user_1",
+                    "email_verified": False,
+                },
+            },
+            client=http_client.client
+        )
+
+        assert google_user_data.id == "google-1"
+        assert google_user_data.email == "user_1@example.com"
+        assert google_user_data.verified_email is False
+        assert fake_google.userinfo_requests == 0
+
+
+    async def test_userinfo_is_only_a_fallback(self, http_client, fake_google):
+        google_user_data = await _get_google_user_data(
+            token={"access_token": "access-token"}, client=http_client.client
+        )
+
+        assert google_user_data.id == "google-1"
+        assert fake_google.userinfo_requests == 1
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from jose import jwt, JWTError
+
+from app.auth.keyring import KeyRing, DEFAULT_KID
+
+
+def _pem(private_key) -> str:
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode()
+
+
+@pytest.fixture
+def keys() -> dict[str, tuple[str, str]]:
+    return {
+        DEFAULT_KID: ("HS256", "secret"),
+        "ec-1": ("ES256", _pem(ec.generate_private_key(ec.SECP256R1()))),
+        "ed-1": ("EdDSA", _pem(Ed25519PrivateKey.generate())),
+    }
+
+
+def _claims() -> dict:
+    return {"sub": "user_1", "user_id": "1", "exp": datetime.now() + timedelta(minutes=5)}
+
+
+class TestKeyRing:
+
+    @pytest.mark.parametrize("kid", [DEFAULT_KID, "ec-1", "ed-1"])
+    def test_sign_and_verify(self, keys, kid):
+        keyring = KeyRing(keys=keys, active_kid=kid)
+        token = keyring.encode(claims=_claims())
+
+        assert jwt.get_unverified_header(token)["kid"] == kid
+        assert jwt.get_unverified_header(token)["alg"] == keys[kid][0]
+        assert keyring.decode(token)["sub"] == "user_1"
+
+
+    def test_rotation_keeps_old_tokens_valid(self, keys):
+        old_token = KeyRing(keys=keys, active_kid=DEFAULT_KID).encode(claims=_claims())
+        legacy_token = jwt.encode(claims=_claims(), key="secret", algorithm="HS256")
+        rotated = KeyRing(keys=keys, active_kid="ed-1")
+
+        assert rotated.decode(old_token)["user_id"] == "1"
+        assert rotated.decode(legacy_token)["user_id"] == "1"
+
+
+    def test_unknown_kid_and_algorithm_mismatch_are_rejected(self, keys):
+        keyring = KeyRing(keys=keys, active_kid=DEFAULT_KID)
+        unknown = jwt.encode(claims=_claims(), key="secret", algorithm="HS256", headers={"kid": "gone"})
+        # An HS256 token claiming the kid of an asymmetric key must not verify.
+        confused = jwt.encode(claims=_claims(), key="secret", algorithm="HS256", headers={"kid": "ec-1"})
+
+        for token in (unknown, confused):
+            with pytest.raises(JWTError):
+                keyring.decode(token)
+
+
+    @pytest.mark.parametrize("kid", [["ec-1"], {"kid": "ec-1"}, 1])
+    def test_non_string_kid_is_rejected(self, keys, kid):
+        keyring = KeyRing(keys=keys, active_kid=DEFAULT_KID)
+        token = jwt.encode(claims=_claims(), key="secret", algorithm="HS256", headers={"kid": kid})
+
+        with pytest.raises(JWTError):
+            keyring.decode(token)
+
+
+    def test_jwks_publishes_only_public_keys(self, keys):
+        jwks = KeyRing(keys=keys, active_kid=DEFAULT_KID).jwks()
+
+        assert {key["kid"] for key in jwks["keys"]} == {"ec-1", "ed-1"}
+        for key in jwks["keys"]:
+            assert "d" not in key
+            assert "k" not in key
+            assert key["use"] == "sig"
+
+
+    def test_unknown_active_kid(self, keys):
+        with pytest.raises(JWTError):
+            KeyRing(keys=keys, active_kid="missing")
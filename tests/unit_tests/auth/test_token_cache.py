@@ -0,0 +1,65 @@
+from app.auth.router import get_current_user_ws
+from app.auth.service import token_cache
+from app.auth.token_cache import TokenCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now: float = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTokenCache:
+
+    def test_hit_and_miss(self, user_1):
+        cache = TokenCache(max_size=10, ttl=60, clock=FakeClock())
+        assert cache.get("token") is None
+        cache.put(token="token", token_user_data=user_1, exp=2000)
+
+        assert cache.get("token") == user_1
+        assert cache.hits == 1
+        assert cache.misses == 1
+        assert cache.hit_rate == 0.5
+
+
+    def test_entry_never_outlives_ttl_or_exp(self, user_1):
+        clock = FakeClock()
+        cache = TokenCache(max_size=10, ttl=60, clock=clock)
+        cache.put(token="long", token_user_data=user_1, exp=5000)
+        cache.put(token="short", token_user_data=user_1, exp=1010)
+
+        clock.now = 1010
+        assert cache.get("short") is None
+        assert cache.get("long") == user_1
+        clock.now = 1060
+        assert cache.get("long") is None
+        assert len(cache) == 0
+
+
+    def test_least_recently_used_is_evicted(self, user_1):
+        cache = TokenCache(max_size=2, ttl=60, clock=FakeClock())
+        cache.put(token="a", token_user_data=user_1, exp=2000)
+        cache.put(token="b", token_user_data=user_1, exp=2000)
+        cache.get("a")
+        cache.put(token="c", token_user_data=user_1, exp=2000)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == user_1
+        assert cache.get("c") == user_1
+
+
+    def test_disabled_cache(self, user_1):
+        cache = TokenCache(max_size=0, ttl=60)
+        cache.put(token="a", token_user_data=user_1, exp=2000)
+        assert len(cache) == 0
+
+
+    async def test_decoded_tokens_are_cached(self, user_1_token, user_1):
+        token_cache.clear()
+        hits: int = token_cache.hits
+
+        assert await get_current_user_ws(token=user_1_token) == user_1
+        assert await get_current_user_ws(token=user_1_token) == user_1
+        assert token_cache.hits == hits + 1
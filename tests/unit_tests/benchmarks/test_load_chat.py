@@ -0,0 +1,73 @@
+import pytest
+
+from benchmarks.load_chat import _parse_args, _percentile, check_thresholds
+
+
+def _report(
+        p99: float | None = 10.0,
+        messages_per_second: float = 1000.0,
+        delivery_ratio: float | None = 1.0
+) -> dict:
+    return {
+        "latency_ms": {"p50": 1.0, "p95": 5.0, "p99": p99, "max": 20.0},
+        "messages_per_second": messages_per_second,
+        "delivery_ratio": delivery_ratio,
+    }
+
+
+THRESHOLDS: list[str] = [
+    "--max-p99-ms", "50", "--min-messages-per-second", "500", "--min-delivery-ratio", "0.99"
+]
+
+
+class TestPercentile:
+
+    def test_empty_input(self) -> None:
+        assert _percentile([], 99) is None
+
+
+    @pytest.mark.parametrize(
+        "percent, expected",
+        [(0, 1.0), (50, 3.0), (99, 4.0), (100, 4.0), (150, 4.0)]
+    )
+    def test_index_is_clamped_to_the_last_value(self, percent, expected) -> None:
+        assert _percentile([1.0, 2.0, 3.0, 4.0], percent) == expected
+
+
+    def test_single_value(self) -> None:
+        assert _percentile([7.0], 99) == 7.0
+
+
+class TestCheckThresholds:
+
+    def test_no_thresholds_always_pass(self) -> None:
+        assert check_thresholds(_report(p99=None, delivery_ratio=None), _parse_args([])) == []
+
+
+    def test_all_thresholds_met(self) -> None:
+        assert check_thresholds(_report(), _parse_args(THRESHOLDS)) == []
+
+
+    @pytest.mark.parametrize(
+        "report, expected",
+        [
+            (_report(p99=51.0), "p99 latency"),
+            (_report(messages_per_second=499.0), "messages/s"),
+            (_report(delivery_ratio=0.98), "delivery ratio"),
+        ]
+    )
+    def test_each_threshold_fails_on_its_own(self, report, expected) -> None:
+        failures: list[str] = check_thresholds(report, _parse_args(THRESHOLDS))
+
+        assert len(failures) == 1
+        assert expected in failures[0]
+
+
+    def test_missing_p99_and_delivery_ratio_fail_their_thresholds(self) -> None:
+        failures: list[str] = check_thresholds(
+            _report(p99=None, delivery_ratio=None), _parse_args(THRESHOLDS)
+        )
+
+        assert len(failures) == 2
+        assert failures[0].startswith("p99 latency None")
+        assert failures[1].startswith("delivery ratio None")
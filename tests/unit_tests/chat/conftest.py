@@ -0,0 +1,102 @@
+import asyncio
+from typing import Callable
+
+import pytest
+from sqlalchemy.exc import DataError
+from starlette.websockets import WebSocketState
+
+from app.chat.connection import ChatConnection
+from app.chat.schemas import ChatEncoding
+
+
+class FakeWebSocket:
+    """
+        Collects frames sent by the server; can be paused to imitate a stalled client.
+    """
+
+    def __init__(self) -> None:
+        self.sent: list = []
+        self.closed_with: int | None = None
+        self.application_state = WebSocketState.CONNECTED
+        self.unblocked = asyncio.Event()
+        self.unblocked.set()
+
+    async def send_text(self, data: str) -> None:
+        await self.unblocked.wait()
+        self.sent.append(data)
+
+    async def send_bytes(self, data: bytes) -> None:
+        await self.unblocked.wait()
+        self.sent.append(data)
+
+    async def close(self, code: int = 1000, reason: str | None = None) -> None:
+        self.closed_with = code
+        self.application_state = WebSocketState.DISCONNECTED
+
+
+@pytest.fixture
+def fake_websocket() -> FakeWebSocket:
+    return FakeWebSocket()
+
+
+@pytest.fixture
+def stalled_websocket() -> FakeWebSocket:
+    websocket = FakeWebSocket()
+    websocket.unblocked.clear()
+    return websocket
+
+
+@pytest.fixture
+def make_connection(user_1):
+    def _make_connection(
+            max_queue_size: int = 64, encoding: ChatEncoding = ChatEncoding.json
+    ) -> ChatConnection:
+        return ChatConnection(
+            websocket=FakeWebSocket(),
+            user=user_1,
+            max_queue_size=max_queue_size,
+            encoding=encoding
+        )
+    return _make_connection
+
+
+class FakeSession:
+    def __init__(self, maker: "FakeSessionMaker") -> None:
+        self.maker = maker
+
+    async def __aenter__(self) -> "FakeSession":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+    async def execute(self, statement, params=None) -> None:
+        if self.maker.fail:
+            raise OSError("database is down")
+        if self.maker.refuse is not None and any(self.maker.refuse(row) for row in params):
+            raise DataError(str(statement), None, ValueError("value too long for type character varying(20)"))
+        self.maker.executed.append(list(params))
+
+    async def commit(self) -> None:
+        pass
+
+
+class FakeSessionMaker:
+    """
+        Stands in for async_sessionmaker and records every executemany batch.
+        `fail` imitates an unreachable database, `refuse` a batch with rows the
+        database rejects.
+    """
+
+    def __init__(self) -> None:
+        self.executed: list[list[dict]] = []
+        self.fail: bool = False
+        self.refuse: Callable[[dict], bool] | None = None
+
+    def __call__(self) -> FakeSession:
+        return FakeSession(self)
+
+
+@pytest.fixture
+def fake_session_maker() -> FakeSessionMaker:
+    return FakeSessionMaker()
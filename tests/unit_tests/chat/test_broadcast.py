@@ -0,0 +1,223 @@
+import asyncio
+
+import asyncpg
+import orjson
+
+from app.chat import broadcast
+from app.chat.broadcast import (
+    InProcessBroadcastBackend,
+    MAX_NOTIFY_PAYLOAD_BYTES,
+    PostgresBroadcastBackend
+)
+
+
+class TestBroadcastBackend:
+
+    def test_in_process_backend_delivers_locally(self):
+        delivered: list = []
+        backend = InProcessBroadcastBackend(
+            deliver=lambda room_id, frame: delivered.append((room_id, frame))
+        )
+        backend.publish(room_id="a", frame="hi")
+        assert delivered == [("a", "hi")]
+
+
+    def test_postgres_backend_delivers_locally_and_buffers(self):
+        delivered: list = []
+        backend = PostgresBroadcastBackend(
+            deliver=lambda room_id, frame: delivered.append((room_id, frame)),
+            dsn="postgresql://localhost/unused",
+            channel="test"
+        )
+        backend.publish(room_id="a", frame="not started")
+        backend._running = True
+        backend.publish(room_id="a", frame="hi")
+
+        assert delivered == [("a", "not started"), ("a", "hi")]
+        assert backend._pending == [("a", "hi")]
+
+
+    def test_postgres_backend_batches_within_payload_limit(self):
+        backend = PostgresBroadcastBackend(
+            deliver=lambda room_id, frame: 0, dsn="", channel="test"
+        )
+        messages = [(f"room_{i % 3}", "x" * 500 + str(i)) for i in range(40)]
+        payloads = backend._encode_payloads(messages)
+
+        assert 1 < len(payloads) < len(messages)
+        assert sum(frames for _, frames in payloads) == len(messages)
+        decoded: list = []
+        for payload, _ in payloads:
+            assert len(payload.encode()) < MAX_NOTIFY_PAYLOAD_BYTES
+            data = orjson.loads(payload)
+            assert data["worker"] == backend.worker_id
+            decoded.extend(tuple(message) for message in data["messages"])
+        assert decoded == messages
+
+
+    def test_postgres_backend_splits_oversized_frames(self):
+        sender = PostgresBroadcastBackend(deliver=lambda room_id, frame: 0, dsn="", channel="test")
+        delivered: list = []
+        receiver = PostgresBroadcastBackend(
+            deliver=lambda room_id, frame: delivered.append((room_id, frame)), dsn="", channel="test"
+        )
+        large_frame = '{"content":"' + '\u0001"ы' * MAX_NOTIFY_PAYLOAD_BYTES + '"}'
+        payloads = sender._encode_payloads([("a", "before"), ("a", large_frame), ("b", "after")])
+
+        assert len(payloads) > 3
+        assert sum(frames for _, frames in payloads) == 3
+        for payload, _ in payloads:
+            assert len(payload.encode()) < MAX_NOTIFY_PAYLOAD_BYTES
+            receiver._on_notification(None, 0, "test", payload)
+        assert delivered == [("a", "before"), ("a", large_frame), ("b", "after")]
+        assert receiver._partial_frames == {}
+
+
+    def test_postgres_backend_discards_frame_with_missing_part(self):
+        sender = PostgresBroadcastBackend(deliver=lambda room_id, frame: 0, dsn="", channel="test")
+        delivered: list = []
+        receiver = PostgresBroadcastBackend(
+            deliver=lambda room_id, frame: delivered.append((room_id, frame)), dsn="", channel="test"
+        )
+        first, _, *rest = sender._encode_payloads([("a", "x" * MAX_NOTIFY_PAYLOAD_BYTES * 2)])
+        small, = sender._encode_payloads([("a", "small")])
+
+        for payload, _ in (first, *rest, small):
+            receiver._on_notification(None, 0, "test", payload)
+        assert delivered == [("a", "small")]
+
+
+    def test_postgres_backend_bounds_pending_frames(self):
+        delivered: list = []
+        backend = PostgresBroadcastBackend(
+            deliver=lambda room_id, frame: delivered.append(frame), dsn="", channel="test", max_pending=2
+        )
+        backend._running = True
+        for i in range(5):
+            backend.publish(room_id="a", frame=str(i))
+
+        assert delivered == ["0", "1", "2", "3", "4"]
+        assert backend._pending == [("a", "0"), ("a", "1")]
+        assert backend.frames_dropped == 3
+
+
+    async def test_postgres_backend_reconnects_after_connection_loss(self, monkeypatch):
+        connections: list[FakeConnection] = []
+        failures: list[Exception] = [OSError("connection refused")]
+
+        async def connect(dsn: str) -> "FakeConnection":
+            if len(connections) >= 2 and failures:
+                raise failures.pop()
+            connection = FakeConnection()
+            connections.append(connection)
+            return connection
+
+        monkeypatch.setattr(broadcast.asyncpg, "connect", connect)
+        backend = PostgresBroadcastBackend(
+            deliver=lambda room_id, frame: 0, dsn="", channel="test",
+            batch_delay=0, reconnect_delay=0.001
+        )
+        await backend.start()
+        listen_connection, notify_connection = connections
+        notify_connection.fail_with = asyncpg.InterfaceError("connection is closed")
+
+        backend.publish(room_id="a", frame="lost")
+        for _ in range(100):
+            if backend.reconnects:
+                break
+            await asyncio.sleep(0.001)
+        backend.publish(room_id="a", frame="after reconnect")
+        await asyncio.sleep(0.01)
+        await backend.stop()
+
+        assert backend.reconnects == 1
+        assert backend.frames_dropped == 1
+        assert listen_connection.terminated and notify_connection.terminated
+        assert [orjson.loads(payload)["messages"] for payload in connections[3].notified] == [
+            [["a", "after reconnect"]]
+        ]
+
+
+    async def test_postgres_backend_reconnects_when_listener_connection_is_lost(self, monkeypatch):
+        connections: list[FakeConnection] = []
+
+        async def connect(dsn: str) -> "FakeConnection":
+            connection = FakeConnection()
+            connections.append(connection)
+            return connection
+
+        monkeypatch.setattr(broadcast.asyncpg, "connect", connect)
+        backend = PostgresBroadcastBackend(
+            deliver=lambda room_id, frame: 0, dsn="", channel="test", batch_delay=0
+        )
+        await backend.start()
+        connections[0].lose()
+        for _ in range(100):
+            if backend.reconnects:
+                break
+            await asyncio.sleep(0.001)
+        await backend.stop()
+
+        assert backend.reconnects == 1
+        assert len(connections) == 4
+        assert connections[2].listeners == []
+
+
+    def test_postgres_backend_ignores_own_notifications(self):
+        delivered: list = []
+        backend = PostgresBroadcastBackend(
+            deliver=lambda room_id, frame: delivered.append((room_id, frame)),
+            dsn="",
+            channel="test"
+        )
+        (own, _), = backend._encode_payloads([("a", "mine")])
+        foreign = orjson.dumps({"worker": "other", "messages": [["a", "theirs"]]}).decode()
+
+        backend._on_notification(None, 0, "test", own)
+        backend._on_notification(None, 0, "test", foreign)
+        assert delivered == [("a", "theirs")]
+
+
+class FakeConnection:
+    """
+        Stands in for an asyncpg connection; `fail_with` makes the next NOTIFY fail.
+    """
+
+    def __init__(self) -> None:
+        self.notified: list[str] = []
+        self.listeners: list = []
+        self.termination_listeners: list = []
+        self.fail_with: Exception | None = None
+        self.terminated: bool = False
+        self.closed: bool = False
+
+    def add_termination_listener(self, callback) -> None:
+        self.termination_listeners.append(callback)
+
+    def remove_termination_listener(self, callback) -> None:
+        self.termination_listeners.remove(callback)
+
+    async def add_listener(self, channel: str, callback) -> None:
+        self.listeners.append(callback)
+
+    async def remove_listener(self, channel: str, callback) -> None:
+        self.listeners.remove(callback)
+
+    async def execute(self, query: str, channel: str, payload: str) -> None:
+        if self.fail_with is not None:
+            raise self.fail_with
+        self.notified.append(payload)
+
+    def is_closed(self) -> bool:
+        return self.closed or self.terminated
+
+    def lose(self) -> None:
+        self.closed = True
+        for callback in self.termination_listeners:
+            callback(self)
+
+    def terminate(self) -> None:
+        self.terminated = True
+
+    async def close(self) -> None:
+        self.closed = True
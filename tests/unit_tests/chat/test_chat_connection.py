@@ -0,0 +1,138 @@
+import asyncio
+
+import msgpack
+
+from app.chat.connection import ChatConnection, OverflowPolicy, broadcast_stats
+from app.chat.encoding import encode_chat_event
+from app.chat.registry import ConnectionRegistry
+from app.chat.schemas import ChatEncoding, ChatEvent, ChatEventType
+
+
+class TestChatConnection:
+
+    async def test_enqueue_is_delivered_in_order(
+            self, fake_websocket, user_1
+    ):
+        connection = ChatConnection(
+            websocket=fake_websocket, user=user_1, max_queue_size=8
+        )
+        connection.start()
+        for i in range(3):
+            assert connection.enqueue(str(i))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        await connection.stop()
+
+        assert fake_websocket.sent == ["0", "1", "2"]
+        assert connection.queued == 3
+        assert connection.dropped == 0
+
+
+    async def test_stalled_client_does_not_block_others(
+            self, fake_websocket, stalled_websocket, user_1, user_2
+    ):
+        fast = ChatConnection(websocket=fake_websocket, user=user_1, max_queue_size=8)
+        slow = ChatConnection(websocket=stalled_websocket, user=user_2, max_queue_size=8)
+        fast.start()
+        slow.start()
+
+        registry = ConnectionRegistry()
+        registry.join(room_id="room", connection=fast)
+        registry.join(room_id="room", connection=slow)
+        registry.broadcast(
+            room_id="room",
+            frame=encode_chat_event(ChatEvent(type=ChatEventType.message, content="hi"))
+        )
+        await asyncio.sleep(0.01)
+
+        assert len(fake_websocket.sent) == 1
+        assert stalled_websocket.sent == []
+        await fast.stop()
+        await slow.stop()
+
+
+    async def test_drop_oldest_policy(
+            self, stalled_websocket, user_1
+    ):
+        dropped_before = broadcast_stats.dropped
+        connection = ChatConnection(
+            websocket=stalled_websocket,
+            user=user_1,
+            max_queue_size=2,
+            overflow_policy=OverflowPolicy.drop_oldest
+        )
+        for i in range(5):
+            assert connection.enqueue(str(i))
+
+        assert connection.dropped == 3
+        assert broadcast_stats.dropped - dropped_before == 3
+
+        connection.start()
+        stalled_websocket.unblocked.set()
+        await asyncio.sleep(0.01)
+        await connection.stop()
+        assert stalled_websocket.sent == ["3", "4"]
+
+
+    async def test_disconnect_policy(
+            self, stalled_websocket, user_1
+    ):
+        connection = ChatConnection(
+            websocket=stalled_websocket,
+            user=user_1,
+            max_queue_size=1,
+            overflow_policy=OverflowPolicy.disconnect,
+            overflow_close_code=4008
+        )
+        connection.start()
+        assert connection.enqueue("0")
+        await asyncio.sleep(0)
+        assert connection.enqueue("1")
+        assert not connection.enqueue("2")
+        await asyncio.sleep(0.01)
+
+        assert stalled_websocket.closed_with == 4008
+        assert not connection.enqueue("3")
+
+
+    async def test_coalesce_window_sends_one_array_frame(
+            self, fake_websocket, user_1
+    ):
+        connection = ChatConnection(
+            websocket=fake_websocket,
+            user=user_1,
+            max_queue_size=8,
+            coalesce_window=0.01
+        )
+        connection.start()
+        for i in range(3):
+            connection.enqueue(f'{{"n":{i}}}')
+        await asyncio.sleep(0.05)
+        connection.enqueue('{"n":3}')
+        await asyncio.sleep(0.05)
+        await connection.stop()
+
+        assert fake_websocket.sent == ['[{"n":0},{"n":1},{"n":2}]', '[{"n":3}]']
+        assert connection.sent_frames == 2
+
+
+    async def test_send_now_uses_connection_encoding(
+            self, fake_websocket, user_1
+    ):
+        connection = ChatConnection(
+            websocket=fake_websocket,
+            user=user_1,
+            max_queue_size=8,
+            coalesce_window=0.01,
+            encoding=ChatEncoding.msgpack
+        )
+        frames = [
+            encode_chat_event(ChatEvent(type=ChatEventType.message, content=str(i), sender=user_1))
+            for i in range(2)
+        ]
+        await connection.send_now(frames)
+
+        assert len(fake_websocket.sent) == 1
+        assert msgpack.unpackb(fake_websocket.sent[0]) == [
+            ["message", str(i), user_1.user_id, user_1.username] for i in range(2)
+        ]
@@ -0,0 +1,120 @@
+import asyncio
+import random
+
+import msgpack
+
+from app.chat.encoding import encode_chat_event
+from app.chat.registry import ConnectionRegistry
+from app.chat.schemas import ChatEncoding, ChatEvent, ChatEventType
+
+
+class TestConnectionRegistry:
+
+    def test_join_and_leave(self, make_connection):
+        registry = ConnectionRegistry()
+        connection_1, connection_2 = make_connection(), make_connection()
+
+        registry.join(room_id="a", connection=connection_1)
+        registry.join(room_id="a", connection=connection_2)
+        registry.join(room_id="b", connection=connection_1)
+
+        assert registry.members("a") == {connection_1, connection_2}
+        assert registry.rooms_of(connection_1) == {"a", "b"}
+        assert len(registry) == 2
+
+        registry.leave(room_id="a", connection=connection_1)
+        assert registry.members("a") == {connection_2}
+        assert registry.rooms_of(connection_1) == {"b"}
+
+
+    def test_empty_rooms_are_removed(self, make_connection):
+        registry = ConnectionRegistry()
+        connection = make_connection()
+        registry.join(room_id="a", connection=connection)
+        registry.join(room_id="b", connection=connection)
+
+        assert registry.leave_all(connection) == {"a", "b"}
+        assert registry.room_ids() == frozenset()
+        assert len(registry) == 0
+
+
+    def test_broadcast_is_scoped_to_room(self, make_connection):
+        registry = ConnectionRegistry()
+        in_room, outside = make_connection(), make_connection()
+        registry.join(room_id="a", connection=in_room)
+        registry.join(room_id="b", connection=outside)
+
+        assert registry.broadcast(room_id="a", frame="hi") == 1
+        assert in_room.queued == 1
+        assert outside.queued == 0
+        assert registry.broadcast(room_id="missing", frame="hi") == 0
+
+
+    async def test_broadcast_converts_frame_for_msgpack_members(
+            self, make_connection, user_1
+    ):
+        registry = ConnectionRegistry()
+        json_member = make_connection()
+        msgpack_members = [make_connection(encoding=ChatEncoding.msgpack) for _ in range(3)]
+        for connection in [json_member, *msgpack_members]:
+            registry.join(room_id="a", connection=connection)
+            connection.start()
+        frame = encode_chat_event(
+            ChatEvent(type=ChatEventType.message, content="hi", sender=user_1)
+        )
+
+        assert registry.broadcast(room_id="a", frame=frame) == 4
+        await asyncio.sleep(0.01)
+        for connection in [json_member, *msgpack_members]:
+            await connection.stop()
+
+        assert json_member.websocket.sent == [frame]
+        binary_frames = [connection.websocket.sent[0] for connection in msgpack_members]
+        assert binary_frames[0] == binary_frames[1] == binary_frames[2]
+        assert binary_frames[0] is binary_frames[1] is binary_frames[2]
+        assert msgpack.unpackb(binary_frames[0]) == ["message", "hi", user_1.user_id, user_1.username]
+
+
+    def test_broadcast_to_presence_audience(self, make_connection):
+        registry = ConnectionRegistry()
+        subscriber, other = make_connection(), make_connection()
+        subscriber.presence = True
+        registry.join(room_id="a", connection=subscriber)
+        registry.join(room_id="a", connection=other)
+
+        assert registry.broadcast(room_id="a", frame="diff", presence=True) == 1
+        assert registry.broadcast(room_id="a", frame="notice", presence=False) == 1
+        assert registry.broadcast(room_id="a", frame="message") == 2
+        assert subscriber.queued == other.queued == 2
+
+
+    async def test_concurrent_join_leave_churn(self, make_connection):
+        registry = ConnectionRegistry()
+        room_ids: list[str] = [f"room_{i}" for i in range(20)]
+        rng = random.Random(42)
+
+        async def churn() -> None:
+            connection = make_connection()
+            for _ in range(50):
+                room_id = rng.choice(room_ids)
+                if rng.random() < 0.6:
+                    registry.join(room_id=room_id, connection=connection)
+                else:
+                    registry.leave(room_id=room_id, connection=connection)
+                registry.broadcast(room_id=room_id, frame="frame")
+                await asyncio.sleep(0)
+            if rng.random() < 0.5:
+                registry.leave_all(connection)
+
+        await asyncio.gather(*(churn() for _ in range(200)))
+
+        for room_id in registry.room_ids():
+            members = registry.members(room_id)
+            assert members
+            for connection in members:
+                assert room_id in registry.rooms_of(connection)
+        connections = {c for r in registry.room_ids() for c in registry.members(r)}
+        assert len(registry) == len(connections)
+        for connection in connections:
+            for room_id in registry.rooms_of(connection):
+                assert connection in registry.members(room_id)
@@ -0,0 +1,110 @@
+import json
+
+import msgpack
+import pytest
+
+from app.chat.encoding import (
+    encode_chat_event,
+    is_message_frame,
+    frame_type,
+    json_frame_to_msgpack,
+    join_frames,
+    decode_client_message
+)
+from app.chat.schemas import ChatEvent, ChatEventType, ChatEncoding, PresenceDiff
+
+
+class TestEncodeChatEvent:
+
+    def test_encode_chat_event_matches_model_dump(
+            self, user_1
+    ):
+        chat_event = ChatEvent(
+            type=ChatEventType.message, content="я люблю бананы", sender=user_1
+        )
+        frame = encode_chat_event(chat_event)
+
+        assert type(frame) is str
+        assert json.loads(frame) == chat_event.model_dump(mode="json")
+
+
+    def test_encode_chat_event_without_sender(self):
+        frame = encode_chat_event(
+            ChatEvent(type=ChatEventType.join, content="Добро пожаловать")
+        )
+        assert json.loads(frame) == {
+            "type": "join", "content": "Добро пожаловать", "sender": None
+        }
+
+
+
+    def test_is_message_frame(self, user_1):
+        assert is_message_frame(
+            encode_chat_event(ChatEvent(type=ChatEventType.message, content="hi", sender=user_1))
+        )
+        for event_type in (ChatEventType.join, ChatEventType.leave, ChatEventType.error):
+            assert not is_message_frame(
+                encode_chat_event(ChatEvent(type=event_type, content="hi"))
+            )
+
+
+    def test_frame_type(self, user_1):
+        assert frame_type(
+            encode_chat_event(ChatEvent(type=ChatEventType.message, content="hi", sender=user_1))
+        ) == "message"
+        assert frame_type(encode_chat_event(PresenceDiff(joined=["1"], left=[]))) == "presence"
+
+
+    def test_json_frame_to_msgpack(self, user_1):
+        frame = encode_chat_event(
+            ChatEvent(type=ChatEventType.message, content="я люблю бананы", sender=user_1)
+        )
+        binary_frame = json_frame_to_msgpack(frame)
+
+        assert msgpack.unpackb(binary_frame) == [
+            "message", "я люблю бананы", user_1.user_id, user_1.username
+        ]
+        assert len(binary_frame) < len(frame.encode())
+        assert msgpack.unpackb(
+            json_frame_to_msgpack(encode_chat_event(ChatEvent(type=ChatEventType.join, content="hi")))
+        ) == ["join", "hi", None, None]
+        assert msgpack.unpackb(
+            json_frame_to_msgpack(encode_chat_event(PresenceDiff(joined=["1"], left=["2"])))
+        ) == ["presence", ["1"], ["2"]]
+
+
+    def test_join_frames(self):
+        assert join_frames(['{"n":0}', '{"n":1}']) == '[{"n":0},{"n":1}]'
+        assert msgpack.unpackb(
+            join_frames([msgpack.packb([0]), msgpack.packb([1])])
+        ) == [[0], [1]]
+
+
+    def test_decode_client_message(self):
+        assert decode_client_message(
+            data='{"message":"hi"}', encoding=ChatEncoding.json
+        ) == {"message": "hi"}
+        assert decode_client_message(
+            data=msgpack.packb({"message": "hi"}), encoding=ChatEncoding.msgpack
+        ) == {"message": "hi"}
+        for data, encoding in (("not json", ChatEncoding.json), (b"\xc1", ChatEncoding.msgpack)):
+            with pytest.raises(ValueError):
+                decode_client_message(data=data, encoding=encoding)
+
+
+    @pytest.mark.parametrize(
+        "data, encoding",
+        [
+            ('["message"]', ChatEncoding.json),
+            ('"hi"', ChatEncoding.json),
+            ('{"not a message": "oops"}', ChatEncoding.json),
+            ('{"message": 1}', ChatEncoding.json),
+            (msgpack.packb([1, 2]), ChatEncoding.msgpack),
+            (msgpack.packb({"message": None}), ChatEncoding.msgpack),
+            # A map with an array key, which Python cannot hash.
+            (b"\x81\x90\x01", ChatEncoding.msgpack),
+        ]
+    )
+    def test_decode_client_message_rejects_malformed_messages(self, data, encoding):
+        with pytest.raises(ValueError):
+            decode_client_message(data=data, encoding=encoding)
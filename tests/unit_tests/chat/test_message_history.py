@@ -0,0 +1,158 @@
+import asyncio
+import datetime
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException, status
+from sqlalchemy.exc import InterfaceError
+
+from app.chat.history import MessageHistoryWriter
+from app.chat.service import _decode_cursor, _encode_cursor
+
+
+class TestMessageHistoryWriter:
+
+    async def test_flush_on_batch_size(
+            self, fake_session_maker, user_1
+    ):
+        writer = MessageHistoryWriter(
+            session_maker=fake_session_maker,
+            batch_size=3,
+            flush_interval=60,
+            max_buffer_size=100
+        )
+        await writer.start()
+        for i in range(7):
+            writer.add(room_id="a", sender=user_1, content=str(i))
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+
+        assert [len(batch) for batch in fake_session_maker.executed] == [3, 3]
+        await writer.stop()
+
+        rows = [row for batch in fake_session_maker.executed for row in batch]
+        assert [row["content"] for row in rows] == [str(i) for i in range(7)]
+        assert rows[0]["sender_id"] == user_1.user_id
+        assert writer.written == 7
+
+
+    async def test_flush_on_interval(
+            self, fake_session_maker, user_1
+    ):
+        writer = MessageHistoryWriter(
+            session_maker=fake_session_maker,
+            batch_size=100,
+            flush_interval=0.01,
+            max_buffer_size=100
+        )
+        await writer.start()
+        writer.add(room_id="a", sender=user_1, content="hi")
+        await asyncio.sleep(0.05)
+
+        assert len(fake_session_maker.executed) == 1
+        await writer.stop()
+
+
+    async def test_failed_flush_keeps_messages(
+            self, fake_session_maker, user_1
+    ):
+        writer = MessageHistoryWriter(
+            session_maker=fake_session_maker,
+            batch_size=10,
+            flush_interval=60,
+            max_buffer_size=3
+        )
+        fake_session_maker.fail = True
+        for i in range(5):
+            writer.add(room_id="a", sender=user_1, content=str(i))
+
+        assert not await writer.flush()
+        assert writer.dropped == 2
+
+        fake_session_maker.fail = False
+        assert await writer.flush()
+        assert [row["content"] for row in fake_session_maker.executed[0]] == ["2", "3", "4"]
+
+
+    async def test_refused_rows_are_dropped_and_the_rest_saved(
+            self, fake_session_maker, user_1
+    ):
+        writer = MessageHistoryWriter(
+            session_maker=fake_session_maker,
+            batch_size=10,
+            flush_interval=60,
+            max_buffer_size=100
+        )
+        fake_session_maker.refuse = lambda row: row["content"] in ("3", "7")
+        for i in range(10):
+            writer.add(room_id="a", sender=user_1, content=str(i))
+
+        assert await writer.flush()
+        saved = [row["content"] for batch in fake_session_maker.executed for row in batch]
+        assert saved == ["0", "1", "2", "4", "5", "6", "8", "9"]
+        assert writer.written == 8
+        assert writer.rejected == 2
+        assert writer._buffer == []
+
+
+    async def test_refusing_session_does_not_block_later_messages(
+            self, fake_session_maker, user_1
+    ):
+        writer = MessageHistoryWriter(
+            session_maker=fake_session_maker,
+            batch_size=4,
+            flush_interval=0.01,
+            max_buffer_size=100
+        )
+        fake_session_maker.refuse = lambda row: True
+        await writer.start()
+        for i in range(6):
+            writer.add(room_id="a", sender=user_1, content=str(i))
+        await asyncio.sleep(0.05)
+        assert writer.rejected == 6
+        assert writer._buffer == []
+
+        fake_session_maker.refuse = None
+        writer.add(room_id="a", sender=user_1, content="after")
+        await asyncio.sleep(0.05)
+        await writer.stop()
+
+        assert [row["content"] for batch in fake_session_maker.executed for row in batch] == ["after"]
+        assert writer.dropped == 0
+
+
+    async def test_dropped_connection_keeps_messages(
+            self, fake_session_maker, user_1, monkeypatch
+    ):
+        writer = MessageHistoryWriter(
+            session_maker=fake_session_maker,
+            batch_size=10,
+            flush_interval=60,
+            max_buffer_size=100
+        )
+        dropped = InterfaceError("INSERT", None, ValueError("connection is closed"), connection_invalidated=True)
+
+        async def insert(rows: list[dict]) -> None:
+            raise dropped
+
+        monkeypatch.setattr(writer, "_insert", insert)
+        for i in range(3):
+            writer.add(room_id="a", sender=user_1, content=str(i))
+
+        assert not await writer.flush()
+        assert [row["content"] for row in writer._buffer] == ["0", "1", "2"]
+        assert writer.rejected == 0
+
+
+class TestHistoryCursor:
+
+    def test_cursor_round_trip(self):
+        created_at = datetime.datetime.now(datetime.timezone.utc)
+        message_id = uuid4()
+        assert _decode_cursor(_encode_cursor(created_at, message_id)) == (created_at, message_id)
+
+
+    def test_invalid_cursor(self):
+        with pytest.raises(HTTPException) as exc_info:
+            _decode_cursor("not a cursor")
+        assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
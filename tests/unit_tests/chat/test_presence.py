@@ -0,0 +1,63 @@
+import asyncio
+import json
+from uuid import uuid4
+
+from app.auth.schemas import TokenUserData
+from app.chat.presence import PresenceTracker
+
+
+def _make_tracker(window: float = 0.01) -> tuple[PresenceTracker, list[tuple[str, dict]]]:
+    published: list[tuple[str, dict]] = []
+    tracker = PresenceTracker(
+        publish=lambda room_id, frame: published.append((room_id, json.loads(frame))),
+        diff_window=window
+    )
+    return tracker, published
+
+
+class TestPresenceTracker:
+
+    async def test_joins_in_one_window_are_one_diff(self):
+        tracker, published = _make_tracker()
+        users = [TokenUserData(username=f"user_{i}", user_id=str(uuid4())) for i in range(100)]
+        for user in users:
+            tracker.join(room_id="a", user=user)
+        await asyncio.sleep(0.05)
+
+        assert published == [
+            ("a", {"type": "presence", "joined": [user.user_id for user in users], "left": []})
+        ]
+        assert tracker.members("a") == users
+
+
+    async def test_join_and_leave_in_one_window_cancel_out(self, user_1, user_2):
+        tracker, published = _make_tracker()
+        tracker.join(room_id="a", user=user_1)
+        tracker.flush()
+        tracker.join(room_id="a", user=user_2)
+        tracker.leave(room_id="a", user=user_2)
+        tracker.leave(room_id="a", user=user_1)
+        await asyncio.sleep(0.05)
+
+        assert published == [
+            ("a", {"type": "presence", "joined": [user_1.user_id], "left": []}),
+            ("a", {"type": "presence", "joined": [], "left": [user_1.user_id]}),
+        ]
+        assert tracker.members("a") == []
+
+
+    async def test_user_is_present_while_any_connection_is(self, user_1):
+        tracker, published = _make_tracker()
+        tracker.join(room_id="a", user=user_1)
+        tracker.join(room_id="a", user=user_1)
+        tracker.flush()
+        tracker.leave(room_id="a", user=user_1)
+        tracker.flush()
+
+        assert tracker.member_ids("a") == [user_1.user_id]
+        assert len(published) == 1
+
+        tracker.leave(room_id="a", user=user_1)
+        tracker.flush()
+        assert tracker.member_ids("a") == []
+        assert published[-1][1]["left"] == [user_1.user_id]
@@ -0,0 +1,54 @@
+from app.chat.rate_limit import TokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now: float = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTokenBucketLimiter:
+
+    def test_burst_then_rate(self):
+        clock = FakeClock()
+        limiter = TokenBucketLimiter(rate=2, burst=3, clock=clock)
+        limiter.connect("user")
+
+        assert [limiter.allow("user") for _ in range(4)] == [True, True, True, False]
+        clock.now = 0.5
+        assert limiter.allow("user")
+        assert not limiter.allow("user")
+        assert limiter.rejected == 2
+
+
+    def test_violations_reset_after_full_refill(self):
+        clock = FakeClock()
+        limiter = TokenBucketLimiter(rate=1, burst=2, clock=clock)
+        limiter.connect("user")
+        for _ in range(5):
+            limiter.allow("user")
+        assert limiter.violations("user") == 3
+
+        clock.now = 1
+        limiter.allow("user")
+        assert limiter.violations("user") == 3
+        clock.now = 10
+        limiter.allow("user")
+        assert limiter.violations("user") == 0
+
+
+    def test_bucket_is_shared_by_connections_and_freed_with_the_last(self):
+        clock = FakeClock()
+        limiter = TokenBucketLimiter(rate=1, burst=1, clock=clock)
+        limiter.connect("user")
+        limiter.connect("user")
+        assert limiter.allow("user")
+
+        limiter.disconnect("user")
+        assert not limiter.allow("user")
+        assert len(limiter) == 1
+
+        limiter.disconnect("user")
+        assert len(limiter) == 0
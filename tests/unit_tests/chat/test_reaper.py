@@ -0,0 +1,38 @@
+from starlette.websockets import WebSocketState
+
+from app.chat.reaper import ConnectionReaper
+from app.chat.registry import ConnectionRegistry
+
+
+class TestConnectionReaper:
+
+    async def test_reaps_dead_and_idle_connections(self, make_connection):
+        registry = ConnectionRegistry()
+        live, failed_writer, disconnected, idle = (make_connection() for _ in range(4))
+        for connection in (live, failed_writer, disconnected, idle):
+            registry.join(room_id="a", connection=connection)
+        failed_writer.is_closing = True
+        disconnected.websocket.application_state = WebSocketState.DISCONNECTED
+        idle.last_received_at -= 120
+        reaper = ConnectionReaper(
+            registry=registry, leave=registry.leave_all, interval=60, idle_timeout=60
+        )
+
+        assert await reaper.sweep() == 3
+        assert registry.members("a") == {live}
+        assert reaper.live == 1
+        assert reaper.reaped_dead == 2
+        assert reaper.reaped_idle == 1
+        assert idle.websocket.closed_with == 1001
+        assert live.websocket.closed_with is None
+
+
+    async def test_idle_check_is_disabled_by_default(self, make_connection):
+        registry = ConnectionRegistry()
+        connection = make_connection()
+        connection.last_received_at -= 10 ** 6
+        registry.join(room_id="a", connection=connection)
+        reaper = ConnectionReaper(registry=registry, leave=registry.leave_all, interval=60)
+
+        assert await reaper.sweep() == 0
+        assert reaper.live == 1
@@ -0,0 +1,33 @@
+from app.chat.recent import RecentHistory
+
+
+class TestRecentHistory:
+
+    def test_keeps_last_events_per_room(self):
+        history = RecentHistory(max_events=3, max_bytes=1024)
+        for i in range(5):
+            history.append(room_id="a", frame=str(i))
+        history.append(room_id="b", frame="b")
+
+        assert history.replay("a") == ["2", "3", "4"]
+        assert history.replay("b") == ["b"]
+        assert history.replay("missing") == []
+        assert history.total_bytes == 4
+
+
+    def test_memory_cap_evicts_quiet_rooms_first(self):
+        history = RecentHistory(max_events=10, max_bytes=10)
+        history.append(room_id="quiet", frame="aaaa")
+        history.append(room_id="busy", frame="bbbb")
+        history.append(room_id="busy", frame="cccc")
+
+        assert history.replay("quiet") == []
+        assert history.replay("busy") == ["bbbb", "cccc"]
+        assert len(history) == 1
+        assert history.total_bytes == 8
+
+
+    def test_disabled_history(self):
+        history = RecentHistory(max_events=0, max_bytes=1024)
+        history.append(room_id="a", frame="a")
+        assert history.replay("a") == []
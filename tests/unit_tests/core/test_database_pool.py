@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.util import greenlet_spawn
+
+from app.core.config import Settings, DATABASE_POOL_PROFILES
+from app.core.database import DatabasePoolStats, InstrumentedAsyncPool
+
+
+class FakeDBAPIConnection:
+
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class TestDatabasePoolProfile:
+
+    @pytest.mark.parametrize("mode", ["DEV", "TEST", "PROD"])
+    def test_profile_is_selected_by_mode(self, mode) -> None:
+        assert Settings(MODE=mode).DATABASE_POOL_PROFILE == DATABASE_POOL_PROFILES[mode]
+
+
+    def test_unknown_mode_uses_prod_profile(self) -> None:
+        assert Settings(MODE="STAGING").DATABASE_POOL_PROFILE == DATABASE_POOL_PROFILES["PROD"]
+
+
+    def test_settings_override_profile(self) -> None:
+        profile = Settings(MODE="DEV", DB_POOL_SIZE=3, DB_ECHO=False).DATABASE_POOL_PROFILE
+
+        assert profile.pool_size == 3
+        assert profile.echo is False
+        assert profile.max_overflow == DATABASE_POOL_PROFILES["DEV"].max_overflow
+
+
+class TestInstrumentedAsyncPool:
+
+    async def test_checkout_waits_and_timeouts_are_recorded(self) -> None:
+        stats = DatabasePoolStats()
+        pool = InstrumentedAsyncPool(
+            FakeDBAPIConnection, pool_size=1, max_overflow=0, timeout=0.05, stats=stats
+        )
+
+        connection = await greenlet_spawn(pool.connect)
+        assert pool.checkedout() == 1
+        with pytest.raises(PoolTimeoutError):
+            await greenlet_spawn(pool.connect)
+        await greenlet_spawn(connection.close)
+
+        assert stats.checkouts == 2
+        assert stats.timeouts == 1
+        assert stats.wait_seconds_max >= 0.05
+        assert pool.checkedout() == 0
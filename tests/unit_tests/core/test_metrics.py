@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+
+from httpx import AsyncClient, ASGITransport
+
+from app.chat.connection import broadcast_stats
+from app.chat.router import _deliver_frame, connection_reaper
+from app.core.database import _observe_query_time, _start_query_timer
+from app.core.metrics import MetricsRegistry, metrics
+from app.main import app
+
+
+class TestMetricsRegistry:
+
+    def test_counter_and_callback_samples(self) -> None:
+        registry = MetricsRegistry()
+        counter = registry.counter("requests_total", "Requests.", labelnames=("path",))
+        counter.inc(labels=("/a",))
+        counter.inc(2, labels=('say "hi"',))
+        registry.gauge_callback("queue_size", "Queued items.", callback=lambda: 7)
+
+        assert registry.render().splitlines() == [
+            "# HELP requests_total Requests.",
+            "# TYPE requests_total counter",
+            'requests_total{path="/a"} 1',
+            'requests_total{path="say \\"hi\\""} 2',
+            "# HELP queue_size Queued items.",
+            "# TYPE queue_size gauge",
+            "queue_size 7",
+        ]
+
+
+    def test_histogram_buckets_are_cumulative_and_inclusive(self) -> None:
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+
+        assert list(histogram.samples()) == [
+            'latency_seconds_bucket{le="0.1"} 2',
+            'latency_seconds_bucket{le="1.0"} 3',
+            'latency_seconds_bucket{le="+Inf"} 4',
+            "latency_seconds_sum 3.65",
+            "latency_seconds_count 4",
+        ]
+
+
+    def test_registering_a_name_twice_returns_the_same_metric(self) -> None:
+        registry = MetricsRegistry()
+
+        assert registry.counter("events_total", "Events.") is registry.counter("events_total", "Events.")
+
+
+class TestInstrumentation:
+
+    async def test_metrics_endpoint_reports_fan_out_and_jwt_decodes(self, user_1_token) -> None:
+        fanouts: int = metrics.get("chat_fanout_seconds").count()
+        _deliver_frame(room_id="metrics_test_room", frame='{"type":"join","content":"x"}')
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get(
+                "/api/v1/chat/rooms/x/members", headers={"Authorization": f"Bearer {user_1_token}"}
+            )
+            response = await client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert metrics.get("chat_fanout_seconds").count() == fanouts + 1
+        assert "chat_connections 0" in response.text
+        assert "auth_jwt_decode_seconds_count" in response.text
+
+
+    async def test_metrics_endpoint_reports_reaped_connections_and_outbound_frames(self) -> None:
+        connection_reaper.reaped_idle += 1
+        broadcast_stats.dropped += 1
+        try:
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.get("/metrics")
+        finally:
+            connection_reaper.reaped_idle -= 1
+            broadcast_stats.dropped -= 1
+
+        lines: list[str] = response.text.splitlines()
+        assert f'chat_connections_reaped_total{{reason="idle"}} {connection_reaper.reaped_idle + 1}' in lines
+        assert f'chat_connections_reaped_total{{reason="dead"}} {connection_reaper.reaped_dead}' in lines
+        assert f'chat_outbound_frames_total{{result="dropped"}} {broadcast_stats.dropped + 1}' in lines
+        assert f'chat_outbound_frames_total{{result="queued"}} {broadcast_stats.queued}' in lines
+        assert f"chat_overflow_disconnects_total {broadcast_stats.disconnected}" in lines
+
+
+    def test_sql_execution_is_timed(self) -> None:
+        queries: int = metrics.get("db_query_seconds").count()
+        context = SimpleNamespace()
+
+        _start_query_timer(None, None, "SELECT 1", None, context, False)
+        _observe_query_time(None, None, "SELECT 1", None, context, False)
+
+        assert metrics.get("db_query_seconds").count() == queries + 1
@@ -0,0 +1,89 @@
+import time
+
+import pytest
+from fastapi import FastAPI, WebSocket
+from fastapi.testclient import TestClient
+
+from app.core.profiling import ProfilingMiddleware
+
+TOKEN: str = "admin-token"
+
+
+def _burn_cpu(seconds: float) -> int:
+    total: int = 0
+    deadline: float = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+def _make_app(output_dir, token: str = TOKEN, sample_rate: float = 0.0) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/busy")
+    async def busy() -> dict:
+        return {"total": _burn_cpu(0.1)}
+
+    @app.websocket("/ws")
+    async def websocket_busy(websocket: WebSocket) -> None:
+        await websocket.accept()
+        await websocket.receive_text()
+        _burn_cpu(0.1)
+        await websocket.send_text("done")
+        await websocket.close()
+
+    app.add_middleware(
+        ProfilingMiddleware,
+        output_dir=str(output_dir),
+        token=token,
+        sample_rate=sample_rate,
+        interval=0.001
+    )
+    return app
+
+
+class TestProfilingMiddleware:
+
+    def test_token_header_profiles_the_request(self, tmp_path) -> None:
+        with TestClient(_make_app(tmp_path)) as client:
+            response = client.get("/busy", headers={"X-Profile-Token": TOKEN})
+
+        assert response.status_code == 200
+        profile_file = tmp_path / response.headers["X-Profile-File"]
+        lines: list[str] = profile_file.read_text().splitlines()
+        assert lines
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert any("_burn_cpu" in line for line in lines)
+
+
+    @pytest.mark.parametrize(
+        "token, headers",
+        [(TOKEN, {}), (TOKEN, {"X-Profile-Token": "wrong"}), ("", {"X-Profile-Token": ""})]
+    )
+    def test_requests_without_the_token_are_not_profiled(self, tmp_path, token, headers) -> None:
+        with TestClient(_make_app(tmp_path, token=token)) as client:
+            response = client.get("/busy", headers=headers)
+
+        assert response.status_code == 200
+        assert "X-Profile-File" not in response.headers
+        assert list(tmp_path.iterdir()) == []
+
+
+    def test_sample_rate_profiles_without_token(self, tmp_path) -> None:
+        with TestClient(_make_app(tmp_path, token="", sample_rate=1.0)) as client:
+            response = client.get("/busy")
+
+        assert (tmp_path / response.headers["X-Profile-File"]).exists()
+
+
+    def test_websocket_session_is_profiled_with_query_token(self, tmp_path) -> None:
+        with TestClient(_make_app(tmp_path)) as client:
+            with client.websocket_connect(f"/ws?profile_token={TOKEN}") as websocket:
+                websocket.send_text("go")
+                assert websocket.receive_text() == "done"
+
+        profile_files = list(tmp_path.iterdir())
+        assert len(profile_files) == 1
+        assert "-WS-ws-" in profile_files[0].name
+        assert "_burn_cpu" in profile_files[0].read_text()
@@ -0,0 +1,40 @@
+import httpx
+
+from app.depends.async_client import SharedAsyncClient, make_request, shared_async_client
+
+
+class TestSharedAsyncClient:
+
+    async def test_client_is_reused_until_stopped(self):
+        shared = SharedAsyncClient()
+        await shared.start()
+        client = shared.client
+
+        assert shared.client is client
+        assert client.timeout.connect == 5.0
+        assert client.timeout.read == 10.0
+
+        await shared.stop()
+        assert client.is_closed
+        assert shared.client is not client
+        await shared.stop()
+
+
+    async def test_make_request_yields_the_shared_client(self):
+        clients = [client async for client in make_request()]
+        assert clients == [shared_async_client.client]
+
+
+    async def test_mock_transport(self):
+        requests: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, json={"keys": []})
+
+        shared = SharedAsyncClient(transport=httpx.MockTransport(handler))
+        response = await shared.client.get("https://www.googleapis.com/oauth2/v3/certs")
+        await shared.stop()
+
+        assert response.json() == {"keys": []}
+        assert requests[0].url.host == "www.googleapis.com"
@@ -0,0 +1,114 @@
+from collections import namedtuple
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from app.mixins.db_mixin import get_db
+from app.user.model import User
+from app.user.schema import ShowUser
+from app.user.service import user_profile_cache
+from tests.conftest import URL_API_V1
+
+
+ShowUserRow = namedtuple("ShowUserRow", ShowUser.model_fields)
+
+
+class FakeResult(list):
+    def first(self):
+        return self[0] if self else None
+
+
+def _row(user: User) -> ShowUserRow:
+    return ShowUserRow(**ShowUser.model_validate(user, from_attributes=True).model_dump())
+
+
+class FakeSession:
+    """
+        Stands in for the session, answering the user queries from a list of users.
+    """
+
+    def __init__(self, users: list[User]) -> None:
+        self.users = {user.id: user for user in users}
+        self.queried_ids: list[list] = []
+
+    async def execute(self, statement) -> FakeResult:
+        params: dict = statement.compile().params
+        if "user_ids" not in params:
+            user = self.users.get(params["id_1"])
+            return FakeResult([_row(user)] if user else [])
+        user_ids: list = params["user_ids"]
+        self.queried_ids.append(user_ids)
+        return FakeResult(_row(self.users[user_id]) for user_id in user_ids if user_id in self.users)
+
+
+def _user(username: str) -> User:
+    return User(
+        id=uuid4(), username=username, email=f"{username}@example.com", google_id=uuid4().hex,
+        is_active=True, is_banned=False, is_superuser=False
+    )
+
+
+@pytest.fixture
+def users() -> list[User]:
+    return [_user(f"user_{i}") for i in range(3)]
+
+
+@pytest.fixture
+def fake_session(users) -> FakeSession:
+    return FakeSession(users=users)
+
+
+@pytest_asyncio.fixture
+async def users_client(fake_session, user_1_token) -> AsyncClient:
+    user_profile_cache.clear()
+    app.dependency_overrides[get_db] = lambda: fake_session
+    transport = ASGITransport(app=app)
+    async with AsyncClient(
+        transport=transport,
+        base_url=URL_API_V1 + "/users",
+        headers={"Authorization": f"Bearer {user_1_token}"}
+    ) as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+class TestShowUsers:
+
+    async def test_get_resolves_ids_with_one_query(self, users_client, fake_session, users):
+        missing_id = str(uuid4())
+        ids = [str(user.id) for user in users] + [missing_id, str(users[0].id)]
+
+        response = await users_client.get(url=URL_API_V1 + "/users", params={"ids": ids})
+
+        assert response.status_code == status.HTTP_200_OK
+        data: dict = response.json()["data"]
+        assert {user_id: user["username"] for user_id, user in data["users"].items()} == {
+            str(user.id): user.username for user in users
+        }
+        assert data["not_found"] == [missing_id]
+        assert len(fake_session.queried_ids) == 1
+        assert len(fake_session.queried_ids[0]) == 4
+
+
+    async def test_post_queries_only_uncached_ids(self, users_client, fake_session, users):
+        await users_client.get(url=f"/{users[0].id}")
+
+        response = await users_client.post(
+            url="/batch", json={"ids": [str(user.id) for user in users]}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["data"]["users"]) == 3
+        assert fake_session.queried_ids == [[users[1].id, users[2].id]]
+
+
+    async def test_too_many_ids_are_rejected(self, users_client):
+        response = await users_client.post(
+            url="/batch", json={"ids": [str(uuid4()) for _ in range(501)]}
+        )
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
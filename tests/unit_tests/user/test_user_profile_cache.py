@@ -0,0 +1,118 @@
+from collections import namedtuple
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.user.cache import UserProfileCache
+from app.user.model import User
+from app.user.schema import ShowUser
+from app.user.service import UserManager, user_profile_cache, _invalidate_user_profile
+
+ShowUserRow = namedtuple("ShowUserRow", ShowUser.model_fields)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now: float = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeSession:
+    """
+        Stands in for the session, returning one user for every query and counting the queries.
+    """
+
+    def __init__(self, user: User | None) -> None:
+        self.user = user
+        self.queries: int = 0
+
+    async def scalar(self, statement) -> User | None:
+        self.queries += 1
+        return self.user
+
+    async def execute(self, statement) -> "FakeResult":
+        self.queries += 1
+        if self.user is None:
+            return FakeResult()
+        return FakeResult([ShowUserRow(**ShowUser.model_validate(self.user, from_attributes=True).model_dump())])
+
+
+class FakeResult(list):
+    def first(self):
+        return self[0] if self else None
+
+
+def _user() -> User:
+    return User(
+        id=uuid4(), username="user_1", email="user_1@example.com", google_id="google-1",
+        is_active=True, is_banned=False, is_superuser=False
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_user_profile_cache() -> None:
+    user_profile_cache.clear()
+
+
+class TestUserProfileCache:
+
+    def test_profiles_and_unknown_ids_expire_separately(self) -> None:
+        clock = FakeClock()
+        cache = UserProfileCache(max_size=10, ttl=60, negative_ttl=5, clock=clock)
+        known, unknown = uuid4(), uuid4()
+        cache.put(user_id=known, user_data={"username": "user_1"})
+        cache.put(user_id=unknown, user_data=None)
+
+        assert cache.get(known) == (True, {"username": "user_1"})
+        assert cache.get(unknown) == (True, None)
+        clock.now = 5
+        assert cache.get(unknown) == (False, None)
+        assert cache.get(known) == (True, {"username": "user_1"})
+        assert (cache.hits, cache.negative_hits, cache.misses) == (2, 1, 1)
+
+
+    def test_least_recently_used_is_evicted(self) -> None:
+        cache = UserProfileCache(max_size=2, ttl=60, negative_ttl=5, clock=FakeClock())
+        first, second, third = uuid4(), uuid4(), uuid4()
+        cache.put(user_id=first, user_data={})
+        cache.put(user_id=second, user_data={})
+        cache.get(first)
+        cache.put(user_id=third, user_data={})
+
+        assert cache.get(second) == (False, None)
+        assert cache.get(first) == (True, {})
+        assert len(cache) == 2
+
+
+class TestShowUserCache:
+
+    async def test_profile_is_read_through_and_invalidated(self) -> None:
+        user = _user()
+        db = FakeSession(user=user)
+
+        first = await UserManager.show_user(db=db, user_id=user.id)
+        second = await UserManager.show_user(db=db, user_id=user.id)
+        assert first == second
+        assert first["username"] == "user_1"
+        assert db.queries == 1
+
+        _invalidate_user_profile(user.id)
+        await UserManager.show_user(db=db, user_id=user.id)
+        assert db.queries == 2
+
+
+    async def test_unknown_id_is_cached(self) -> None:
+        db = FakeSession(user=None)
+        user_id = uuid4()
+
+        for _ in range(3):
+            with pytest.raises(HTTPException) as exc_info:
+                await UserManager.show_user(db=db, user_id=user_id)
+            assert exc_info.value.status_code == 404
+        with pytest.raises(HTTPException):
+            await UserManager.get_user_or_raise_exception(db=db, user_id=user_id)
+
+        assert db.queries == 1
@@ -0,0 +1,60 @@
+from random import Random
+
+from app.user.generator import UsernameAllocator
+
+
+class FakeUsersTable:
+    """
+        Stands in for the session, answering the candidate query from a set of taken usernames.
+    """
+
+    def __init__(self, usernames: set[str]) -> None:
+        self.usernames = usernames
+        self.queries: int = 0
+
+    async def scalars(self, statement) -> list[str]:
+        self.queries += 1
+        candidates: list[str] = statement.compile().params["candidates"]
+        return [candidate for candidate in candidates if candidate in self.usernames]
+
+
+class TestUsernameAllocator:
+
+    async def test_allocation_costs_one_query(self) -> None:
+        table = FakeUsersTable(usernames=set())
+        allocator = UsernameAllocator(batch_size=8)
+
+        username = await allocator.allocate(db=table)
+
+        assert username.startswith("user ") and len(username) == 14
+        assert table.queries == 1
+        assert allocator.stats() == {
+            "allocations": 1, "queries": 1, "collisions": 0, "retries": 0
+        }
+
+
+    async def test_taken_candidates_are_skipped_in_the_same_query(self) -> None:
+        # The same seed makes a second allocator draw the same candidates.
+        taken: list[str] = UsernameAllocator(batch_size=8, rng=Random(1)).candidates()[:7]
+        table = FakeUsersTable(usernames=set(taken))
+        allocator = UsernameAllocator(batch_size=8, rng=Random(1))
+
+        username = await allocator.allocate(db=table)
+
+        assert username not in taken
+        assert table.queries == 1
+        assert allocator.collisions == 7
+        assert allocator.retries == 0
+
+
+    async def test_full_batch_is_retried(self) -> None:
+        taken: list[str] = UsernameAllocator(batch_size=4, rng=Random(2)).candidates()
+        table = FakeUsersTable(usernames=set(taken))
+        allocator = UsernameAllocator(batch_size=4, rng=Random(2))
+
+        username = await allocator.allocate(db=table)
+
+        assert username not in taken
+        assert table.queries == 2
+        assert allocator.collisions == 4
+        assert allocator.retries == 1